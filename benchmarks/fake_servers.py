@@ -0,0 +1,277 @@
+# Local stand-ins for the Spotify Web API, OpenWeather and OpenAI chat
+# completions, used by benchmarks/run_benchmarks.py.
+#
+# Every server adds configurable latency and can fail a share of requests
+# with 500s or 429s (with Retry-After), so retries and backoff show up in
+# the numbers. Point the app at them with:
+#   SPOTIFY_API_URL=http://127.0.0.1:<port>/v1/
+#   OPENWEATHER_BASE_URL=http://127.0.0.1:<port>/data/2.5/weather
+#   OPENAI_BASE_URL=http://127.0.0.1:<port>/v1
+
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+class Faults:
+    """Latency and failure injection for one fake service."""
+
+    def __init__(self, latency_ms=80, jitter_ms=40, error_rate=0.0, rate_limit_rate=0.0, retry_after=1, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after  # Seconds (whole numbers; urllib3 ignores fractions)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def delay(self):
+        with self.lock:
+            jitter = self.random.uniform(0, self.jitter_ms)
+        time.sleep((self.latency_ms + jitter) / 1000)
+
+    def failure(self):
+        """Returns 429, 500 or None for the next request."""
+        with self.lock:
+            roll = self.random.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real APIs
+
+    def log_message(self, format, *args):
+        pass  # Quiet
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def dispatch(self, method):
+        fake = self.server.fake
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        fake.faults.delay()
+        status = fake.faults.failure()
+        fake.record(method, url.path, status or 200)
+        if status == 429:
+            self.send_json(429, {"error": {"status": 429, "message": "API rate limit exceeded"}},
+                           {"Retry-After": str(fake.faults.retry_after)})
+            return
+        if status == 500:
+            self.send_json(500, {"error": {"status": 500, "message": "Injected server error"}})
+            return
+
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            payload = {}
+        fake.route(self, method, url.path, parse_qs(url.query), payload)
+
+    def send_json(self, status, data, headers=None):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_empty(self, status=204):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def send_events(self, events, delay_ms=0):
+        """Server-sent events with chunked encoding, paced like a model generating tokens."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for event in events:
+            data = f"data: {event}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+            if delay_ms:
+                time.sleep(delay_ms / 1000)
+        self.wfile.write(b"0\r\n\r\n")
+
+class FakeServer:
+    """A fake API on 127.0.0.1 (random port) running on a background thread."""
+
+    name = "fake"
+
+    def __init__(self, faults=None):
+        self.faults = faults or Faults()
+        self.calls = Counter()  # "METHOD /path" -> requests
+        self.statuses = Counter()  # status -> requests
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def record(self, method, path, status):
+        with self.lock:
+            self.calls[f"{method} {path}"] += 1
+            self.statuses[status] += 1
+
+    def reset_stats(self):
+        with self.lock:
+            self.calls.clear()
+            self.statuses.clear()
+
+    def stats(self):
+        with self.lock:
+            return {"requests": sum(self.calls.values()), "calls": dict(self.calls),
+                    "statuses": {str(status): count for status, count in self.statuses.items()}}
+
+    def route(self, handler, method, path, query, payload):
+        handler.send_json(404, {"error": {"status": 404, "message": f"No fake for {method} {path}"}})
+
+class FakeSpotify(FakeServer):
+    """The player and search endpoints Frosty uses, with one local "Computer" device."""
+
+    name = "spotify"
+
+    def __init__(self, faults=None):
+        super().__init__(faults)
+        self.playing = True
+        self.track = self.make_track("Without Me", "Eminem")
+
+    @staticmethod
+    def make_track(name, artist):
+        track_id = format(abs(hash((name, artist))) % 16 ** 22, "022x")
+        return {
+            "id": track_id,
+            "uri": f"spotify:track:{track_id}",
+            "name": name,
+            "artists": [{"name": artist}],
+            "album": {"name": name, "images": []},
+            "duration_ms": 240000,
+        }
+
+    def route(self, handler, method, path, query, payload):
+        if path == "/v1/me/player/devices":
+            handler.send_json(200, {"devices": [
+                {"id": "bench-pc", "name": "Bench PC", "type": "Computer", "is_active": True},
+                {"id": "bench-phone", "name": "Bench Phone", "type": "Smartphone", "is_active": False},
+            ]})
+        elif path == "/v1/me/player" and method == "GET":
+            handler.send_json(200, {"is_playing": self.playing, "progress_ms": 1000, "item": self.track,
+                                    "device": {"id": "bench-pc", "type": "Computer"}})
+        elif path == "/v1/me/player/queue":
+            handler.send_json(200, {"currently_playing": self.track,
+                                    "queue": [self.make_track("Lose Yourself", "Eminem")]})
+        elif path == "/v1/search":
+            text = query.get("q", [""])[0]
+            limit = int(query.get("limit", ["5"])[0])
+            items = [self.make_track(text if i == 0 else f"{text} ({i})", "Bench Artist") for i in range(limit)]
+            handler.send_json(200, {"tracks": {"items": items}})
+        elif path == "/v1/me/player/play":
+            self.playing = True
+            uris = payload.get("uris")
+            if uris:
+                self.track = dict(self.track, uri=uris[0], id=uris[0].rsplit(":", 1)[-1])
+            handler.send_empty()
+        elif path == "/v1/me/player/pause":
+            self.playing = False
+            handler.send_empty()
+        elif path in ("/v1/me/player/next", "/v1/me/player/previous", "/v1/me/player"):
+            handler.send_empty()
+        else:
+            super().route(handler, method, path, query, payload)
+
+class FakeWeather(FakeServer):
+    """OpenWeather current weather; "nowhere" is an unknown city."""
+
+    name = "weather"
+
+    def route(self, handler, method, path, query, payload):
+        if path != "/data/2.5/weather":
+            super().route(handler, method, path, query, payload)
+            return
+        city = query.get("q", [""])[0].split(",")[0]
+        if city.lower() == "nowhere":
+            handler.send_json(404, {"cod": "404", "message": "city not found"})
+            return
+        handler.send_json(200, {
+            "cod": 200,
+            "name": city.title(),
+            "weather": [{"description": "scattered clouds"}],
+            "main": {"temp": 18.4, "humidity": 61},
+            "wind": {"speed": 3.2},
+        })
+
+class FakeOpenAI(FakeServer):
+    """Chat completions (plain and streamed) and the models list."""
+
+    name = "openai"
+    REPLY = ("Here is a short answer from the benchmark server. "
+             "It has a few sentences so streaming can be measured. "
+             "That is all for now.")
+
+    def __init__(self, faults=None, token_delay_ms=15):
+        super().__init__(faults)
+        self.token_delay_ms = token_delay_ms
+
+    def route(self, handler, method, path, query, payload):
+        if path == "/v1/models":
+            handler.send_json(200, {"object": "list", "data": [{"id": "gpt-4", "object": "model", "owned_by": "bench"}]})
+        elif path == "/v1/chat/completions":
+            if payload.get("stream"):
+                handler.send_events(self.stream_events(payload), self.token_delay_ms)
+            else:
+                handler.send_json(200, self.completion(payload))
+        else:
+            super().route(handler, method, path, query, payload)
+
+    def usage(self):
+        completion_tokens = len(self.REPLY.split())
+        return {"prompt_tokens": 20, "completion_tokens": completion_tokens, "total_tokens": 20 + completion_tokens}
+
+    def completion(self, payload):
+        return {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "gpt-4"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": self.REPLY}, "finish_reason": "stop"}],
+            "usage": self.usage(),
+        }
+
+    def stream_events(self, payload):
+        base = {"id": "chatcmpl-bench", "object": "chat.completion.chunk",
+                "created": int(time.time()), "model": payload.get("model", "gpt-4")}
+        for word in self.REPLY.split(" "):
+            yield json.dumps(dict(base, choices=[{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]))
+        yield json.dumps(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+        if (payload.get("stream_options") or {}).get("include_usage"):
+            yield json.dumps(dict(base, choices=[], usage=self.usage()))
+        yield "[DONE]"
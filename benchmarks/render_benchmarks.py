@@ -0,0 +1,58 @@
+# Offline micro-benchmarks for the two vinyl renderers:
+#   - VinylScreen.update_rotation (PyQt6, offscreen platform)
+#   - the pygame render loop (SDL dummy video driver)
+#
+# Run from the project root (asset paths are relative to it); both are
+# also run by benchmarks/run_benchmarks.py.
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# No display needed
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+def bench_update_rotation(iterations=300):
+    """
+    Time update_rotation() plus the repaint it schedules, per frame.
+
+    Returns:
+        tuple: (list of frame times in ms, the widget's frame_stats())
+    """
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    from ui.main_window import CircularUI
+    window = CircularUI()
+    window.show_vinyl()
+    screen = window.get_vinyl_screen()
+    app.processEvents()
+
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        screen.update_rotation()
+        screen.vinyl_widget.repaint()  # Paint now instead of on the next event loop pass
+        samples.append((time.perf_counter() - started) * 1000)
+        app.processEvents()
+
+    stats = screen.vinyl_widget.frame_stats()
+    window.close()
+    app.processEvents()
+    return samples, stats
+
+def bench_pygame_loop(seconds=3, mode="cached"):
+    """Run the pygame player for a few seconds and return its FrameStats."""
+    from integrations.vinyl_player import vinyl_player
+    return vinyl_player(mode=mode, max_seconds=seconds)
+
+if __name__ == "__main__":
+    samples, stats = bench_update_rotation()
+    samples.sort()
+    print(f"update_rotation ({stats['mode']}): median {samples[len(samples) // 2]:.2f}ms, max {samples[-1]:.2f}ms")
+    for mode in ("classic", "cached"):
+        print(f"pygame loop ({mode}): {bench_pygame_loop(mode=mode).summary()}")
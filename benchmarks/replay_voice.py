@@ -0,0 +1,150 @@
+# Replay recorded voice sessions through the listening pipeline (no microphone needed).
+#
+# Feeds WAV files (and synthetic silence/noise/tone segments) through
+# core.audio_stream.ReplaySource into the same AudioStream, VAD, wake word
+# check, speech-to-text backend and intent matching that Frosty uses live,
+# and reports per-stage timings per utterance plus overall throughput.
+#
+#   python benchmarks/replay_voice.py recordings/session1.wav --speed 4
+#   python benchmarks/replay_voice.py recordings/ --wake --stt vosk --json replay.json
+#   python benchmarks/replay_voice.py "silence:1,tone:0.8,noise:2,tone:1.5" --stt none --speed 0
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import speech_recognition as sr
+from core.audio_stream import AudioStream, ReplaySource, WakeWordDetector
+from core.intents import match_intent
+from core.stt import Transcriber
+from core.voice import early_intent_check
+from run_benchmarks import percentile
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+class Replay:
+    """Runs the listening loop over one replayed session and collects a row per utterance."""
+
+    def __init__(self, source, stt="none", wake=False, timeout=3):
+        self.source = source
+        self.stream = AudioStream(source)
+        self.timeout = timeout
+        self.recognizer = sr.Recognizer()
+        self.detector = WakeWordDetector(self.recognizer) if wake else None
+        self.awake = not wake
+        self.transcriber = None
+        if stt != "none":
+            self.transcriber = Transcriber(self.recognizer, backend=stt)
+        self.rows = []
+        self.audio = None
+        self.capture_ms = 0.0
+        self.end_s = 0.0
+
+    def read_utterance(self, **kwargs):
+        """AudioStream.read_utterance, timed and remembered (the transcriber listens through this)."""
+        self.audio, self.capture_ms = timed(self.stream.read_utterance, **kwargs)
+        self.end_s = self.source.position_seconds()
+        return self.audio
+
+    def row(self, kind, **fields):
+        audio_s = len(self.audio.frame_data) / self.source.SAMPLE_WIDTH / self.source.SAMPLE_RATE
+        row = {"kind": kind, "segment": self.source.label_at(self.end_s - audio_s / 2),
+               "end_s": round(self.end_s, 2), "audio_ms": round(audio_s * 1000),
+               "capture_ms": round(self.capture_ms, 1)}
+        row.update(fields)
+        self.rows.append(row)
+        print(" ".join(f"{key}={value}" for key, value in row.items() if value is not None))
+
+    def step(self):
+        """Handle one utterance. Returns False when nobody spoke before the timeout."""
+        self.audio = None
+        if not self.awake:
+            if self.read_utterance(timeout=self.timeout) is None:
+                return False
+            heard, wake_ms = timed(self.detector.heard, self.audio)
+            self.awake = heard
+            self.row("wake", wake_ms=round(wake_ms, 1), heard=heard)
+            return True
+
+        if self.transcriber is None:
+            if self.read_utterance(timeout=self.timeout) is None:
+                return False
+            self.row("utterance")
+        else:
+            try:
+                text, early = self.transcriber.listen(self, timeout=self.timeout, on_partial=early_intent_check())
+            except sr.RequestError as e:
+                self.row("command", error=str(e))
+                return True
+            if self.audio is None:
+                return False
+            (intent, _), intent_ms = timed(match_intent, text) if text else ((None, {}), 0.0)
+            self.row("command", recognize_ms=round(self.transcriber.latencies[-1], 1), intent=intent,
+                     intent_us=round(intent_ms * 1000), early=early, text=repr(text))
+
+        self.awake = self.detector is None  # With --wake, every command needs a new wake word
+        return True
+
+    def run(self):
+        self.stream.start()
+        try:
+            while True:
+                if not self.step() and self.source.finished.is_set():
+                    break
+        finally:
+            self.stream.stop()
+
+    def summary(self):
+        def stage(name):
+            values = [row[name] for row in self.rows if row.get(name) is not None]
+            if not values:
+                return None
+            return {"p50": round(percentile(values, 50), 1), "p95": round(percentile(values, 95), 1), "max": round(max(values), 1)}
+
+        stages = {name: stage(name) for name in ("capture_ms", "wake_ms", "recognize_ms", "intent_us")}
+        return {
+            "utterances": len(self.rows),
+            "stages": {name: values for name, values in stages.items() if values},
+            "replay": self.source.replay_stats(),
+            "stream": self.stream.stream_stats(),
+            "stt": self.transcriber.stt_stats() if self.transcriber else None,
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded sessions through Frosty's listening pipeline")
+    parser.add_argument("session", nargs="+", help="WAV files, folders of WAV files or silence:/noise:/tone:<seconds>")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed (1 = real time, 0 = as fast as possible)")
+    parser.add_argument("--stt", default="none", help="Speech-to-text backend: google, vosk, sphinx or none (VAD only)")
+    parser.add_argument("--wake", action="store_true", help="Require the wake word before each command")
+    parser.add_argument("--timeout", type=float, default=3, help="Seconds to wait for speech per listen")
+    parser.add_argument("--json", help="Also write rows and summary to this file")
+    args = parser.parse_args()
+
+    source = ReplaySource(",".join(args.session), speed=args.speed)
+    replay = Replay(source, stt=args.stt, wake=args.wake, timeout=args.timeout)
+    replay.run()
+
+    summary = replay.summary()
+    print()
+    print(f"📼 {summary['utterances']} utterances, {summary['replay']['audio_s']}s of audio in "
+          f"{summary['replay']['wall_s']}s ({summary['replay']['x_realtime']}x real time), "
+          f"{summary['stream']['dropped']} frames dropped")
+    for name, values in summary["stages"].items():
+        print(f"   {name:13} p50 {values['p50']:>8}  p95 {values['p95']:>8}  max {values['max']:>8}")
+    if summary["stt"]:
+        print(f"   stt: {summary['stt']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "rows": replay.rows, "summary": summary}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+# End-to-end latency benchmarks against local fake APIs (benchmarks/fake_servers.py).
+#
+# Drives core/weather_api, core/spotify_api, core/openai_api and the
+# core/voice command path (with injected text instead of the microphone),
+# then the vinyl render micro-benchmarks, and prints p50/p95/p99 latency
+# and call counts per scenario. Nothing touches the real APIs or your
+# caches: everything runs in a temporary working directory.
+#
+#   python benchmarks/run_benchmarks.py                  # all groups
+#   python benchmarks/run_benchmarks.py --quick          # smoke run (CI)
+#   python benchmarks/run_benchmarks.py --only api --latency-ms 150 --error-rate 0.05 --rate-limit-rate 0.02
+#   python benchmarks/run_benchmarks.py --json results.json
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_servers import Faults, FakeSpotify, FakeWeather, FakeOpenAI
+
+GROUPS = ["api", "voice", "render"]
+VOICE_TIMEOUT = 30  # Seconds to wait for Frosty to answer an injected command
+SPOTIFY_SCOPE = "user-read-playback-state user-modify-playback-state"
+
+def percentile(samples, p):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+def failed(result):
+    """Frosty reports failures as text ("Error: ...", "❌ ...") rather than raising."""
+    return result is None or (isinstance(result, str) and result.startswith(("Error", "❌")))
+
+class SpokenLog:
+    """Stands in for the TTS worker during voice benchmarks: records what would be spoken."""
+
+    def __init__(self):
+        self.spoken = []
+        self.first = threading.Event()
+        self.streams = 0  # Streamed replies still producing sentences
+        self.idle = threading.Condition()
+
+    def reset(self):
+        self.spoken = []
+        self.first.clear()
+
+    def say(self, text, priority=None, on_start=None, generation=None):
+        if not text:
+            return
+        if on_start:
+            on_start()
+        self.spoken.append(text)
+        self.first.set()
+
+    def interrupt(self):
+        pass
+
+    def busy(self):
+        return False
+
+    def wait(self, timeout=None):
+        return True
+
+    def begin_stream(self):
+        with self.idle:
+            self.streams += 1
+        return 0
+
+    def end_stream(self):
+        with self.idle:
+            self.streams -= 1
+            self.idle.notify_all()
+
+    def wait_idle(self, timeout):
+        """Wait for streamed replies to finish, so they don't leak into the next command."""
+        with self.idle:
+            return self.idle.wait_for(lambda: self.streams == 0, timeout)
+
+    def is_current(self, generation):
+        return True
+
+# ------------------ Setup ------------------
+
+def start_servers(args):
+    def faults(offset):
+        seed = None if args.seed is None else args.seed + offset
+        return Faults(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate, args.retry_after, seed)
+
+    return {
+        "spotify": FakeSpotify(faults(0)).start(),
+        "weather": FakeWeather(faults(1)).start(),
+        "openai": FakeOpenAI(faults(2), token_delay_ms=args.token_delay_ms).start(),
+    }
+
+def prepare_workdir(servers):
+    """Temporary working directory with the assets, a Spotify token and the env pointing at the fakes."""
+    workdir = tempfile.mkdtemp(prefix="frosty-bench-")
+    try:
+        os.symlink(os.path.join(REPO_ROOT, "assets"), os.path.join(workdir, "assets"))
+    except OSError:
+        shutil.copytree(os.path.join(REPO_ROOT, "assets"), os.path.join(workdir, "assets"))
+
+    with open(os.path.join(workdir, ".spotify_cache"), "w", encoding="utf-8") as f:
+        json.dump({"access_token": "bench", "token_type": "Bearer", "expires_in": 86400,
+                   "refresh_token": "bench", "scope": SPOTIFY_SCOPE, "expires_at": int(time.time()) + 86400}, f)
+
+    os.environ.update({
+        "SPOTIPY_CLIENT_ID": "bench",
+        "SPOTIPY_CLIENT_SECRET": "bench",
+        "SPOTIPY_REDIRECT_URI": "http://127.0.0.1:8888/callback",
+        "SPOTIFY_API_URL": servers["spotify"].url + "/v1/",
+        "OPENWEATHER_API_KEY": "bench",
+        "OPENWEATHER_BASE_URL": servers["weather"].url + "/data/2.5/weather",
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": servers["openai"].url + "/v1",
+        "FROSTY_BROKER": "local",
+        "QT_QPA_PLATFORM": "offscreen",
+        "SDL_VIDEODRIVER": "dummy",
+        "SDL_AUDIODRIVER": "dummy",
+    })
+    os.chdir(workdir)
+    return workdir
+
+# ------------------ Measuring ------------------
+
+def measure(name, action, iterations, servers):
+    """
+    Run action(i) iterations times. It returns True on success, or
+    (ok, ms) when only part of what it does should count as latency.
+    """
+    for server in servers.values():
+        server.reset_stats()
+
+    samples, errors = [], 0
+    for i in range(iterations):
+        started = time.perf_counter()
+        try:
+            ok = action(i)
+        except Exception as e:
+            ok = False
+            print(f"⚠️ {name}: {type(e).__name__}: {e}")
+        ms = (time.perf_counter() - started) * 1000
+        if isinstance(ok, tuple):
+            ok, ms = ok
+        samples.append(ms)
+        if not ok:
+            errors += 1
+
+    requests = sum(server.stats()["requests"] for server in servers.values())
+    rate_limited = sum(server.stats()["statuses"].get("429", 0) for server in servers.values())
+    return summarize(name, samples, errors, requests, rate_limited)
+
+def summarize(name, samples, errors=0, requests=0, rate_limited=0):
+    return {
+        "scenario": name,
+        "calls": len(samples),
+        "errors": errors,
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+        "server_requests": requests,
+        "rate_limited": rate_limited,
+    }
+
+def nonce():
+    return uuid.uuid4().hex[:8]
+
+# ------------------ Scenarios ------------------
+
+def api_scenarios(iterations, servers):
+    from core import weather_api, spotify_api, openai_api
+
+    def weather_fetch(i):
+        with weather_api.cache_lock:
+            weather_api.weather_cache.clear()
+            weather_api.report_cache.clear()
+        return not failed(weather_api.get_weather("Berlin"))
+
+    def openai_first_sentence(i):
+        started = time.perf_counter()
+        sentences = openai_api.split_sentences(openai_api.stream_ai_response(f"Tell me about {nonce()}"))
+        first = next(sentences, None)
+        ms = (time.perf_counter() - started) * 1000
+        for _ in sentences:
+            pass  # Drain so the connection goes back to the pool
+        return not failed(first), ms
+
+    weather_api.get_weather("Berlin")  # Warm the cached scenario
+    return [
+        measure("weather_fetch", weather_fetch, iterations, servers),
+        measure("weather_cached", lambda i: not failed(weather_api.get_weather("Berlin")), iterations, servers),
+        measure("spotify_playback_state", lambda i: spotify_api.get_playback_state() is not None, iterations, servers),
+        measure("spotify_next", lambda i: not failed(spotify_api.next_track()), iterations, servers),
+        measure("spotify_play_song", lambda i: not failed(spotify_api.play_specific_song(f"bench {nonce()}")), iterations, servers),
+        measure("openai_response", lambda i: not failed(openai_api.get_ai_response(f"Question {nonce()}")), iterations, servers),
+        measure("openai_first_sentence", openai_first_sentence, iterations, servers),
+    ]
+
+def voice_scenarios(iterations, servers):
+    """Injected commands through core.voice.handle_command, timed until Frosty would start speaking."""
+    try:
+        from core import tts, voice, weather_api
+    except ImportError as e:
+        print(f"⚠️ Skipping voice benchmarks ({e})")
+        return []
+
+    log = SpokenLog()
+    tts.tts_worker = log  # Nothing is spoken; the first say() marks the answer
+
+    def command(text, before=None):
+        def run(i):
+            if before:
+                before()
+            log.reset()
+            started = time.perf_counter()
+            voice.handle_command(text.format(nonce=nonce()))
+            answered = log.first.wait(VOICE_TIMEOUT)
+            ms = (time.perf_counter() - started) * 1000
+            log.wait_idle(VOICE_TIMEOUT)
+            return answered and not failed(log.spoken[0]), ms
+        return run
+
+    def clear_weather():
+        with weather_api.cache_lock:
+            weather_api.weather_cache.clear()
+            weather_api.report_cache.clear()
+
+    return [
+        measure("voice_weather", command("what's the weather in paris", clear_weather), iterations, servers),
+        measure("voice_pause", command("pause the music"), iterations, servers),
+        measure("voice_next", command("next song"), iterations, servers),
+        measure("voice_now_playing", command("what's playing"), iterations, servers),
+        measure("voice_ai", command("tell me something about {nonce}"), iterations, servers),
+    ]
+
+def render_scenarios(iterations, seconds):
+    from render_benchmarks import bench_update_rotation, bench_pygame_loop
+
+    results = []
+    samples, stats = bench_update_rotation(iterations)
+    results.append(summarize(f"qt_update_rotation ({stats['mode']})", samples))
+
+    for mode in ("classic", "cached"):
+        frame_stats = bench_pygame_loop(seconds, mode)
+        result = {"scenario": f"pygame_loop ({mode})", "calls": frame_stats.frames,
+                  "max_ms": round(frame_stats.max_ms, 2), "histogram": frame_stats.histogram()}
+        results.append(result)
+    return results
+
+# ------------------ Report ------------------
+
+def print_report(results):
+    print()
+    print(f"{'scenario':32} {'calls':>6} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'requests':>9} {'429s':>5}")
+    for result in results:
+        if "histogram" in result:
+            buckets = " ".join(f"{label}:{count}" for label, count in result["histogram"].items())
+            print(f"{result['scenario']:32} {result['calls']:>6} frames, max {result['max_ms']}ms | {buckets}")
+            continue
+        print(f"{result['scenario']:32} {result['calls']:>6} {result['errors']:>6} {result['p50_ms']:>8} "
+              f"{result['p95_ms']:>8} {result['p99_ms']:>8} {result['server_requests']:>9} {result['rate_limited']:>5}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Frosty end-to-end latency benchmarks")
+    parser.add_argument("--iterations", type=int, default=30, help="Calls per scenario")
+    parser.add_argument("--only", default=",".join(GROUPS), help="Comma-separated groups: " + ", ".join(GROUPS))
+    parser.add_argument("--latency-ms", type=float, default=80, help="Base latency of every fake API")
+    parser.add_argument("--jitter-ms", type=float, default=40, help="Random extra latency (0..jitter)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--token-delay-ms", type=float, default=15, help="Delay between streamed OpenAI tokens")
+    parser.add_argument("--render-iterations", type=int, default=300, help="Frames for the Qt micro-benchmark")
+    parser.add_argument("--render-seconds", type=float, default=3, help="Seconds per pygame loop run")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for jitter and fault injection")
+    parser.add_argument("--quick", action="store_true", help="Few iterations, for CI")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.iterations = min(args.iterations, 5)
+        args.render_iterations = min(args.render_iterations, 60)
+        args.render_seconds = min(args.render_seconds, 1)
+    groups = [group.strip() for group in args.only.split(",") if group.strip()]
+    json_path = os.path.abspath(args.json) if args.json else None
+
+    servers = start_servers(args)
+    original_dir = os.getcwd()
+    workdir = prepare_workdir(servers)
+    print(f"🧪 Fake APIs: " + ", ".join(f"{name} {server.url}" for name, server in servers.items()))
+
+    results = []
+    try:
+        if "api" in groups:
+            results += api_scenarios(args.iterations, servers)
+        if "voice" in groups:
+            results += voice_scenarios(args.iterations, servers)
+        if "render" in groups:
+            results += render_scenarios(args.render_iterations, args.render_seconds)
+    finally:
+        os.chdir(original_dir)
+        for server in servers.values():
+            server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(results)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+
+    # A scenario where every call failed means something is broken, not just slow
+    broken = [result["scenario"] for result in results if result.get("errors") and result["errors"] == result["calls"]]
+    if broken:
+        print(f"❌ Every call failed in: {', '.join(broken)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
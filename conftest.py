@@ -0,0 +1 @@
+# Lets the tests in tests/ import the project's packages (core, ui, integrations) from the repo root.
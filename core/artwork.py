@@ -0,0 +1,215 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from core.http_pool import get_session, get_timeout
+
+# Artwork cache settings (override in .env)
+ARTWORK_CACHE_DIR = os.getenv("ARTWORK_CACHE_DIR", ".artwork_cache")
+ARTWORK_CACHE_MB = int(os.getenv("ARTWORK_CACHE_MB", "50"))  # Downloaded covers kept on disk
+ARTWORK_MEMORY_ITEMS = int(os.getenv("ARTWORK_MEMORY_ITEMS", "16"))  # Decoded covers kept in memory
+FETCH_WORKERS = 2
+
+def image_url(item, size):
+    """
+    Picks the smallest album image at least size pixels wide from a track item
+    (Spotify lists them largest first). Returns None if the track has no art.
+    """
+    images = ((item or {}).get("album") or {}).get("images") or []
+    if not images:
+        return None
+    fitting = [image for image in images if (image.get("width") or 0) >= size]
+    return (fitting[-1] if fitting else images[0])["url"]
+
+def decode_qimage(data, size):
+    """Qt decoder: QImage is safe to build off the GUI thread (convert to QPixmap on it)."""
+    from PyQt6.QtGui import QImage
+    from PyQt6.QtCore import Qt
+    image = QImage.fromData(data)
+    if image.isNull():
+        raise ValueError("not an image")
+    return image.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+def decode_pygame(data, size):
+    """pygame decoder: a plain Surface scaled to display size."""
+    import pygame
+    image = pygame.image.load(io.BytesIO(data))
+    return pygame.transform.smoothscale(image, (size, size))
+
+class ArtworkCache:
+    """
+    Album art for one frontend and display size.
+
+    Covers are downloaded on background threads into a size-bounded disk cache
+    (ARTWORK_CACHE_DIR, oldest files evicted first), decoded at display size by
+    the frontend's decoder and kept in a small in-memory LRU. When the track
+    changes, the next track in the Spotify queue is prefetched so its art is
+    already decoded when it starts.
+    """
+
+    def __init__(self, decode, size, cache_dir=ARTWORK_CACHE_DIR, max_mb=ARTWORK_CACHE_MB,
+                 memory_items=ARTWORK_MEMORY_ITEMS, upcoming=None):
+        self.decode = decode
+        self.size = size
+        self.cache_dir = cache_dir
+        self.max_bytes = max_mb * 1024 * 1024
+        self.memory_items = memory_items
+        self.upcoming = upcoming  # Returns the next track items (defaults to the Spotify queue, via the broker)
+        self.memory = OrderedDict()  # url -> decoded image, least recently used first
+        self.in_flight = {}  # url -> callbacks waiting for it
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="artwork")
+        self.current_track = None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "downloads": 0, "prefetches": 0,
+                      "errors": 0, "decode_ms": 0.0}
+
+    def get(self, url):
+        """Returns the decoded image if it is already in memory, without any I/O."""
+        with self.lock:
+            image = self.memory.get(url)
+            if image is not None:
+                self.memory.move_to_end(url)
+                self.stats["memory_hits"] += 1
+            return image
+
+    def request(self, url, callback=None):
+        """
+        Load url in the background and call callback(url, image) on a worker
+        thread (image is None if it could not be loaded). Calls back right away,
+        on the calling thread, when the image is already in memory.
+        """
+        image = self.get(url)
+        if image is not None:
+            if callback:
+                callback(url, image)
+            return
+
+        with self.lock:
+            waiting = self.in_flight.get(url)
+            if waiting is not None:
+                if callback:
+                    waiting.append(callback)  # Already being fetched
+                return
+            self.in_flight[url] = [callback] if callback else []
+        self.pool.submit(self.load, url)
+
+    def url_for(self, playback):
+        """The art URL show() will load for this playback payload (None if the track has none)."""
+        return image_url((playback or {}).get("item"), self.size)
+
+    def show(self, playback, callback):
+        """
+        Fetch the art for the playing track and prefetch the next one when the
+        track changed. Art already in memory is passed to callback before this
+        returns, so callers must note url_for(playback) as current first.
+        """
+        item = (playback or {}).get("item")
+        url = self.url_for(playback)
+        if url:
+            self.request(url, callback)
+
+        track_id = item.get("id") if item else None
+        if track_id and track_id != self.current_track:
+            self.current_track = track_id
+            self.pool.submit(self.prefetch_next)
+        return url
+
+    def prefetch_next(self):
+        try:
+            if self.upcoming is None:
+                # Through the broker like every other Spotify call, so frontends share one client
+                from core.broker_client import get_broker
+                self.upcoming = lambda: get_broker().call("upcoming_tracks", 1)
+            for item in self.upcoming():
+                url = image_url(item, self.size)
+                if url:
+                    self.stats["prefetches"] += 1
+                    self.request(url)
+        except Exception as e:
+            print(f"⚠️ Could not prefetch next artwork: {e}")
+
+    def load(self, url):
+        image = None
+        try:
+            data = self.read_disk(url)
+            if data is None:
+                data = self.download(url)
+            started = time.perf_counter()
+            image = self.decode(data, self.size)
+            self.stats["decode_ms"] += (time.perf_counter() - started) * 1000
+            with self.lock:
+                self.memory[url] = image
+                self.memory.move_to_end(url)
+                while len(self.memory) > self.memory_items:
+                    self.memory.popitem(last=False)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"❌ Could not load artwork: {e}")
+
+        with self.lock:
+            callbacks = self.in_flight.pop(url, [])
+        for callback in callbacks:
+            try:
+                callback(url, image)
+            except Exception as e:
+                print(f"⚠️ Artwork callback failed: {e}")
+
+    def disk_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".img")
+
+    def read_disk(self, url):
+        path = self.disk_path(url)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        os.utime(path)  # Mark as recently used for eviction
+        self.stats["disk_hits"] += 1
+        return data
+
+    def download(self, url):
+        response = get_session("artwork").get(url, timeout=get_timeout("artwork"))
+        response.raise_for_status()
+        data = response.content
+        self.stats["downloads"] += 1
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self.disk_path(url)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self.trim_disk()
+        except OSError as e:
+            print(f"⚠️ Could not save artwork to disk: {e}")
+        return data
+
+    def trim_disk(self):
+        """Delete the least recently used covers until the disk cache fits ARTWORK_CACHE_MB."""
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".img"):
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def cache_stats(self):
+        """Returns hit counts, downloads, prefetches and average decode time."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats["memory_items"] = len(self.memory)
+        decoded = stats["downloads"] + stats["disk_hits"]
+        stats["avg_decode_ms"] = round(stats.pop("decode_ms") / decoded, 2) if decoded else 0.0
+        return stats
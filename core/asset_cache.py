@@ -0,0 +1,241 @@
+import hashlib
+import importlib.util
+import os
+import struct
+import sys
+import time
+
+# Allow running as a script (python core/asset_cache.py build) from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Asset cache settings (override in .env)
+ASSET_CACHE_DIR = os.getenv("ASSET_CACHE_DIR", ".asset_cache")
+
+# Display-sized variants used by the frontends: (source, size in pixels)
+DISPLAY_VARIANTS = [
+    ("assets/vinyl.png", 600),  # Qt VinylScreen
+    ("assets/vinyl.png", 400),  # pygame vinyl player
+    ("assets/background.gif", 1080),  # Qt HomeScreen background (needs Pillow, only if the source is larger)
+]
+
+# Pre-scaling animated GIFs needs Pillow (pip install Pillow); without it QMovie scales at runtime
+PILLOW_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+source_hashes = {}  # (path, mtime, size) -> sha1
+loaded = {}  # (frontend, path, size) -> decoded image
+load_stats = {}  # "path@size" -> {"decode_ms", "bytes", "cached"}
+
+def source_hash(path):
+    """sha1 of the source file, remembered while its mtime and size are unchanged."""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime, stat.st_size)
+    if key not in source_hashes:
+        with open(path, "rb") as f:
+            source_hashes[key] = hashlib.sha1(f.read()).hexdigest()[:12]
+    return source_hashes[key]
+
+def image_size(path):
+    """(width, height) from a PNG or GIF header, or None for other formats."""
+    with open(path, "rb") as f:
+        header = f.read(24)
+    if header.startswith(b"\x89PNG") and len(header) >= 24:
+        return struct.unpack(">II", header[16:24])
+    if header[:4] == b"GIF8" and len(header) >= 10:
+        return struct.unpack("<HH", header[6:10])
+    return None
+
+def worth_prescaling(path, size):
+    """
+    Only sources larger than the display size get a variant: an upscaled copy
+    would be bigger on disk and in memory than scaling at display time.
+    """
+    dimensions = image_size(path)
+    return dimensions is None or max(dimensions) > size
+
+def variant_path(path, size, extension=None):
+    """Cache file for a display-sized variant, e.g. .asset_cache/vinyl-3f2a9c1b7d4e-600.png."""
+    name, source_extension = os.path.splitext(os.path.basename(path))
+    return os.path.join(ASSET_CACHE_DIR, f"{name}-{source_hash(path)}-{size}{extension or source_extension}")
+
+def write_atomic(target, save):
+    """Run save(tmp_path) and move the result into place, so readers never see half a file."""
+    os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+    tmp_path = target + ".part" + os.path.splitext(target)[1]
+    save(tmp_path)
+    os.replace(tmp_path, target)
+
+# ------------------ Builders ------------------
+
+def build_png_qt(path, size, target):
+    from PyQt6.QtGui import QImage
+    from PyQt6.QtCore import Qt
+    image = QImage(path).scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    write_atomic(target, lambda tmp_path: image.save(tmp_path, "PNG"))
+
+def build_png_pygame(path, size, target):
+    import pygame
+    image = pygame.transform.smoothscale(pygame.image.load(path), (size, size))
+    write_atomic(target, lambda tmp_path: pygame.image.save(image, tmp_path))
+
+def build_gif(path, size, target):
+    """Scale every frame of an animated GIF once, keeping frame timing and looping."""
+    from PIL import Image, ImageSequence
+
+    with Image.open(path) as gif:
+        frames, durations = [], []
+        for frame in ImageSequence.Iterator(gif):
+            frames.append(frame.convert("RGBA").resize((size, size), Image.LANCZOS))
+            durations.append(frame.info.get("duration", gif.info.get("duration", 100)))
+        loop = gif.info.get("loop", 0)
+
+    write_atomic(target, lambda tmp_path: frames[0].save(
+        tmp_path, format="GIF", save_all=True, append_images=frames[1:],
+        duration=durations, loop=loop, disposal=2, optimize=False))
+
+def ensure_variant(path, size, builder):
+    """Returns the cached variant path, building it first if needed."""
+    target = variant_path(path, size, ".gif" if builder is build_gif else ".png")
+    if not os.path.exists(target):
+        started = time.perf_counter()
+        builder(path, size, target)
+        print(f"🖼️ Built {target} in {(time.perf_counter() - started) * 1000:.0f}ms")
+    return target
+
+def record(path, size, started, nbytes, cached):
+    load_stats[f"{path}@{size}"] = {
+        "decode_ms": round((time.perf_counter() - started) * 1000, 1),
+        "bytes": nbytes,
+        "cached": cached,
+    }
+
+# ------------------ Loaders ------------------
+
+def load_qpixmap(path, size):
+    """A size x size QPixmap of path, decoded from the pre-scaled cache (GUI thread only)."""
+    from PyQt6.QtGui import QPixmap
+    key = ("qt", path, size)
+    if key not in loaded:
+        started = time.perf_counter()
+        try:
+            if not worth_prescaling(path, size):
+                raise OSError("source is not larger than the display size")
+            pixmap = QPixmap(ensure_variant(path, size, build_png_qt))
+            cached = True
+        except OSError as e:
+            from PyQt6.QtCore import Qt
+            print(f"⚠️ Not using the asset cache ({e}), scaling {path} at runtime.")
+            pixmap = QPixmap(path).scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+            cached = False
+        record(path, size, started, pixmap.width() * pixmap.height() * pixmap.depth() // 8, cached)
+        loaded[key] = pixmap
+    return loaded[key]
+
+def load_surface(path, size):
+    """A size x size pygame Surface of path, decoded from the pre-scaled cache."""
+    import pygame
+    key = ("pygame", path, size)
+    if key not in loaded:
+        started = time.perf_counter()
+        try:
+            if not worth_prescaling(path, size):
+                raise OSError("source is not larger than the display size")
+            surface = pygame.image.load(ensure_variant(path, size, build_png_pygame))
+            cached = True
+        except (OSError, pygame.error) as e:
+            print(f"⚠️ Not using the asset cache ({e}), scaling {path} at runtime.")
+            surface = pygame.transform.smoothscale(pygame.image.load(path), (size, size))
+            cached = False
+        record(path, size, started, surface.get_width() * surface.get_height() * surface.get_bytesize(), cached)
+        loaded[key] = surface
+    return loaded[key]
+
+def movie_path(path, size, build=True):
+    """
+    Path of a GIF pre-scaled to size, or None when there is none (then the
+    caller should scale at runtime with QMovie.setScaledSize). Re-encoding
+    every frame takes a while, so with build=False only an existing variant
+    is returned; build it off the GUI thread.
+    """
+    if not PILLOW_AVAILABLE or not worth_prescaling(path, size):
+        return None
+    try:
+        if not build:
+            target = variant_path(path, size, ".gif")
+            return target if os.path.exists(target) else None
+        return ensure_variant(path, size, build_gif)
+    except Exception as e:
+        print(f"⚠️ Could not pre-scale {path}: {e}")
+        return None
+
+def asset_stats():
+    """Decode time (ms), resident bytes and cache use of every asset loaded so far."""
+    return {name: dict(stats) for name, stats in load_stats.items()}
+
+# ------------------ Build CLI ------------------
+
+def measure_qt(path, size):
+    """(decode ms, resident bytes) for loading path at display size the old way vs from the cache (None if not cached)."""
+    from PyQt6.QtGui import QImage
+    from PyQt6.QtCore import Qt
+
+    started = time.perf_counter()
+    original = QImage(path)
+    original.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    before = ((time.perf_counter() - started) * 1000, original.sizeInBytes())
+    if not worth_prescaling(path, size):
+        return before, None  # The loaders scale it at display time instead
+
+    target = ensure_variant(path, size, build_png_qt)  # Build outside the timing
+    started = time.perf_counter()
+    variant = QImage(target)
+    after = ((time.perf_counter() - started) * 1000, variant.sizeInBytes())
+    return before, after
+
+def measure_movie(path, size):
+    """Per-loop decode ms and frame bytes of the background GIF, scaled at runtime vs pre-scaled."""
+    from PyQt6.QtGui import QImageReader
+    from PyQt6.QtCore import QSize
+
+    def decode_all(file_path, scaled):
+        reader = QImageReader(file_path)
+        if scaled:
+            reader.setScaledSize(QSize(size, size))
+        started = time.perf_counter()
+        frame_bytes = 0
+        while reader.canRead():
+            frame = reader.read()
+            if frame.isNull():
+                break
+            frame_bytes = frame.sizeInBytes()
+        return (time.perf_counter() - started) * 1000, frame_bytes
+
+    before = decode_all(path, True)
+    prescaled = movie_path(path, size)
+    after = decode_all(prescaled, False) if prescaled else None
+    return before, after
+
+def build(variants=DISPLAY_VARIANTS):
+    """Build every display variant and print decode time and memory before/after."""
+    print(f"Asset cache: {os.path.abspath(ASSET_CACHE_DIR)}")
+    for path, size in variants:
+        if path.endswith(".gif"):
+            before, after = measure_movie(path, size)
+            label = "one loop"
+        else:
+            before, after = measure_qt(path, size)
+            label = "load"
+
+        line = f"{path} @ {size}px ({label}): runtime-scaled {before[0]:.1f}ms / {before[1] / 1024 / 1024:.1f} MB"
+        if after:
+            line += f"  ->  cached {after[0]:.1f}ms / {after[1] / 1024 / 1024:.1f} MB"
+        elif not worth_prescaling(path, size):
+            line += "  (source is smaller, scaled at display time)"
+        else:
+            line += "  (install Pillow to pre-scale)"
+        print(line)
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["build"]:
+        print("Usage: python -m core.asset_cache build")
+        sys.exit(1)
+    build()
@@ -0,0 +1,374 @@
+import glob
+import math
+import os
+import random
+import threading
+import time
+from array import array
+from collections import deque
+import speech_recognition as sr
+from core import tracing
+
+# Capture settings
+SAMPLE_RATE = 16000
+CHUNK = 1024  # Frames per read (~64 ms at 16 kHz)
+BUFFER_SECONDS = 10  # How much audio the ring buffer keeps
+CALIBRATION_SECONDS = 0.5  # One-time noise calibration when the stream opens
+
+# Audio source (override in .env): "microphone", or recorded sessions to replay instead,
+# comma-separated: WAV files, folders of WAV files and silence:<s>, noise:<s> or tone:<s> segments
+AUDIO_SOURCE = os.getenv("AUDIO_SOURCE", "microphone")
+AUDIO_REPLAY_SPEED = float(os.getenv("AUDIO_REPLAY_SPEED", "1"))  # 1 = real time, 4 = 4x faster, 0 = as fast as possible
+AUDIO_REPLAY_LOOP = os.getenv("AUDIO_REPLAY_LOOP", "0") == "1"  # Start over at the end instead of going silent
+REPLAY_LEAD_IN = 1.0  # Seconds of silence before the session (covers noise calibration)
+REPLAY_GAP = 1.0  # Seconds of silence after every file, so each utterance ends
+NOISE_LEVEL = 100  # RMS of synthetic noise segments (below MIN_ENERGY, so never speech)
+TONE_LEVEL = 3000  # Amplitude of synthetic tone segments (loud enough to count as speech)
+
+# Voice activity detection
+SPEECH_RATIO = float(os.getenv("VAD_SPEECH_RATIO", "2.5"))  # Speech = this many times louder than the noise floor
+MIN_ENERGY = 150  # Never treat anything quieter than this as speech
+NOISE_ADAPT_RATE = 0.05  # How quickly the noise floor follows quiet frames
+PRE_ROLL_SECONDS = 0.3  # Audio kept from before speech started
+END_SILENCE_SECONDS = 0.6  # Silence that ends an utterance
+
+# Wake word (offline keyword spotting through PocketSphinx)
+WAKE_WORD = "frosty"
+WAKE_WORD_SENSITIVITY = float(os.getenv("WAKE_WORD_SENSITIVITY", "1e-20"))
+WAKE_WORD_CLOUD = os.getenv("WAKE_WORD_CLOUD", "0") == "1"  # Without PocketSphinx, send every utterance to Google instead
+
+def frame_energy(frame):
+    """RMS energy of a block of 16-bit samples."""
+    samples = array("h", frame)
+    if not samples:
+        return 0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+def synthetic_segment(kind, seconds, sample_rate):
+    """16-bit mono PCM for a silence, noise (seeded, so replays are identical) or 440 Hz tone segment."""
+    count = int(seconds * sample_rate)
+    if kind == "silence":
+        return bytes(count * 2)
+    if kind == "noise":
+        rng = random.Random(count)
+        return array("h", (int(rng.gauss(0, NOISE_LEVEL)) for _ in range(count))).tobytes()
+    if kind == "tone":
+        step = 2 * math.pi * 440 / sample_rate
+        return array("h", (int(TONE_LEVEL * math.sin(i * step)) for i in range(count))).tobytes()
+    raise ValueError(f"Unknown segment: {kind}")
+
+def load_session(spec, sample_rate):
+    """
+    Decode a session spec into [(label, PCM bytes)], converted to 16-bit mono at sample_rate.
+
+    Example: "recordings/wake.wav,silence:2,recordings/commands/,noise:1.5"
+    """
+    recognizer = sr.Recognizer()
+    segments = []
+    for part in (part.strip() for part in spec.split(",")):
+        if not part:
+            continue
+        kind, _, seconds = part.partition(":")
+        if kind in ("silence", "noise", "tone") and seconds:
+            segments.append((part, synthetic_segment(kind, float(seconds), sample_rate)))
+            continue
+
+        paths = sorted(glob.glob(os.path.join(part, "*.wav"))) if os.path.isdir(part) else [part]
+        for path in paths:
+            with sr.AudioFile(path) as source:
+                audio = recognizer.record(source)
+            pcm = audio.get_raw_data(convert_rate=sample_rate, convert_width=2)
+            segments.append((os.path.basename(path), pcm + synthetic_segment("silence", REPLAY_GAP, sample_rate)))
+    if not segments:
+        raise ValueError(f"No audio in session: {spec}")
+    return segments
+
+class ReplaySource(sr.AudioSource):
+    """
+    Plays recorded sessions through the listening pipeline in place of sr.Microphone.
+
+    Audio is paced to speed x real time (0 = as fast as the reader takes it).
+    After the last segment it either loops or keeps returning silence with
+    finished set, like a quiet room.
+    """
+
+    def __init__(self, spec, speed=AUDIO_REPLAY_SPEED, loop=AUDIO_REPLAY_LOOP,
+                 sample_rate=SAMPLE_RATE, chunk_size=CHUNK):
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = chunk_size
+        self.speed = speed
+        self.loop = loop
+        self.wait_for_reader = speed == 0  # AudioStream then reads in lockstep with its listener
+        self.stream = None
+        self.finished = threading.Event()
+
+        self.marks = []  # (start byte, label) of every segment
+        parts = [synthetic_segment("silence", REPLAY_LEAD_IN, sample_rate)]
+        offset = len(parts[0])
+        for label, pcm in load_session(spec, sample_rate):
+            self.marks.append((offset, label))
+            parts.append(pcm)
+            offset += len(pcm)
+        self.data = b"".join(parts)
+        self.position = 0
+        self.loops = 0
+        self.bytes_read = 0
+        self.audio_bytes = 0  # Session audio only, without the silence after the end
+        self.started = None
+        self.finished_at = None
+
+    def __enter__(self):
+        self.stream = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+    def read(self, size):
+        """Next size frames of the session (what sr.Microphone's stream.read returns)."""
+        nbytes = size * self.SAMPLE_WIDTH
+        if self.started is None:
+            self.started = time.perf_counter()
+
+        if self.position >= len(self.data):
+            if self.loop:
+                self.position = 0
+                self.loops += 1
+            elif not self.finished.is_set():
+                self.finished_at = time.perf_counter()
+                self.finished.set()
+        chunk = self.data[self.position:self.position + nbytes]
+        self.position += len(chunk)
+        self.audio_bytes += len(chunk)
+        chunk += bytes(nbytes - len(chunk))
+        self.bytes_read += nbytes
+
+        if self.speed > 0:
+            due = self.started + self.bytes_read / self.SAMPLE_WIDTH / self.SAMPLE_RATE / self.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return chunk
+
+    def position_seconds(self):
+        return self.position / self.SAMPLE_WIDTH / self.SAMPLE_RATE
+
+    def label_at(self, seconds):
+        """Label of the segment playing at this point of the session."""
+        offset = seconds * self.SAMPLE_RATE * self.SAMPLE_WIDTH
+        label = "lead-in"
+        for start, name in self.marks:
+            if start > offset:
+                break
+            label = name
+        return label
+
+    def replay_stats(self):
+        """Audio delivered, wall time and the speed actually achieved."""
+        audio_s = self.audio_bytes / self.SAMPLE_WIDTH / self.SAMPLE_RATE
+        wall_s = (self.finished_at or time.perf_counter()) - self.started if self.started else 0.0
+        return {
+            "audio_s": round(audio_s, 2),
+            "wall_s": round(wall_s, 2),
+            "x_realtime": round(audio_s / wall_s, 1) if wall_s else 0.0,
+            "loops": self.loops,
+            "finished": self.finished.is_set(),
+        }
+
+def create_source(spec=AUDIO_SOURCE):
+    """The microphone, or a ReplaySource when AUDIO_SOURCE names recorded sessions."""
+    if spec == "microphone":
+        return sr.Microphone(sample_rate=SAMPLE_RATE, chunk_size=CHUNK)
+    print(f"📼 Replaying {spec} at {f'{AUDIO_REPLAY_SPEED:g}x' if AUDIO_REPLAY_SPEED else 'full'} speed instead of the microphone")
+    return ReplaySource(spec)
+
+class AudioStream:
+    """
+    Keeps one microphone stream open and records it into a ring buffer.
+
+    A background thread reads the source continuously and tracks the noise
+    floor from quiet frames, so there is no per-utterance calibration.
+    read_utterance() cuts speech out of the buffer with a simple energy VAD.
+    """
+
+    def __init__(self, source=None):
+        self.source = source or create_source()
+        self.frames = deque()  # (index, frame bytes, energy)
+        self.max_frames = 1
+        self.next_index = 0
+        self.noise_floor = None
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+        self.stats = {"frames": 0, "dropped": 0}  # dropped: fell out of the buffer before being read
+        self.listening = False  # True while read_utterance runs
+        self.read_index = 0  # Next frame the reader has not taken yet
+        self.lockstep = getattr(self.source, "wait_for_reader", False)
+
+    def start(self):
+        """Open the source, calibrate once and start capturing in the background."""
+        if self.running:
+            return
+
+        with tracing.span("microphone.open"):
+            self.source.__enter__()
+        self.max_frames = int(BUFFER_SECONDS * self.source.SAMPLE_RATE / self.source.CHUNK)
+
+        with tracing.span("microphone.calibrate"):
+            calibration_frames = max(1, int(CALIBRATION_SECONDS * self.source.SAMPLE_RATE / self.source.CHUNK))
+            energies = [frame_energy(self.source.stream.read(self.source.CHUNK)) for _ in range(calibration_frames)]
+            self.noise_floor = sum(energies) / len(energies)
+        print(f"🎤 Microphone open (noise floor {self.noise_floor:.0f})")
+
+        self.running = True
+        self.thread = threading.Thread(target=self.capture, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+        self.source.__exit__(None, None, None)
+
+    def capture(self):
+        while self.running:
+            if self.lockstep:
+                # Replay at maximum speed: read a frame only once the listener took the last one
+                with self.condition:
+                    if not (self.listening and self.read_index >= self.next_index):
+                        self.condition.wait(0.1)
+                        continue
+            try:
+                frame = self.source.stream.read(self.source.CHUNK)
+            except (OSError, IOError) as e:
+                print(f"❌ Audio capture error: {e}")
+                time.sleep(0.1)
+                continue
+
+            energy = frame_energy(frame)
+            if not self.is_speech(energy):
+                # Follow slow changes in background noise
+                self.noise_floor += (energy - self.noise_floor) * NOISE_ADAPT_RATE
+
+            with self.condition:
+                self.frames.append((self.next_index, frame, energy))
+                self.next_index += 1
+                self.stats["frames"] += 1
+                while len(self.frames) > self.max_frames:
+                    self.frames.popleft()
+                self.condition.notify_all()
+
+    def stream_stats(self):
+        """Frames captured, audio seconds and frames dropped because the reader fell behind."""
+        rate = self.source.SAMPLE_RATE / self.source.CHUNK
+        return dict(self.stats, audio_s=round(self.stats["frames"] / rate, 2),
+                    noise_floor=round(self.noise_floor or 0, 1))
+
+    def is_speech(self, energy):
+        return energy > max(self.noise_floor * SPEECH_RATIO, MIN_ENERGY)
+
+    def frames_since(self, cursor, timeout):
+        """Returns buffered frames with index >= cursor, waiting up to timeout for new ones."""
+        with self.condition:
+            if self.next_index <= cursor:
+                self.condition.wait(timeout)
+            oldest = self.frames[0][0] if self.frames else self.next_index
+            if cursor < oldest:
+                self.stats["dropped"] += oldest - cursor
+            start = max(cursor, oldest)  # Skip audio that already fell out of the buffer
+            self.read_index = self.next_index
+            self.condition.notify_all()
+            return [item for item in self.frames if item[0] >= start]
+
+    def read_utterance(self, timeout=None, phrase_time_limit=8, on_frame=None):
+        """
+        Wait for speech and return it as sr.AudioData.
+
+        Args:
+            timeout (float): Seconds to wait for speech to start (None waits forever).
+            phrase_time_limit (float): Longest utterance to record.
+            on_frame (callable): Called with each utterance frame as it is captured
+                (for streaming recognizers); returning True ends the utterance early.
+
+        Returns:
+            sr.AudioData or None if nobody spoke before the timeout.
+        """
+        rate = self.source.SAMPLE_RATE / self.source.CHUNK  # Frames per second
+        pre_roll = int(PRE_ROLL_SECONDS * rate)
+        end_silence = int(END_SILENCE_SECONDS * rate)
+        max_frames = int(phrase_time_limit * rate)
+
+        with self.condition:
+            # Only listen to audio from now on (in lockstep, from where the last listen stopped)
+            cursor = self.read_index if self.lockstep else self.next_index
+            self.listening = True
+            self.condition.notify_all()
+        started = time.time()
+        history = deque(maxlen=pre_roll)
+        utterance = []
+        silent = 0
+
+        try:
+            while True:
+                if not utterance and timeout is not None and time.time() - started > timeout:
+                    return None
+
+                for index, frame, energy in self.frames_since(cursor, 0.5):
+                    cursor = index + 1
+                    speech = self.is_speech(energy)
+
+                    if not utterance:
+                        if speech:
+                            utterance = list(history) + [frame]
+                            if on_frame and any([on_frame(f) for f in utterance]):
+                                return sr.AudioData(b"".join(utterance), self.source.SAMPLE_RATE, self.source.SAMPLE_WIDTH)
+                        else:
+                            history.append(frame)
+                        continue
+
+                    utterance.append(frame)
+                    silent = 0 if speech else silent + 1
+                    done = on_frame(frame) if on_frame else False
+                    if done or silent >= end_silence or len(utterance) >= max_frames:
+                        return sr.AudioData(b"".join(utterance), self.source.SAMPLE_RATE, self.source.SAMPLE_WIDTH)
+        finally:
+            self.listening = False
+
+class WakeWordDetector:
+    """
+    Offline wake word check, so idle chatter never goes to the cloud recognizer.
+
+    Needs PocketSphinx. Checking with Google instead (every utterance, Frosty's
+    own replies included, is uploaded) only happens with WAKE_WORD_CLOUD=1.
+    """
+
+    def __init__(self, recognizer, wake_word=WAKE_WORD, cloud=WAKE_WORD_CLOUD):
+        self.recognizer = recognizer
+        self.wake_word = wake_word
+        try:
+            import pocketsphinx  # noqa: F401
+            self.offline = True
+        except ImportError:
+            if not cloud:
+                raise RuntimeError("PocketSphinx is needed for the offline wake word (pip install pocketsphinx), "
+                                   "or set WAKE_WORD_CLOUD=1 to check with Google instead") from None
+            print("⚠️ PocketSphinx not installed, wake word check uses Google recognition (WAKE_WORD_CLOUD=1).")
+            self.offline = False
+
+    def heard(self, audio):
+        """Returns True if the wake word is in this utterance."""
+        try:
+            if self.offline:
+                keywords = self.recognizer.recognize_sphinx(
+                    audio, keyword_entries=[(self.wake_word, WAKE_WORD_SENSITIVITY)]
+                )
+            else:
+                keywords = self.recognizer.recognize_google(audio).lower()
+        except sr.UnknownValueError:
+            return False
+        except sr.RequestError as e:
+            print(f"❌ Wake word check failed: {e}")
+            return False
+
+        return self.wake_word in keywords
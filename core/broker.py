@@ -0,0 +1,300 @@
+# Frosty broker: one resident process that owns the Spotify, weather and
+# OpenAI clients and their caches, shared by the Qt UI, the voice loop and
+# the pygame player (see core/broker_client.py).
+#
+# Run it with:  python -m core.broker
+#
+# Protocol (newline-delimited JSON over a Unix domain socket):
+#   -> {"id": 1, "call": "weather", "args": ["Berlin"]}
+#   <- {"id": 1, "result": "..."}                or {"id": 1, "error": "..."}
+#   -> {"id": 2, "call": "ai_stream", "args": ["Tell me a joke"]}
+#   <- {"id": 2, "partial": "Why ..."} ... {"id": 2, "result": null}
+#   -> {"id": 3, "subscribe": "playback"}
+#   <- {"id": 3, "result": true}, then {"event": "playback", "data": {...}} on every change
+#   -> {"id": 4, "unsubscribe": "playback"}
+#   -> {"id": 5, "call": "activity", "args": ["voice"]}   (sent as an "activity" event to subscribers)
+
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+
+# Allow running as a script (python core/broker.py) from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file (FROSTY_SOCKET is read below)
+load_dotenv()
+
+def default_socket_path():
+    """$XDG_RUNTIME_DIR/frosty.sock, else frosty.sock in a private frosty-<uid> directory in the temp dir."""
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "frosty.sock")
+    user = os.getuid() if hasattr(os, "getuid") else os.getenv("USERNAME", "user")
+    return os.path.join(tempfile.gettempdir(), f"frosty-{user}", "frosty.sock")
+
+SOCKET_PATH = os.getenv("FROSTY_SOCKET") or default_socket_path()
+SPOTIFY_COMMAND_TIMEOUT = 30  # Seconds a client waits for a queued Spotify command
+
+activity_subscribers = []
+activity_lock = threading.Lock()
+
+# ------------------ Socket ownership ------------------
+# Other local users must not be able to plant a socket the frontends would talk
+# to, or trick the broker into deleting their files.
+
+def private_dir(directory):
+    """True if only this user can add or remove files in directory (or it is a sticky dir like /tmp)."""
+    try:
+        info = os.stat(directory)
+    except OSError:
+        return False
+    if info.st_uid == os.getuid():
+        return not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    return info.st_uid == 0 and bool(info.st_mode & stat.S_ISVTX)
+
+def trusted_socket(path):
+    """True if path is a Unix socket owned by this user in a directory others can't tamper with."""
+    if not hasattr(os, "getuid"):
+        return os.path.exists(path)  # No Unix ownership to check
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return (stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+            and private_dir(os.path.dirname(os.path.abspath(path))))
+
+def prepare_socket_dir(path):
+    """Create the socket's directory (0700) if needed. Returns False if it isn't private to this user."""
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    except OSError as e:
+        print(f"❌ Could not create {directory}: {e}")
+        return False
+    return private_dir(directory)
+
+# ------------------ Calls ------------------
+# Each handler runs in the broker process; core modules are imported on first use.
+
+def call_weather(city):
+    from core.weather_api import get_weather
+    return get_weather(city)
+
+def call_spotify(command, *args):
+    """Run a playback command through the shared (debounced) command queue and wait for it."""
+    from core.spotify_queue import get_command_queue
+    done = threading.Event()
+    result = {"message": None}
+
+    def on_done(message):
+        result["message"] = message
+        done.set()
+
+    get_command_queue().submit(command, *args, on_done=on_done)
+    done.wait(SPOTIFY_COMMAND_TIMEOUT)
+    return result["message"]  # None if it was merged into a later command
+
+def call_playback_state(max_age=None):
+    from core.playback_state import get_playback_service
+    return get_playback_service().get_state(max_age)
+
+def call_set_idle(idle):
+    """Frontends report when nobody is using them, so playback polling can slow down."""
+    from core.playback_state import get_playback_service
+    get_playback_service().set_idle(idle)
+    return True
+
+def call_activity(source):
+    """A frontend saw user input (e.g. a voice command); tells every subscribed UI to leave idle mode."""
+    with activity_lock:
+        callbacks = list(activity_subscribers)
+    for callback in callbacks:
+        try:
+            callback({"source": source})
+        except Exception as e:
+            print(f"⚠️ Activity subscriber failed: {e}")
+    return True
+
+def call_upcoming_tracks(limit=1):
+    from core.spotify_api import get_upcoming_tracks
+    return get_upcoming_tracks(limit)
+
+def call_ai(prompt):
+    from core.openai_api import get_ai_response
+    return get_ai_response(prompt)
+
+def call_ai_stream(prompt):
+    """Yields the reply sentence by sentence (sent to the client as partial messages)."""
+    from core.openai_api import stream_ai_response, split_sentences
+    yield from split_sentences(stream_ai_response(prompt))
+
+def call_new_conversation():
+    """The user woke Frosty again: follow-ups start over, so cached answers match again."""
+    from core.openai_api import clear_history
+    clear_history()
+    return True
+
+def call_stats():
+    from core.http_pool import connection_stats
+    from core.spotify_queue import queue_stats
+    from core.weather_api import weather_cache_stats
+    from core.openai_api import get_cache_stats
+    from core.playback_state import get_playback_service
+    return {
+        "connections": connection_stats(),
+        "spotify_queue": queue_stats(),
+        "weather_cache": weather_cache_stats(),
+        "ai_cache": get_cache_stats(),
+        "playback": dict(get_playback_service().stats),
+    }
+
+CALLS = {
+    "weather": call_weather,
+    "spotify": call_spotify,
+    "playback_state": call_playback_state,
+    "upcoming_tracks": call_upcoming_tracks,
+    "set_idle": call_set_idle,
+    "activity": call_activity,
+    "ai": call_ai,
+    "ai_stream": call_ai_stream,
+    "new_conversation": call_new_conversation,
+    "stats": call_stats,
+}
+
+STREAMING_CALLS = {"ai_stream"}
+
+def subscribe_topic(topic, callback):
+    """Subscribe callback(data) to a topic. Returns a function that unsubscribes it."""
+    if topic == "activity":
+        with activity_lock:
+            activity_subscribers.append(callback)
+        def unsubscribe():
+            with activity_lock:
+                if callback in activity_subscribers:
+                    activity_subscribers.remove(callback)
+        return unsubscribe
+    if topic != "playback":
+        raise ValueError(f"Unknown topic: {topic}")
+    from core.playback_state import get_playback_service
+    service = get_playback_service()
+    service.subscribe(callback)
+    return lambda: service.unsubscribe(callback)
+
+# ------------------ Server ------------------
+
+class BrokerHandler(socketserver.StreamRequestHandler):
+    """One connected frontend. Each request runs on its own thread so a slow call never blocks the others."""
+
+    def setup(self):
+        super().setup()
+        self.write_lock = threading.Lock()
+        self.subscriptions = {}  # topic -> unsubscribe function
+        self.connected = True
+
+    def send(self, message):
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        with self.write_lock:
+            if not self.connected:
+                return
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except OSError:
+                self.connected = False
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                continue
+            threading.Thread(target=self.dispatch, args=(request,), daemon=True).start()
+
+    def finish(self):
+        self.connected = False
+        for unsubscribe in self.subscriptions.values():
+            unsubscribe()
+        super().finish()
+
+    def dispatch(self, request):
+        request_id = request.get("id")
+        try:
+            if "subscribe" in request:
+                topic = request["subscribe"]
+                if topic not in self.subscriptions:
+                    self.subscriptions[topic] = subscribe_topic(
+                        topic, lambda data, topic=topic: self.send({"event": topic, "data": data}))
+                self.send({"id": request_id, "result": True})
+            elif "unsubscribe" in request:
+                unsubscribe = self.subscriptions.pop(request["unsubscribe"], None)
+                if unsubscribe:
+                    unsubscribe()
+                self.send({"id": request_id, "result": True})
+            elif request.get("call") in STREAMING_CALLS:
+                for part in CALLS[request["call"]](*request.get("args", [])):
+                    self.send({"id": request_id, "partial": part})
+                self.send({"id": request_id, "result": None})
+            else:
+                handler = CALLS[request["call"]]
+                self.send({"id": request_id, "result": handler(*request.get("args", []))})
+        except Exception as e:
+            self.send({"id": request_id, "error": f"{type(e).__name__}: {e}"})
+
+# Unix domain sockets aren't available everywhere (e.g. older Windows builds);
+# clients fall back to running the calls in-process there.
+if hasattr(socketserver, "UnixStreamServer"):
+    class BrokerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:
+    BrokerServer = None
+
+def serve(path=SOCKET_PATH, warm=True):
+    """Run the broker until interrupted."""
+    if BrokerServer is None:
+        print("❌ Unix domain sockets are not supported here; frontends will run in-process.")
+        return
+
+    if not prepare_socket_dir(path):
+        print(f"❌ {os.path.dirname(os.path.abspath(path))} can be changed by other users; set FROSTY_SOCKET to a private path")
+        return
+
+    if os.path.lexists(path):
+        if not trusted_socket(path):
+            print(f"❌ {path} exists but is not this user's socket; leaving it alone")
+            return
+        # Refuse to steal the socket from a running broker, but clean up a stale one
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            print(f"❌ A broker is already running on {path}")
+            return
+        except OSError:
+            os.remove(path)
+        finally:
+            probe.close()
+
+    server = BrokerServer(path, BrokerHandler)
+    os.chmod(path, 0o600)
+    print(f"🛰️ Frosty broker listening on {path}")
+    if warm:
+        from core import warmup
+        warmup.start()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if trusted_socket(path):
+            os.remove(path)
+
+if __name__ == "__main__":
+    serve()
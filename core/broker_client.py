@@ -0,0 +1,183 @@
+import itertools
+import json
+import os
+import queue
+import socket
+import threading
+
+from core import broker, tracing
+
+# "auto" uses the broker daemon if it is running and runs in-process otherwise,
+# "local" never connects (override in .env)
+BROKER_MODE = os.getenv("FROSTY_BROKER", "auto")
+CALL_TIMEOUT = 60  # Seconds to wait for a broker reply
+
+class BrokerError(Exception):
+    """The broker ran the call but it failed (message from the broker)."""
+
+class BrokerClient:
+    """
+    Thin client for the broker daemon (core/broker.py).
+
+    One socket per process. A reader thread routes replies to the waiting
+    call by id and events to subscribers, so calls from several threads
+    (UI workers, voice loop) share the connection.
+    """
+
+    local = False
+
+    def __init__(self, path=broker.SOCKET_PATH):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.file = self.sock.makefile("rb")
+        self.ids = itertools.count(1)
+        self.waiting = {}  # id -> queue.Queue of replies
+        self.subscribers = {}  # topic -> callbacks
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        threading.Thread(target=self.read, daemon=True).start()
+
+    def send(self, message):
+        request_id = next(self.ids)
+        replies = queue.Queue()
+        with self.lock:
+            self.waiting[request_id] = replies
+        data = (json.dumps(dict(message, id=request_id)) + "\n").encode("utf-8")
+        with self.write_lock:
+            self.sock.sendall(data)
+        return request_id, replies
+
+    def reply(self, request_id, replies, timeout=CALL_TIMEOUT):
+        try:
+            message = replies.get(timeout=timeout)
+        except queue.Empty:
+            with self.lock:
+                self.waiting.pop(request_id, None)
+            raise TimeoutError("Broker did not answer in time")
+        if "error" in message:
+            raise BrokerError(message["error"])
+        return message
+
+    def call(self, name, *args, timeout=CALL_TIMEOUT):
+        """Run a broker call and return its result."""
+        with tracing.span(f"broker.{name}"):
+            request_id, replies = self.send({"call": name, "args": args})
+            try:
+                return self.reply(request_id, replies, timeout)["result"]
+            finally:
+                with self.lock:
+                    self.waiting.pop(request_id, None)
+
+    def stream(self, name, *args, timeout=CALL_TIMEOUT):
+        """Run a streaming call, yielding each partial result as it arrives."""
+        span = tracing.start_span(f"broker.{name}")  # Not made current: the caller runs between parts
+        request_id, replies = self.send({"call": name, "args": args})
+        try:
+            while True:
+                message = self.reply(request_id, replies, timeout)
+                if "partial" not in message:
+                    return
+                yield message["partial"]
+        finally:
+            span.end()
+            with self.lock:
+                self.waiting.pop(request_id, None)
+
+    def subscribe(self, topic, callback):
+        """Call callback(data) (on the reader thread) for every event on topic."""
+        with self.lock:
+            callbacks = self.subscribers.setdefault(topic, [])
+            first = not callbacks
+            callbacks.append(callback)
+        if first:
+            self.send({"subscribe": topic})
+
+    def unsubscribe(self, topic, callback):
+        with self.lock:
+            callbacks = self.subscribers.get(topic, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            last = not callbacks
+        if last:
+            self.send({"unsubscribe": topic})
+
+    def read(self):
+        for line in self.file:
+            message = json.loads(line)
+            if "event" in message:
+                with self.lock:
+                    callbacks = list(self.subscribers.get(message["event"], []))
+                for callback in callbacks:
+                    try:
+                        callback(message["data"])
+                    except Exception as e:
+                        print(f"⚠️ Broker subscriber failed: {e}")
+                continue
+
+            with self.lock:
+                replies = self.waiting.get(message.get("id"))
+            if replies:
+                replies.put(message)
+
+        print("⚠️ Lost connection to the Frosty broker")
+        with self.lock:
+            waiting = list(self.waiting.values())
+        for replies in waiting:
+            replies.put({"error": "Broker connection closed"})
+
+class LocalBroker:
+    """Same interface as BrokerClient, but runs the broker calls in this process."""
+
+    local = True
+
+    def __init__(self):
+        self.unsubscribers = {}  # (topic, callback) -> unsubscribe function
+
+    def call(self, name, *args, timeout=None):
+        return broker.CALLS[name](*args)
+
+    def stream(self, name, *args, timeout=None):
+        yield from broker.CALLS[name](*args)
+
+    def subscribe(self, topic, callback):
+        self.unsubscribers[(topic, callback)] = broker.subscribe_topic(topic, callback)
+
+    def unsubscribe(self, topic, callback):
+        unsubscribe = self.unsubscribers.pop((topic, callback), None)
+        if unsubscribe:
+            unsubscribe()
+
+shared_broker = None
+broker_lock = threading.Lock()
+
+def get_broker():
+    """Returns the shared broker connection (the daemon if it is running, else in-process)."""
+    global shared_broker
+    with broker_lock:
+        if shared_broker is None:
+            if BROKER_MODE != "local" and hasattr(socket, "AF_UNIX") and os.path.lexists(broker.SOCKET_PATH):
+                if not broker.trusted_socket(broker.SOCKET_PATH):
+                    print(f"⚠️ {broker.SOCKET_PATH} is not this user's broker socket, running in-process.")
+                    shared_broker = LocalBroker()
+                    return shared_broker
+                try:
+                    shared_broker = BrokerClient()
+                    print(f"🛰️ Connected to Frosty broker at {broker.SOCKET_PATH}")
+                except OSError as e:
+                    print(f"⚠️ Broker not reachable ({e}), running in-process.")
+            if shared_broker is None:
+                shared_broker = LocalBroker()
+        return shared_broker
+
+def submit(name, *args, on_result=None):
+    """Run a broker call on a background thread and pass its result to on_result."""
+    span = tracing.start_span(f"submit.{name}", args=list(args))  # Keeps the caller's trace open
+    def run():
+        with tracing.use(span):
+            try:
+                result = get_broker().call(name, *args)
+            except Exception as e:
+                result = f"Error: {e}"
+            if on_result and result:
+                on_result(result)
+    threading.Thread(target=run, daemon=True).start()
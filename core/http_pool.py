@@ -0,0 +1,133 @@
+import importlib.util
+import os
+import threading
+import weakref
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Per-service settings: (connect, read) timeout in seconds and retry budget
+SERVICES = {
+    "openai": {"timeout": (5, float(os.getenv("OPENAI_TIMEOUT", "60"))), "retries": 2},
+    "weather": {"timeout": (3, float(os.getenv("WEATHER_TIMEOUT", "5"))), "retries": 2},
+    "spotify": {"timeout": (3, float(os.getenv("SPOTIFY_TIMEOUT", "5"))), "retries": 2},
+    "artwork": {"timeout": (3, 10), "retries": 1},  # Album covers from Spotify's image CDN
+}
+POOL_SIZE = 10  # Keep-alive connections per host
+
+# HTTP/2 needs the optional "h2" package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+sessions = {}
+http_clients = {}
+pool_lock = threading.Lock()
+metrics = {}
+metrics_hooks = []
+
+def record(service, reused):
+    """Count one request and tell any registered hooks whether its connection was reused."""
+    with pool_lock:
+        stats = metrics.setdefault(service, {"requests": 0, "new_connections": 0})
+        stats["requests"] += 1
+        if not reused:
+            stats["new_connections"] += 1
+
+    for hook in metrics_hooks:
+        try:
+            hook(service, reused)
+        except Exception as e:
+            print(f"⚠️ HTTP metrics hook failed: {e}")
+
+def add_metrics_hook(hook):
+    """Register hook(service, reused) to be called after every pooled request."""
+    metrics_hooks.append(hook)
+
+class CountingAdapter(HTTPAdapter):
+    """HTTPAdapter that notices when urllib3 had to open a new connection."""
+
+    def __init__(self, service, **kwargs):
+        self.service = service
+        self.connections_seen = 0
+        self.count_lock = threading.Lock()
+        super().__init__(**kwargs)
+
+    def open_connections(self):
+        pools = self.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        with self.count_lock:
+            total = self.open_connections()
+            reused = total <= self.connections_seen
+            self.connections_seen = max(total, self.connections_seen)
+        record(self.service, reused)
+        return response
+
+def get_session(service):
+    """Returns the shared keep-alive requests.Session for a service."""
+    with pool_lock:
+        session = sessions.get(service)
+        if session:
+            return session
+
+        retry = Retry(
+            total=SERVICES[service]["retries"],
+            backoff_factor=0.3,
+            status_forcelist=(500, 502, 503, 504),
+            # urllib3 would otherwise retry any 429 (or 503) carrying Retry-After and sleep for as
+            # long as the server asks, blocking the pooled request. 429s reach the caller instead:
+            # Spotify commands honor Retry-After in core.spotify_queue (with a cap, and counted in
+            # its stats), and weather and artwork calls fall back to their caches.
+            respect_retry_after_header=False,
+        )
+        adapter = CountingAdapter(service, pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        sessions[service] = session
+        return session
+
+def get_timeout(service):
+    """Returns the (connect, read) timeout for a service."""
+    return SERVICES[service]["timeout"]
+
+def get_retries(service):
+    return SERVICES[service]["retries"]
+
+def get_http_client(service):
+    """Returns a shared httpx.Client (HTTP/2 when h2 is installed) for SDKs built on httpx."""
+    import httpx
+
+    with pool_lock:
+        client = http_clients.get(service)
+        if client:
+            return client
+
+        streams_seen = weakref.WeakSet()
+
+        def on_response(response):
+            stream = response.extensions.get("network_stream")
+            if stream is None:
+                record(service, True)
+                return
+            record(service, stream in streams_seen)
+            streams_seen.add(stream)
+
+        connect, read = SERVICES[service]["timeout"]
+        client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE),
+            event_hooks={"response": [on_response]},
+        )
+        http_clients[service] = client
+        return client
+
+def connection_stats():
+    """Returns requests, new connections and connection reuse rate per service."""
+    with pool_lock:
+        stats = {service: dict(values) for service, values in metrics.items()}
+    for values in stats.values():
+        values["reuse_rate"] = round(1 - values["new_connections"] / values["requests"], 3) if values["requests"] else 0.0
+    return stats
@@ -0,0 +1,72 @@
+import re
+import time
+
+# Filler words people wrap commands in ("frosty, please pause the music")
+FILLER = re.compile(r"^(?:(?:hey|ok|okay)\s+)?(?:frosty[\s,]+)?(?:(?:please|can you|could you)\s+)?|\s+please$")
+PUNCTUATION = re.compile(r"[^\w\s']")
+
+# Words that describe when, not where ("weather in berlin today")
+TIME_WORDS = r"(?:\s+(?:today|tomorrow|right now|currently|now))*"
+
+# Intent patterns, checked in order (first match wins). Named groups become slots.
+INTENT_PATTERNS = [
+    ("exit", r"(?:exit|quit|stop|goodbye|bye)"),
+    ("weather", r"(?:.*\s)?weather(?:.*?\s(?:in|for)\s+(?P<city>.+?)|\s.*?)?" + TIME_WORDS),
+    ("pause", r"(?:pause|stop the music|stop music|pause (?:the )?(?:music|song))"),
+    ("next", r"(?:next|skip)(?: (?:this|the))?(?: song| track)?"),
+    ("previous", r"(?:previous|go back|back|last)(?: song| track)?"),
+    ("play", r"(?:play|resume|continue|unpause)(?: (?:some|the))?(?: music| song| spotify)?"),
+    ("play_song", r"play (?P<song>.+?)(?: on spotify)?"),
+    ("now_playing", r"what(?:'s|s| is) (?:this song|this track|the song|the track|playing)(?: playing)?(?: now)?|what song is (?:this|playing)"),
+    ("time", r"what(?:'s|s| is) the time|what time is it"),
+]
+COMPILED_INTENTS = [(name, re.compile(pattern + r"$")) for name, pattern in INTENT_PATTERNS]
+
+# Per-intent routing latency (matching only, not the action itself)
+route_stats = {}
+
+def normalize(text):
+    """Lowercase, drop punctuation and filler words."""
+    text = PUNCTUATION.sub(" ", text.lower())
+    text = " ".join(text.split())
+    return FILLER.sub("", text).strip()
+
+def match_intent(text):
+    """
+    Match an utterance against the local intents.
+
+    Returns:
+        tuple: (intent name or None, dict of slots)
+    """
+    started = time.perf_counter()
+    command = normalize(text)
+
+    intent, slots = None, {}
+    if command:
+        for name, pattern in COMPILED_INTENTS:
+            match = pattern.match(command)
+            if match:
+                intent = name
+                slots = {key: value for key, value in match.groupdict().items() if value}
+                break
+
+    record_latency(intent or "fallback", time.perf_counter() - started)
+    return intent, slots
+
+def record_latency(intent, seconds):
+    stats = route_stats.setdefault(intent, {"count": 0, "total_us": 0.0, "max_us": 0.0})
+    micros = seconds * 1_000_000
+    stats["count"] += 1
+    stats["total_us"] += micros
+    stats["max_us"] = max(stats["max_us"], micros)
+
+def routing_stats():
+    """Returns count, average and max routing latency (microseconds) per intent."""
+    return {
+        intent: {
+            "count": stats["count"],
+            "avg_us": round(stats["total_us"] / stats["count"], 1),
+            "max_us": round(stats["max_us"], 1),
+        }
+        for intent, stats in route_stats.items()
+    }
@@ -1,22 +1,299 @@
 import openai
 import os
+import re
+import json
+import hashlib
+import time
+import threading
+from collections import OrderedDict, deque
 from dotenv import load_dotenv
+from core.http_pool import get_http_client, get_timeout, get_retries
+from core import tracing
 
 # Load API key from .env file (if using)
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
+MODEL = "gpt-4"  # Change model if needed
+SYSTEM_PROMPT = "You are Frosty, a friendly AI assistant that helps users with their queries. Be concise and professional."
+
+# Sentence boundary: end punctuation (plus closing quotes/brackets) followed by whitespace
+SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n+")
+MIN_SENTENCE_CHARS = 12  # Avoids speaking fragments like "Dr." or "1." on their own
+
+# Response cache settings
+RESPONSE_CACHE_TTL = int(os.getenv("AI_CACHE_TTL", "3600"))  # Seconds
+RESPONSE_CACHE_SIZE = int(os.getenv("AI_CACHE_SIZE", "128"))
+RESPONSE_CACHE_PATH = os.getenv("AI_CACHE_PATH")  # Set to persist the cache to disk
+
+# Prompts whose answer changes over time are never cached
+TIME_SENSITIVE = re.compile(
+    r"\b(now|today|tonight|tomorrow|yesterday|current|currently|latest|recent|recently|news|"
+    r"time|date|day|week|month|year|weather|forecast|score|price)\b"
+)
+
+# Conversation history is trimmed to this many (estimated) tokens
+HISTORY_TOKEN_BUDGET = int(os.getenv("AI_HISTORY_TOKENS", "1500"))
+
+# Shared client (keeps its connections alive between questions)
+client = None
+
+# cache key (see cache_key()) -> {"response": str, "created_at": timestamp}, least recently used first
+response_cache = OrderedDict()
+cache_lock = threading.Lock()
+cache_loaded = False
+cache_stats = {"hits": 0, "misses": 0}
+
+# Previous turns as chat messages (oldest first)
+history = deque()
+
+# Token usage of requests that actually reached OpenAI
+token_stats = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+# Timings of the last streamed response (seconds)
+stream_metrics = {"first_token_s": None, "total_s": None, "tokens": 0}
+
+def normalize_prompt(text):
+    """Lowercase and strip punctuation so "Tell me a joke!" and "tell me a joke" share a cache entry."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+def cache_key(user_input):
+    """
+    Cache key for a prompt in the current conversation, or None if it must not be cached.
+
+    The key includes a digest of the conversation history, since follow-ups like
+    "why?" or "tell me more" mean something else in every conversation.
+    """
+    prompt = normalize_prompt(user_input)
+    if not prompt or TIME_SENSITIVE.search(prompt):
+        return None
+    with cache_lock:
+        previous = list(history)
+    if not previous:
+        return prompt
+    digest = hashlib.sha1(json.dumps(previous, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return f"{prompt}|{digest}"
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token, plus per-message overhead)."""
+    return len(text) // 4 + 4
+
+def trim_history():
+    """Drop the oldest turns (user + assistant pairs) until the history fits the token budget."""
+    total = sum(estimate_tokens(message["content"]) for message in history)
+    while history and total > HISTORY_TOKEN_BUDGET:
+        for _ in range(min(2, len(history))):
+            total -= estimate_tokens(history.popleft()["content"])
+
+def build_messages(user_input):
+    with cache_lock:
+        previous = list(history)
+    return (
+        [{"role": "system", "content": SYSTEM_PROMPT}]
+        + previous
+        + [{"role": "user", "content": user_input}]
+    )
+
+def remember_turn(user_input, response):
+    with cache_lock:
+        history.append({"role": "user", "content": user_input})
+        history.append({"role": "assistant", "content": response})
+        trim_history()
+
+def clear_history():
+    """Start a fresh conversation (cached responses are kept). Called each time Frosty is woken."""
+    with cache_lock:
+        history.clear()
+
+def load_cache():
+    global cache_loaded
+    cache_loaded = True
+    if not RESPONSE_CACHE_PATH:
+        return
+    try:
+        with open(RESPONSE_CACHE_PATH, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return
+
+    for key, entry in entries[-RESPONSE_CACHE_SIZE:]:
+        response_cache[key] = entry
+
+def save_cache():
+    if not RESPONSE_CACHE_PATH:
+        return
+    with cache_lock:
+        entries = list(response_cache.items())
+
+    try:
+        tmp_path = RESPONSE_CACHE_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, RESPONSE_CACHE_PATH)
+    except OSError as e:
+        print(f"⚠️ Could not save AI response cache: {e}")
+
+def get_cached_response(key):
+    """Returns the cached response for a cache_key(), or None."""
+    if key is None:
+        return None
+    with cache_lock:
+        if not cache_loaded:
+            load_cache()
+        entry = response_cache.get(key)
+        if entry and time.time() - entry["created_at"] < RESPONSE_CACHE_TTL:
+            response_cache.move_to_end(key)
+            cache_stats["hits"] += 1
+            return entry["response"]
+        if entry:
+            del response_cache[key]  # Expired
+        cache_stats["misses"] += 1
+        return None
+
+def cache_response(key, response):
+    if key is None:
+        return
+    with cache_lock:
+        response_cache[key] = {"response": response, "created_at": time.time()}
+        response_cache.move_to_end(key)
+        while len(response_cache) > RESPONSE_CACHE_SIZE:
+            response_cache.popitem(last=False)
+    save_cache()
+
+def record_usage(usage):
+    if not usage:
+        return
+    with cache_lock:
+        token_stats["requests"] += 1
+        token_stats["prompt_tokens"] += usage.prompt_tokens
+        token_stats["completion_tokens"] += usage.completion_tokens
+
+def get_openai_client():
+    """Returns the shared OpenAI client, created on first use."""
+    global client
+    if client is None:
+        client = openai.OpenAI(
+            http_client=get_http_client("openai"),
+            timeout=get_timeout("openai")[1],
+            max_retries=get_retries("openai")
+        )
+    return client
+
+@tracing.traced("openai.chat")
 def get_ai_response(user_input):
     """Sends user input to OpenAI and returns the response using the latest API format."""
+    key = cache_key(user_input)
+    cached = get_cached_response(key)
+    tracing.current_span().set(cached=cached is not None)
+    if cached is not None:
+        remember_turn(user_input, cached)
+        return cached
+
     try:
-        client = openai.OpenAI()  # Create OpenAI client (New API format)
-        response = client.chat.completions.create(
-            model="gpt-4",  # Change model if needed
-            messages=[
-                {"role": "system", "content": "You are Frosty, a friendly AI assistant that helps users with their queries. Be concise and professional."},
-                {"role": "user", "content": user_input}
-            ]
+        response = get_openai_client().chat.completions.create(
+            model=MODEL,
+            messages=build_messages(user_input)
         )
-        return response.choices[0].message.content  # Adjusted response format
+        record_usage(response.usage)
+        content = response.choices[0].message.content  # Adjusted response format
     except Exception as e:
         return f"Error: {e}"
+
+    cache_response(key, content)
+    remember_turn(user_input, content)
+    return content
+
+def stream_ai_response(user_input):
+    """Yields the response piece by piece as the completion streams in."""
+    started = time.perf_counter()
+    stream_metrics.update({"first_token_s": None, "total_s": None, "tokens": 0})
+    span = tracing.start_span("openai.stream")  # Ended when the generator finishes
+
+    key = cache_key(user_input)  # Before this turn joins the history
+    cached = get_cached_response(key)
+    if cached is not None:
+        stream_metrics["first_token_s"] = time.perf_counter() - started
+        stream_metrics["total_s"] = stream_metrics["first_token_s"]
+        remember_turn(user_input, cached)
+        span.set(cached=True)
+        span.end()
+        yield cached
+        return
+
+    parts = []
+    try:
+        stream = get_openai_client().chat.completions.create(
+            model=MODEL,
+            messages=build_messages(user_input),
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        for chunk in stream:
+            if chunk.usage:
+                record_usage(chunk.usage)  # Sent in a final chunk without choices
+            if not chunk.choices:
+                continue
+            token = chunk.choices[0].delta.content
+            if not token:
+                continue
+            if stream_metrics["first_token_s"] is None:
+                stream_metrics["first_token_s"] = time.perf_counter() - started
+            stream_metrics["tokens"] += 1
+            parts.append(token)
+            yield token
+    except Exception as e:
+        span.end(e)
+        yield f"Error: {e}"
+        return
+    finally:
+        stream_metrics["total_s"] = time.perf_counter() - started
+        if stream_metrics["first_token_s"] is not None:
+            span.set(first_token_ms=round(stream_metrics["first_token_s"] * 1000), tokens=stream_metrics["tokens"])
+        span.end()
+
+    content = "".join(parts)
+    if content:
+        cache_response(key, content)
+        remember_turn(user_input, content)
+
+def split_sentences(tokens):
+    """Groups streamed tokens into complete sentences, yielding each one as soon as it ends."""
+    buffer = ""
+    for token in tokens:
+        buffer += token
+        search_from = 0
+        while True:
+            match = SENTENCE_END.search(buffer, search_from)
+            if not match:
+                break
+            sentence = buffer[:match.end()].strip()
+            if len(sentence) < MIN_SENTENCE_CHARS:
+                search_from = match.end()  # Too short to stand alone, keep collecting
+                continue
+            yield sentence
+            buffer = buffer[match.end():]
+            search_from = 0
+
+    if buffer.strip():
+        yield buffer.strip()
+
+def get_stream_metrics():
+    """Returns time-to-first-token, total time and token count of the last streamed response."""
+    return dict(stream_metrics)
+
+def get_cache_stats():
+    """Returns response cache hit rate, history size and average tokens per request."""
+    with cache_lock:
+        lookups = cache_stats["hits"] + cache_stats["misses"]
+        requests = token_stats["requests"]
+        return {
+            "hits": cache_stats["hits"],
+            "misses": cache_stats["misses"],
+            "hit_rate": round(cache_stats["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": len(response_cache),
+            "history_messages": len(history),
+            "history_tokens": sum(estimate_tokens(message["content"]) for message in history),
+            "requests": requests,
+            "avg_prompt_tokens": round(token_stats["prompt_tokens"] / requests, 1) if requests else 0.0,
+            "avg_completion_tokens": round(token_stats["completion_tokens"] / requests, 1) if requests else 0.0,
+        }
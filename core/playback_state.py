@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+
+# Polling intervals in seconds (override in .env)
+SLOW_POLL = float(os.getenv("PLAYBACK_SLOW_POLL", "10"))  # Mid-track, nothing expected to change
+FAST_POLL = float(os.getenv("PLAYBACK_FAST_POLL", "1"))  # Track just ended, waiting for the next one
+PAUSED_POLL = float(os.getenv("PLAYBACK_PAUSED_POLL", "15"))  # Nothing playing
+END_MARGIN = 0.3  # Poll this long after the track should have ended
+COMMAND_DELAY = 0.4  # Spotify needs a moment before a command shows up in playback state
+IDLE_FACTOR = 3  # Polls are this much slower while the UI is idle
+
+def describe_track(playback):
+    """Returns "Song - Artist" for a playback payload, or None if nothing is playing."""
+    if not playback or not playback.get("is_playing") or not playback.get("item"):
+        return None
+    track = playback["item"]
+    return f"{track['name']} - {track['artists'][0]['name']}"
+
+def state_key(playback):
+    """The parts of the playback state subscribers care about."""
+    if not playback:
+        return None
+    item = playback.get("item") or {}
+    return (item.get("id"), playback.get("is_playing"))
+
+class PlaybackService:
+    """
+    One shared, adaptively polled copy of the Spotify playback state.
+
+    Polls slowly mid-track, right after the current track should end and
+    quickly until the next one shows up, and immediately after local
+    commands. Subscribers are called (on the polling thread) whenever the
+    track or play/pause state changes.
+    """
+
+    def __init__(self, fetch=None):
+        self.fetch = fetch
+        self.state = None
+        self.fetched_at = 0.0
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        self.idle = False
+        self.stats = {"polls": 0, "errors": 0, "changes": 0}
+
+    def start(self):
+        with self.lock:
+            if self.thread:
+                return
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def subscribe(self, callback):
+        """Call callback(playback) on every change; it gets the current state right away if known."""
+        with self.lock:
+            self.subscribers.append(callback)
+            state, known = self.state, self.fetched_at > 0
+        self.start()
+        if known:
+            callback(state)
+        self.refresh_now()
+
+    def unsubscribe(self, callback):
+        with self.lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def get_state(self, max_age=None):
+        """
+        Returns the last known playback payload.
+
+        With max_age set, a state older than that many seconds is refreshed
+        first (on the caller's thread); otherwise no network call is made.
+        """
+        with self.lock:
+            state, fetched_at = self.state, self.fetched_at
+        if max_age is not None and time.time() - fetched_at > max_age:
+            self.poll()
+            with self.lock:
+                state = self.state
+        return state
+
+    def refresh_now(self, delay=0.0):
+        """Poll soon instead of waiting for the next scheduled poll."""
+        if delay:
+            threading.Timer(delay, self.wake.set).start()
+        else:
+            self.wake.set()
+
+    def on_command(self, *args):
+        self.refresh_now(COMMAND_DELAY)
+
+    def set_idle(self, idle):
+        self.idle = idle
+
+    def next_delay(self):
+        state = self.state
+        if not state or not state.get("is_playing") or not state.get("item"):
+            delay = PAUSED_POLL
+        else:
+            duration = state["item"].get("duration_ms") or 0
+            progress = state.get("progress_ms") or 0
+            remaining = (duration - progress) / 1000
+            if remaining <= END_MARGIN:
+                delay = FAST_POLL  # Should have ended already, waiting for the next track
+            else:
+                delay = min(SLOW_POLL, remaining + END_MARGIN)  # Wake up right after it ends
+
+        return delay * IDLE_FACTOR if self.idle else delay
+
+    def poll(self):
+        with self.lock:
+            if self.fetch is None:
+                # Imported here so the UI thread never pays for spotipy
+                from core.spotify_api import get_playback_state, add_command_listener
+                add_command_listener(self.on_command)
+                self.fetch = get_playback_state
+
+        self.stats["polls"] += 1
+        playback = self.fetch()
+
+        with self.lock:
+            changed = state_key(playback) != state_key(self.state) or self.fetched_at == 0
+            self.state = playback
+            self.fetched_at = time.time()
+            subscribers = list(self.subscribers)
+
+        if changed:
+            self.stats["changes"] += 1
+            for callback in subscribers:
+                try:
+                    callback(playback)
+                except Exception as e:
+                    print(f"⚠️ Playback subscriber failed: {e}")
+        return changed
+
+    def run(self):
+        delay = 0
+        while True:
+            self.wake.wait(delay)
+            self.wake.clear()
+
+            with self.lock:
+                has_subscribers = bool(self.subscribers)
+            if not has_subscribers:
+                delay = None  # Nobody is listening, sleep until someone subscribes
+                continue
+
+            try:
+                self.poll()
+                delay = self.next_delay()
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"❌ Playback poll failed: {e}")
+                delay = PAUSED_POLL
+
+# Shared instance used by the Qt UI, the pygame player and the voice loop
+playback_service = PlaybackService()
+
+def get_playback_service():
+    return playback_service
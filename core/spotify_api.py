@@ -1,8 +1,13 @@
 import os
 import time
+import threading
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 from dotenv import load_dotenv
+from core.http_pool import get_session, get_timeout
+from core.spotify_auth import TokenManager
+from core.track_index import get_track_index
+from core import tracing
 
 # Load environment variables
 load_dotenv()
@@ -10,140 +15,312 @@ load_dotenv()
 SPOTIPY_CLIENT_ID = os.getenv("SPOTIPY_CLIENT_ID")
 SPOTIPY_CLIENT_SECRET = os.getenv("SPOTIPY_CLIENT_SECRET")
 SPOTIPY_REDIRECT_URI = os.getenv("SPOTIPY_REDIRECT_URI")
+SPOTIFY_API_URL = os.getenv("SPOTIFY_API_URL", "https://api.spotify.com/v1/")  # Override to use a local test server
 
 # Spotify scope
 SCOPE = "user-read-playback-state user-modify-playback-state"
 
+SEARCH_LIMIT = 5  # Results to pick the best fuzzy match from
+
 # Global Spotify client
 sp = None
+sp_lock = threading.Lock()  # The UI workers and the voice loop can call in at the same time
+
+# Local device cache (saves a devices() round trip on every command)
+DEVICE_CACHE_TTL = int(os.getenv("SPOTIFY_DEVICE_TTL", "300"))  # Seconds
+device_cache = {"id": None, "expires_at": 0}
+device_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+device_lock = threading.Lock()
+
+# Called after every successful playback command (e.g. to refresh playback state)
+command_listeners = []
+
+class RateLimitedError(Exception):
+    """Spotify answered 429; retry_after is the number of seconds it asked us to wait (or None)."""
+
+    def __init__(self, retry_after=None):
+        super().__init__(f"Spotify rate limit hit (retry after {retry_after}s)")
+        self.retry_after = retry_after
+        self.resume_args = None  # Set by actions that got partway: the args that finish the rest
+
+def check_rate_limit(error):
+    """Turn a 429 SpotifyException into RateLimitedError (with its Retry-After)."""
+    if error.http_status == 429:
+        headers = getattr(error, "headers", None) or {}
+        retry_after = headers.get("Retry-After") or headers.get("retry-after")
+        raise RateLimitedError(float(retry_after) if retry_after else None) from error
 
 def ensure_spotify_client():
-    """Ensure Spotify client is authenticated and refreshed."""
+    """Ensure Spotify client is authenticated (the token manager keeps it refreshed)."""
+    with sp_lock:
+        _ensure_spotify_client()
+
+def _ensure_spotify_client():
     global sp
     if sp is None:
-        print("🔄 Initializing Spotify Client...")
-        sp_oauth = SpotifyOAuth(
-            client_id=SPOTIPY_CLIENT_ID,
-            client_secret=SPOTIPY_CLIENT_SECRET,
-            redirect_uri=SPOTIPY_REDIRECT_URI,
-            scope=SCOPE,
-            cache_path=".spotify_cache",
-            open_browser=True
-        )
-
-        token_info = sp_oauth.get_cached_token()
-        if not token_info:
-            token_info = sp_oauth.get_access_token(as_dict=True)
-
-        sp = spotipy.Spotify(auth=token_info['access_token'])
-        sp.token_info = token_info
-        sp.sp_oauth = sp_oauth
-
-    # Refresh token if needed
-    if sp.token_info['expires_at'] - int(time.time()) < 60:
-        print("🔄 Refreshing Spotify token...")
-        sp.token_info = sp.sp_oauth.refresh_access_token(sp.token_info['refresh_token'])
-        sp._auth = sp.token_info['access_token']
+        with tracing.span("spotify.auth"):
+            print("🔄 Initializing Spotify Client...")
+            sp_oauth = SpotifyOAuth(
+                client_id=SPOTIPY_CLIENT_ID,
+                client_secret=SPOTIPY_CLIENT_SECRET,
+                redirect_uri=SPOTIPY_REDIRECT_URI,
+                scope=SCOPE,
+                cache_path=".spotify_cache",
+                open_browser=True,
+                requests_session=get_session("spotify"),
+                requests_timeout=get_timeout("spotify")
+            )
+
+            token_info = sp_oauth.get_cached_token()
+            if not token_info:
+                token_info = sp_oauth.get_access_token(as_dict=True)
+
+            # Refreshes in the background before expiry; spotipy asks it for the token on every request
+            token_manager = TokenManager(sp_oauth, token_info)
+            sp = spotipy.Spotify(
+                auth_manager=token_manager,
+                requests_session=get_session("spotify"),
+                requests_timeout=get_timeout("spotify")
+            )  # Retries come from the session's adapter; spotipy ignores retries= with a requests_session
+            sp.prefix = SPOTIFY_API_URL
+            sp.token_manager = token_manager
 
 def get_spotify_client():
     """Returns a valid Spotify client."""
     ensure_spotify_client()
     return sp
 
+def get_playback_state():
+    """Returns the current playback payload (None when nothing is active)."""
+    with tracing.span("spotify.playback_state"):
+        return get_spotify_client().current_playback()
+
+def get_upcoming_tracks(limit=1):
+    """Returns the next tracks in the user's Spotify queue (may be empty)."""
+    queue = get_spotify_client().queue() or {}
+    return (queue.get("queue") or [])[:limit]
+
 def find_local_device(sp_client):
-    """Find and return this PC's Spotify device."""
-    devices = sp_client.devices()
+    """Find and return this PC's Spotify device (cached for DEVICE_CACHE_TTL seconds)."""
+    with device_lock:
+        if device_cache["id"] and time.time() < device_cache["expires_at"]:
+            device_stats["hits"] += 1
+            return device_cache["id"]
+        device_stats["misses"] += 1
+
+    with tracing.span("spotify.devices"):
+        devices = sp_client.devices()
 
     for device in devices['devices']:
         if device['type'] == 'Computer':
             print(f"✅ Found local device: {device['name']}")
+            with device_lock:
+                device_cache["id"] = device['id']
+                device_cache["expires_at"] = time.time() + DEVICE_CACHE_TTL
             return device['id']
 
     return None
 
-def play_music():
-    """Play music on this PC device only."""
+def invalidate_device_cache():
+    """Forget the cached device so the next command looks it up again."""
+    with device_lock:
+        if device_cache["id"]:
+            device_stats["invalidations"] += 1
+        device_cache["id"] = None
+        device_cache["expires_at"] = 0
+
+def device_cache_stats():
+    """Returns hit/miss counters for the device cache."""
+    with device_lock:
+        stats = dict(device_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    return stats
+
+def add_command_listener(listener):
+    """Register listener() to be called after each successful playback command."""
+    command_listeners.append(listener)
+
+def notify_command():
+    for listener in command_listeners:
+        try:
+            listener()
+        except Exception as e:
+            print(f"⚠️ Command listener failed: {e}")
+
+def run_on_local_device(sp_client, action):
+    """
+    Run action(device_id) on this PC's device.
+
+    If Spotify answers 404 the cached device is stale (app restarted, device
+    changed), so it is looked up again and the action retried once.
+    Returns False when no local device is available; raises RateLimitedError
+    on 429 so callers (the command queue) can back off.
+    """
     try:
-        sp_client = get_spotify_client()
         device_id = find_local_device(sp_client)
-
         if not device_id:
-            return "❌ Spotify is not active on your PC. Please open Spotify app."
+            return False
 
         try:
-            sp_client.start_playback(device_id=device_id)
-            return "🎵 Playing music on Spotify."
+            with tracing.span("spotify.player"):
+                action(device_id)
         except spotipy.exceptions.SpotifyException as e:
-            if e.http_status == 403:
-                print("🔄 Spotify 403 Restriction: Trying to play a default track...")
-
-                # Play a fallback default track
-                fallback_track_uri = "spotify:track:3n3Ppam7vgaVa1iaRUc9Lp"  # Example: Eminem - Without Me
-                sp_client.start_playback(device_id=device_id, uris=[fallback_track_uri])
-                return "🎵 Playback started with default track."
-            else:
+            if e.http_status != 404:
                 raise e
+            print("🔄 Spotify device not found, refreshing device cache...")
+            invalidate_device_cache()
+            device_id = find_local_device(sp_client)
+            if not device_id:
+                return False
+            with tracing.span("spotify.player", retry=True):
+                action(device_id)
+    except spotipy.exceptions.SpotifyException as e:
+        check_rate_limit(e)
+        raise e
+
+    notify_command()
+    return True
+
+def play_music():
+    """Play music on this PC device only."""
+    try:
+        sp_client = get_spotify_client()
+
+        def start(device_id):
+            try:
+                sp_client.start_playback(device_id=device_id)
+                result["message"] = "🎵 Playing music on Spotify."
+            except spotipy.exceptions.SpotifyException as e:
+                if e.http_status == 403:
+                    print("🔄 Spotify 403 Restriction: Trying to play a default track...")
+
+                    # Play a fallback default track
+                    fallback_track_uri = "spotify:track:3n3Ppam7vgaVa1iaRUc9Lp"  # Example: Eminem - Without Me
+                    sp_client.start_playback(device_id=device_id, uris=[fallback_track_uri])
+                    result["message"] = "🎵 Playback started with default track."
+                else:
+                    raise e
+
+        result = {}
+        if not run_on_local_device(sp_client, start):
+            return "❌ Spotify is not active on your PC. Please open Spotify app."
 
+        return result["message"]
+
+    except RateLimitedError:
+        raise
     except Exception as e:
         return f"Error: {e}"
 
 def pause_music():
     try:
         sp_client = get_spotify_client()
-        device_id = find_local_device(sp_client)
 
-        if not device_id:
+        if not run_on_local_device(sp_client, lambda device_id: sp_client.pause_playback(device_id=device_id)):
             return "❌ No PC Spotify device found."
 
-        sp_client.pause_playback(device_id=device_id)
         return "⏸ Music paused."
 
+    except RateLimitedError:
+        raise
     except Exception as e:
         return f"Error: {e}"
 
 def next_track():
     try:
         sp_client = get_spotify_client()
-        device_id = find_local_device(sp_client)
 
-        if not device_id:
+        if not run_on_local_device(sp_client, lambda device_id: sp_client.next_track(device_id=device_id)):
             return "❌ No PC Spotify device found."
 
-        sp_client.next_track(device_id=device_id)
         return "⏭ Skipped to next track."
 
+    except RateLimitedError:
+        raise
+    except Exception as e:
+        return f"Error: {e}"
+
+def skip_tracks(count, total=None):
+    """
+    Skip count tracks forward (or back when negative) with one device lookup.
+    Used by the command queue to coalesce bursts of next/previous.
+
+    Each step is a separate call, so a 429 partway through raises
+    RateLimitedError with resume_args set to the steps still left (and the
+    total, for the message). Retrying with them never skips a track twice.
+    """
+    total = count if total is None else total
+    done = {"steps": 0}
+    try:
+        sp_client = get_spotify_client()
+
+        def skip(device_id):
+            step = sp_client.next_track if count > 0 else sp_client.previous_track
+            while done["steps"] < abs(count):  # Resumes where it stopped if the device is retried
+                step(device_id=device_id)
+                done["steps"] += 1
+
+        if not run_on_local_device(sp_client, skip):
+            return "❌ No PC Spotify device found."
+
+        if total > 0:
+            return "⏭ Skipped to next track." if total == 1 else f"⏭ Skipped {total} tracks."
+        return "⏮ Playing previous track." if total == -1 else f"⏮ Went back {-total} tracks."
+
+    except RateLimitedError as e:
+        if done["steps"]:
+            remaining = abs(count) - done["steps"]
+            e.resume_args = (remaining if count > 0 else -remaining, total)
+        raise
     except Exception as e:
         return f"Error: {e}"
 
 def previous_track():
     try:
         sp_client = get_spotify_client()
-        device_id = find_local_device(sp_client)
 
-        if not device_id:
+        if not run_on_local_device(sp_client, lambda device_id: sp_client.previous_track(device_id=device_id)):
             return "❌ No PC Spotify device found."
 
-        sp_client.previous_track(device_id=device_id)
         return "⏮ Playing previous track."
 
+    except RateLimitedError:
+        raise
     except Exception as e:
         return f"Error: {e}"
 
 def play_specific_song(song_name):
     try:
         sp_client = get_spotify_client()
-        device_id = find_local_device(sp_client)
 
-        if not device_id:
-            return "❌ No PC Spotify device found."
+        # Songs played before resolve locally, without a search call
+        index = get_track_index()
+        track = index.lookup(song_name)
+        tracing.current_span().set(local_match=bool(track))
+        if track:
+            item = {"uri": track["uri"], "name": track["title"], "artists": [{"name": track["artist"]}]}
+        else:
+            try:
+                with tracing.span("spotify.search"):
+                    results = sp_client.search(q=song_name, limit=SEARCH_LIMIT, type="track")
+            except spotipy.exceptions.SpotifyException as e:
+                check_rate_limit(e)
+                raise e
+            items = results['tracks']['items']
+            if not items:
+                return "❌ Song not found."
 
-        results = sp_client.search(q=song_name, limit=1)
-        if results['tracks']['items']:
-            track_uri = results['tracks']['items'][0]['uri']
-            sp_client.start_playback(device_id=device_id, uris=[track_uri])
-            return f"🎶 Playing {song_name} on Spotify."
+            item = index.best_match(song_name, items)
+        track_uri = item["uri"]
+
+        if not run_on_local_device(sp_client, lambda device_id: sp_client.start_playback(device_id=device_id, uris=[track_uri])):
+            return "❌ No PC Spotify device found."
 
-        return "❌ Song not found."
+        index.record_play(item)  # Only tracks that were played resolve locally next time
+        return f"🎶 Playing {song_name} on Spotify."
 
+    except RateLimitedError:
+        raise
     except Exception as e:
         return f"Error: {e}"
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+
+# Refresh settings (override in .env)
+REFRESH_MARGIN = int(os.getenv("SPOTIFY_REFRESH_MARGIN", "300"))  # Refresh this many seconds before expiry
+RETRY_DELAY = 30  # Seconds before retrying a failed background refresh
+REFRESH_WAIT = 15  # Longest a caller waits for someone else's refresh
+
+class TokenManager:
+    """
+    Keeps the Spotify access token fresh in the background.
+
+    A daemon thread refreshes the token REFRESH_MARGIN seconds before it
+    expires and saves it back to the OAuth cache file, so commands never pay
+    the refresh round trip and restarts begin with a fresh token. If a token
+    does expire (e.g. after the machine slept), the refresh is single-flight:
+    concurrent callers wait for the one refresh already in progress.
+
+    Passed to spotipy as the auth_manager, so every request picks up the
+    current token.
+    """
+
+    def __init__(self, sp_oauth, token_info):
+        self.sp_oauth = sp_oauth
+        self.token_info = token_info
+        self.lock = threading.Lock()
+        self.refreshed = threading.Condition(self.lock)
+        self.refreshing = False
+        self.wake = threading.Event()
+        self.stats = {"background_refreshes": 0, "expired_on_use": 0, "waits": 0, "failures": 0}
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def seconds_left(self):
+        return self.token_info["expires_at"] - time.time()
+
+    def get_access_token(self, as_dict=False):
+        """Returns the current token; only refreshes inline if it has already expired."""
+        with self.lock:
+            token_info = self.token_info
+            expired = self.seconds_left() <= 0
+        if expired:
+            self.stats["expired_on_use"] += 1
+            token_info = self.refresh()
+        return token_info if as_dict else token_info["access_token"]
+
+    def refresh(self):
+        """Refresh the token, or wait for the refresh another thread already started."""
+        with self.lock:
+            if self.refreshing:
+                self.stats["waits"] += 1
+                self.refreshed.wait_for(lambda: not self.refreshing, REFRESH_WAIT)
+                return self.token_info
+            self.refreshing = True
+            refresh_token = self.token_info["refresh_token"]
+
+        token_info = None
+        try:
+            print("🔄 Refreshing Spotify token...")
+            token_info = self.sp_oauth.refresh_access_token(refresh_token)
+            self.save(token_info)
+        except Exception as e:
+            self.stats["failures"] += 1
+            print(f"❌ Spotify token refresh failed: {e}")
+        finally:
+            with self.refreshed:
+                if token_info:
+                    self.token_info = token_info
+                self.refreshing = False
+                self.refreshed.notify_all()
+                token_info = self.token_info
+        self.wake.set()  # Reschedule the background refresh
+        return token_info
+
+    def save(self, token_info):
+        """Write the refreshed token back to .spotify_cache for the next start."""
+        try:
+            self.sp_oauth.cache_handler.save_token_to_cache(token_info)
+        except Exception as e:
+            print(f"⚠️ Could not save Spotify token: {e}")
+
+    def run(self):
+        while True:
+            with self.lock:
+                delay = self.seconds_left() - REFRESH_MARGIN
+            if delay > 0:
+                self.wake.wait(delay)
+                self.wake.clear()
+                continue  # Re-check: the token may have been refreshed inline meanwhile
+
+            before = self.token_info
+            token_info = self.refresh()
+            if token_info is before:
+                self.wake.clear()  # Set by refresh() itself
+                self.wake.wait(RETRY_DELAY)  # Refresh failed, try again shortly
+                self.wake.clear()
+            else:
+                self.stats["background_refreshes"] += 1
+
+    def token_stats(self):
+        """Returns refresh counts and seconds until the current token expires."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats["expires_in"] = int(self.seconds_left())
+        return stats
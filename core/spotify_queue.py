@@ -0,0 +1,204 @@
+import os
+import threading
+import time
+from collections import deque
+
+from core import tracing
+
+# Queue settings (override in .env)
+DEBOUNCE_MS = int(os.getenv("SPOTIFY_DEBOUNCE_MS", "400"))  # Quiet time before a burst is sent
+MAX_DEBOUNCE_MS = 1500  # Never hold a command longer than this
+MAX_RETRIES = 3  # Attempts after a 429 before giving up
+DEFAULT_BACKOFF = 1.0  # Seconds to wait after a 429 without Retry-After (doubles per retry)
+MAX_BACKOFF = 30.0
+
+# Skip direction of each skip command
+SKIPS = {"next": 1, "previous": -1}
+TOGGLES = ("play", "pause")
+
+def coalesce(commands, is_playing=None):
+    """
+    Merge a burst of queued commands, keeping their order.
+
+    Runs of next/previous become one skip-by-N (dropped if they cancel out),
+    a run of play/pause keeps only the last one (dropped if it matches the
+    known player state) and consecutive song requests keep only the newest.
+
+    Args:
+        commands: list of {"name", "args", "on_done"} in arrival order
+        is_playing: last known play state, or None if unknown
+
+    Returns:
+        list of {"name", "args", "on_done"} to actually run
+    """
+    merged = []
+    for command in commands:
+        previous = merged[-1] if merged else None
+        name = command["name"]
+
+        if previous and name in SKIPS and previous["name"] == "skip":
+            previous["args"] = (previous["args"][0] + SKIPS[name],)
+            previous["on_done"] = command["on_done"] or previous["on_done"]
+        elif name in SKIPS:
+            merged.append({"name": "skip", "args": (SKIPS[name],), "on_done": command["on_done"],
+                           "parent_span": command.get("parent_span")})
+        elif previous and name in TOGGLES and previous["name"] in TOGGLES:
+            merged[-1] = dict(command, on_done=command["on_done"] or previous["on_done"], toggled=True)
+        elif previous and name == "play_song" and previous["name"] == "play_song":
+            merged[-1] = dict(command, on_done=command["on_done"] or previous["on_done"])
+        else:
+            merged.append(dict(command))
+
+    result = []
+    for command in merged:
+        if command["name"] == "skip" and command["args"][0] == 0:
+            continue  # next + previous cancel out
+        if command.pop("toggled", False) and is_playing is not None:
+            if (command["name"] == "play") == is_playing:
+                continue  # Toggled back to where it started
+        result.append(command)
+    return result
+
+class SpotifyCommandQueue:
+    """
+    Ordered queue in front of core.spotify_api.
+
+    Commands are collected until DEBOUNCE_MS pass without a new one, then
+    coalesced (see coalesce()) and run in order on one worker thread. A 429
+    pauses the queue for Retry-After seconds (or an exponential backoff) and
+    the command is retried, resuming where it stopped if it got partway (see
+    RateLimitedError.resume_args). Only the last caller of a coalesced group
+    gets the result message (the others get None), so a burst of "next" is
+    answered once.
+    """
+
+    def __init__(self, actions=None, debounce_ms=DEBOUNCE_MS):
+        self.actions = actions  # name -> function(*args) returning a message
+        self.debounce = debounce_ms / 1000
+        self.pending = deque()
+        self.lock = threading.Lock()
+        self.wake = threading.Condition(self.lock)
+        self.last_submit = 0.0
+        self.thread = None
+        self.stats = {"submitted": 0, "executed": 0, "coalesced": 0, "rate_limited": 0, "retries": 0, "failed": 0}
+
+    def get_actions(self):
+        if self.actions is None:
+            from core import spotify_api
+            self.actions = {
+                "play": spotify_api.play_music,
+                "pause": spotify_api.pause_music,
+                "skip": spotify_api.skip_tracks,
+                "play_song": spotify_api.play_specific_song,
+            }
+        return self.actions
+
+    def submit(self, name, *args, on_done=None):
+        """
+        Queue a command ("play", "pause", "next", "previous" or "play_song")
+        and return right away. on_done(message) runs on the queue thread;
+        message is None if the command was merged into a later one.
+        """
+        with self.wake:
+            self.pending.append({"name": name, "args": args, "on_done": on_done,
+                                 "parent_span": tracing.current_span()})
+            self.last_submit = time.time()
+            self.stats["submitted"] += 1
+            self.wake.notify()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+
+    def take_burst(self):
+        """Wait for commands, then until the burst goes quiet. Returns them all."""
+        with self.wake:
+            self.wake.wait_for(lambda: self.pending)
+            first_at = time.time()
+            while True:
+                quiet_for = time.time() - self.last_submit
+                held_for = time.time() - first_at
+                if quiet_for >= self.debounce or held_for * 1000 >= MAX_DEBOUNCE_MS:
+                    break
+                self.wake.wait(self.debounce - quiet_for)
+            burst = list(self.pending)
+            self.pending.clear()
+        return burst
+
+    def known_play_state(self):
+        from core.playback_state import get_playback_service
+        state = get_playback_service().get_state()
+        return bool(state.get("is_playing")) if state else None
+
+    def run(self):
+        while True:
+            burst = self.take_burst()
+            try:
+                is_playing = self.known_play_state()
+            except Exception:
+                is_playing = None
+            commands = coalesce(burst, is_playing)
+            self.stats["coalesced"] += len(burst) - len(commands)
+
+            # Callers whose command was merged away are told right away (with None)
+            answered = {id(command["on_done"]) for command in commands}
+            for command in burst:
+                if command["on_done"] and id(command["on_done"]) not in answered:
+                    command["on_done"](None)
+
+            for command in commands:
+                message = self.execute(command)
+                if command["on_done"] and message:
+                    try:
+                        command["on_done"](message)
+                    except Exception as e:
+                        print(f"⚠️ Spotify command callback failed: {e}")
+
+    def execute(self, command):
+        """Run one command, timed as a span of the interaction that submitted it."""
+        with tracing.use(tracing.start_span(f"spotify.{command['name']}", parent=command.get("parent_span"))) as span:
+            return self.execute_with_retries(command, span)
+
+    def execute_with_retries(self, command, span):
+        from core.spotify_api import RateLimitedError
+
+        action = self.get_actions()[command["name"]]
+        backoff = DEFAULT_BACKOFF
+        for attempt in range(MAX_RETRIES + 1):
+            span.set(attempts=attempt + 1)
+            try:
+                message = action(*command["args"])
+                self.stats["executed"] += 1
+                return message
+            except RateLimitedError as e:
+                self.stats["rate_limited"] += 1
+                if e.resume_args is not None:
+                    command["args"] = e.resume_args  # Only retry the steps that did not go through
+                if attempt == MAX_RETRIES:
+                    break
+                delay = min(e.retry_after if e.retry_after is not None else backoff, MAX_BACKOFF)
+                print(f"⏳ Spotify rate limit, retrying in {delay:.1f}s")
+                self.stats["retries"] += 1
+                time.sleep(delay)
+                backoff *= 2
+            except Exception as e:
+                self.stats["failed"] += 1
+                return f"Error: {e}"
+
+        self.stats["failed"] += 1
+        return "⏳ Spotify is busy right now. Please try again in a moment."
+
+    def queue_stats(self):
+        """Returns queue depth and counters (coalesced commands, 429s, retries)."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats["depth"] = len(self.pending)
+        return stats
+
+# Shared queue used by the voice loop and the UI
+command_queue = SpotifyCommandQueue()
+
+def get_command_queue():
+    return command_queue
+
+def queue_stats():
+    return command_queue.queue_stats()
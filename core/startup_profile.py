@@ -0,0 +1,68 @@
+import builtins
+import sys
+import time
+from contextlib import contextmanager
+
+# Startup timings (seconds since this module was imported, which main.py does first)
+START = time.perf_counter()
+enabled = False
+marks = []  # (label, seconds since start)
+timings = []  # (label, duration in seconds)
+import_times = []  # (depth, module name, duration in seconds) in load order
+
+original_import = builtins.__import__
+import_depth = 0
+
+def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    """builtins.__import__ wrapper that times modules the first time they load."""
+    global import_depth
+    if level or name in sys.modules:
+        return original_import(name, globals, locals, fromlist, level)
+
+    import_depth += 1
+    started = time.perf_counter()
+    try:
+        return original_import(name, globals, locals, fromlist, level)
+    finally:
+        import_depth -= 1
+        import_times.append((import_depth, name, time.perf_counter() - started))
+
+def enable():
+    """Start recording import and constructor timings."""
+    global enabled
+    enabled = True
+    builtins.__import__ = timed_import
+
+def mark(label):
+    if enabled:
+        marks.append((label, time.perf_counter() - START))
+
+@contextmanager
+def timed(label):
+    """Time a block (e.g. a screen constructor) when profiling is enabled."""
+    if not enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.append((label, time.perf_counter() - started))
+
+def report(min_import_ms=2.0, max_depth=2):
+    """Print the startup breakdown."""
+    builtins.__import__ = original_import
+
+    print("⏱ Startup profile")
+    print("  Imports (inclusive):")
+    for depth, name, seconds in import_times:
+        if depth <= max_depth and seconds * 1000 >= min_import_ms:
+            print(f"    {'  ' * depth}{name:<{32 - 2 * depth}} {seconds * 1000:8.1f} ms")
+
+    print("  Constructors:")
+    for label, seconds in timings:
+        print(f"    {label:<32} {seconds * 1000:8.1f} ms")
+
+    print("  Milestones:")
+    for label, seconds in marks:
+        print(f"    {label:<32} {seconds * 1000:8.1f} ms")
@@ -0,0 +1,215 @@
+import json
+import os
+import threading
+import time
+import speech_recognition as sr
+from core import tracing
+
+# Speech-to-text settings (override in .env)
+STT_BACKEND = os.getenv("STT_BACKEND", "google")  # "google", "vosk" or "sphinx"
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", "models/vosk-model-small-en-us-0.15")
+LATENCY_SAMPLES = 200  # Utterances kept for latency percentiles
+
+class GoogleBackend:
+    """Google Web Speech (online). Only returns once the whole utterance is recorded."""
+
+    name = "google"
+    streaming = False
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+
+    def start(self, sample_rate, sample_width):
+        return BufferedSession(self, sample_rate, sample_width)
+
+    def transcribe(self, audio):
+        return self.recognizer.recognize_google(audio)
+
+class BufferedSession:
+    """Collects frames for backends that can only transcribe a finished utterance."""
+
+    def __init__(self, backend, sample_rate, sample_width):
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.frames = []
+
+    def feed(self, frame):
+        self.frames.append(frame)
+        return None  # No partial results
+
+    def finish(self):
+        audio = sr.AudioData(b"".join(self.frames), self.sample_rate, self.sample_width)
+        return self.backend.transcribe(audio)
+
+    def cancel(self):
+        self.frames = []
+
+class VoskBackend:
+    """Vosk (offline). The model is loaded once; partial hypotheses stream while the user speaks."""
+
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, recognizer=None, model_path=VOSK_MODEL_PATH):
+        import vosk
+        vosk.SetLogLevel(-1)
+        print(f"🔄 Loading Vosk model from {model_path}...")
+        self.vosk = vosk
+        self.model = vosk.Model(model_path)
+
+    def start(self, sample_rate, sample_width):
+        return VoskSession(self.vosk.KaldiRecognizer(self.model, sample_rate))
+
+class VoskSession:
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.text = []
+
+    def feed(self, frame):
+        if self.recognizer.AcceptWaveform(frame):
+            # Vosk finalized a segment (pause inside the utterance)
+            self.text.append(json.loads(self.recognizer.Result()).get("text", ""))
+            return " ".join(self.text).strip()
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return " ".join(self.text + [partial]).strip()
+
+    def finish(self):
+        self.text.append(json.loads(self.recognizer.FinalResult()).get("text", ""))
+        text = " ".join(self.text).strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def cancel(self):
+        self.recognizer.Reset()
+
+class SphinxBackend:
+    """PocketSphinx 5 (offline). One resident decoder; partial hypotheses as audio arrives."""
+
+    name = "sphinx"
+    streaming = True
+
+    def __init__(self, recognizer=None):
+        from pocketsphinx import Decoder
+        print("🔄 Loading PocketSphinx decoder...")
+        self.decoder = Decoder(samprate=16000)
+        self.lock = threading.Lock()  # One utterance at a time on the shared decoder
+
+    def start(self, sample_rate, sample_width):
+        return SphinxSession(self)
+
+class SphinxSession:
+    def __init__(self, backend):
+        self.backend = backend
+        self.decoder = backend.decoder
+        self.backend.lock.acquire()
+        self.decoder.start_utt()
+
+    def feed(self, frame):
+        self.decoder.process_raw(frame, False, False)
+        hypothesis = self.decoder.hyp()
+        return hypothesis.hypstr if hypothesis else None
+
+    def finish(self):
+        try:
+            self.decoder.end_utt()
+            hypothesis = self.decoder.hyp()
+        finally:
+            self.backend.lock.release()
+        if not hypothesis or not hypothesis.hypstr:
+            raise sr.UnknownValueError()
+        return hypothesis.hypstr
+
+    def cancel(self):
+        try:
+            self.decoder.end_utt()
+        finally:
+            self.backend.lock.release()
+
+BACKENDS = {
+    "google": GoogleBackend,
+    "vosk": VoskBackend,
+    "sphinx": SphinxBackend,
+}
+
+class Transcriber:
+    """
+    Turns utterances from core.audio_stream into text with the configured backend.
+
+    Streaming backends get every frame as it is captured and report partial
+    hypotheses; on_partial(text) may return True to end the utterance early
+    (e.g. once a complete command was recognized). Latency is measured from
+    the end of capture to the final text.
+    """
+
+    def __init__(self, recognizer, backend=STT_BACKEND):
+        try:
+            self.backend = BACKENDS[backend](recognizer)
+        except Exception as e:
+            if backend == "google":
+                raise
+            print(f"⚠️ Could not load {backend} speech recognition ({e}), using Google instead.")
+            self.backend = GoogleBackend(recognizer)
+        self.latencies = []
+        self.stats = {"utterances": 0, "early": 0, "unrecognized": 0, "errors": 0}
+
+    def listen(self, audio_stream, timeout=3, phrase_time_limit=8, on_partial=None):
+        """
+        Record one utterance and transcribe it.
+
+        Returns:
+            tuple: (text or "" if nothing was understood, True if on_partial ended it early)
+        """
+        source = audio_stream.source
+        session = self.backend.start(source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+        state = {"partial": None, "early": False}
+
+        def on_frame(frame):
+            partial = session.feed(frame)
+            if partial and partial != state["partial"]:
+                state["partial"] = partial
+            if on_partial and state["partial"] and on_partial(state["partial"]):
+                state["early"] = True
+                return True  # Stop capturing
+            return False
+
+        try:
+            with tracing.span("capture"):
+                audio = audio_stream.read_utterance(timeout=timeout, phrase_time_limit=phrase_time_limit, on_frame=on_frame)
+        except BaseException:
+            session.cancel()
+            raise
+        if audio is None:
+            session.cancel()
+            return "", False
+
+        started = time.perf_counter()
+        try:
+            with tracing.span("recognize", backend=self.backend.name):
+                text = session.finish()
+        except sr.UnknownValueError:
+            self.stats["unrecognized"] += 1
+            return "", state["early"]
+        except sr.RequestError:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self.record(time.perf_counter() - started, state["early"])
+        return text.lower(), state["early"]
+
+    def record(self, seconds, early):
+        self.stats["utterances"] += 1
+        if early:
+            self.stats["early"] += 1
+        self.latencies.append(seconds * 1000)
+        del self.latencies[:-LATENCY_SAMPLES]
+
+    def stt_stats(self):
+        """Returns the backend, utterance counts and recognition latency (ms, end of capture to text)."""
+        latencies = sorted(self.latencies)
+        stats = dict(self.stats, backend=self.backend.name)
+        if latencies:
+            stats["avg_ms"] = round(sum(latencies) / len(latencies), 1)
+            stats["p95_ms"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1)
+        return stats
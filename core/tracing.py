@@ -0,0 +1,291 @@
+# Lightweight tracing: one trace per voice interaction, made of nested timed spans.
+#
+#   with tracing.trace("interaction") as interaction:
+#       with tracing.span("listen"):
+#           ...
+#
+# The current span lives in a contextvar, so nesting follows the code. Work
+# handed to another thread keeps its parent by starting a span before the
+# thread starts and entering it there with tracing.use(span). A trace is
+# written once its last span has ended (replies are often still being spoken
+# after the command handler returned), one JSON object per line, to a
+# rotating file that the UI's debug overlay can follow.
+#
+# Outside a trace (UI taps, the broker daemon) spans are no-ops.
+
+import contextvars
+import functools
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Relative trace paths are resolved against the project folder, so the voice
+# loop and the UI find the same file whatever directory they were started from
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tracing settings (override in .env)
+TRACING = os.getenv("FROSTY_TRACING", "1") == "1"
+TRACE_PATH = os.path.join(PROJECT_DIR, os.getenv("FROSTY_TRACE_PATH", ".frosty_traces.jsonl"))
+TRACE_MAX_BYTES = int(os.getenv("FROSTY_TRACE_MAX_KB", "1024")) * 1024
+TRACE_BACKUPS = 3  # Rotated files kept (.1 ... .3)
+
+current = contextvars.ContextVar("frosty_span", default=None)
+span_ids = itertools.count(1)
+trace_log = None
+log_lock = threading.Lock()  # Also guards trace_stats (traces finish on whichever thread ends their last span)
+trace_stats = {"written": 0, "discarded": 0}
+
+class Trace:
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.wall_start = time.time()
+        self.started = time.perf_counter()
+        self.records = []
+        self.open = 0
+        self.done = False
+        self.discarded = False
+        self.lock = threading.Lock()
+
+    def span_started(self):
+        with self.lock:
+            self.open += 1
+
+    def span_ended(self, span):
+        with self.lock:
+            self.records.append(span.to_record())
+            self.open -= 1
+            finished = self.open == 0
+            if finished:
+                self.done = True
+        if finished:
+            write(self)
+
+class Span:
+    """A timed piece of work. end() is idempotent; spans of finished traces are never started."""
+
+    def __init__(self, trace, name, parent, attrs):
+        self.trace = trace
+        self.name = name
+        self.id = next(span_ids)
+        self.parent_id = parent.id if parent else None
+        self.attrs = attrs
+        self.error = None
+        self.started = time.perf_counter()
+        self.duration = None
+        trace.span_started()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def discard(self):
+        """Drop the whole trace instead of writing it (e.g. nobody spoke)."""
+        self.trace.discarded = True
+
+    def end(self, error=None):
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self.started
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.trace.span_ended(self)
+
+    def to_record(self):
+        record = {
+            "id": self.id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "start_ms": round((self.started - self.trace.started) * 1000, 1),
+            "duration_ms": round(self.duration * 1000, 1),
+        }
+        if self.attrs:
+            record["attrs"] = self.attrs
+        if self.error:
+            record["error"] = self.error
+        return record
+
+class NullSpan:
+    """Stands in for a span when there is no trace to record into."""
+
+    trace = None
+
+    def set(self, **attrs):
+        pass
+
+    def elapsed_ms(self):
+        return 0.0
+
+    def discard(self):
+        pass
+
+    def end(self, error=None):
+        pass
+
+NULL_SPAN = NullSpan()
+
+def current_span():
+    return current.get() or NULL_SPAN
+
+def start_span(name, parent=None, **attrs):
+    """
+    Start a span under parent (default: the current span) without making it
+    current. Call .end() when done; meant for generators and for work that
+    continues on another thread (see use()).
+    """
+    parent = parent or current.get()
+    if not parent or not parent.trace or parent.trace.done:
+        return NULL_SPAN
+    return Span(parent.trace, name, parent, attrs)
+
+@contextmanager
+def use(span):
+    """Make span current for the block (on this thread) and end it afterwards."""
+    token = current.set(span) if span.trace else None
+    try:
+        yield span
+    except BaseException as e:
+        span.end(e)
+        raise
+    finally:
+        if token:
+            current.reset(token)
+        span.end()
+
+@contextmanager
+def span(name, **attrs):
+    """Time the block as a child of the current span."""
+    with use(start_span(name, **attrs)) as child:
+        yield child
+
+def traced(name):
+    """Decorator that times every call of a function as a span."""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+@contextmanager
+def trace(name, **attrs):
+    """Start a new trace whose root span covers the block."""
+    if not TRACING:
+        yield NULL_SPAN
+        return
+    root = Span(Trace(name), name, None, attrs)
+    with use(root):
+        yield root
+
+# ------------------ Output ------------------
+
+def get_trace_log():
+    global trace_log
+    with log_lock:
+        if trace_log is None:
+            trace_log = logging.getLogger("frosty.traces")
+            trace_log.setLevel(logging.INFO)
+            trace_log.propagate = False
+            handler = RotatingFileHandler(TRACE_PATH, maxBytes=TRACE_MAX_BYTES, backupCount=TRACE_BACKUPS,
+                                          encoding="utf-8", delay=True)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            trace_log.addHandler(handler)
+    return trace_log
+
+def write(trace):
+    if trace.discarded:
+        count("discarded")
+        return
+
+    spans = sorted(trace.records, key=lambda record: (record["start_ms"], record["id"]))
+    root = next((record for record in spans if record["parent"] is None), spans[0])
+    record = {
+        "trace_id": trace.id,
+        "name": trace.name,
+        "started_at": round(trace.wall_start, 3),
+        "duration_ms": round(max(r["start_ms"] + r["duration_ms"] for r in spans), 1),
+        "attrs": root.get("attrs", {}),
+        "spans": spans,
+    }
+    count("written")
+    print(f"🧭 {summarize(record)}")
+    try:
+        get_trace_log().info(json.dumps(record, default=str))
+    except Exception as e:
+        print(f"⚠️ Could not write trace: {e}")
+
+def count(stat):
+    with log_lock:
+        trace_stats[stat] += 1
+
+def summarize(record):
+    """One line, e.g. "interaction 2.31s: listen 1.20s, intent.weather 0.42s, tts.say 0.69s"."""
+    root_ids = {item["id"] for item in record["spans"] if item["parent"] is None}
+    children = [item for item in record["spans"] if item["parent"] in root_ids]
+    parts = ", ".join(f"{item['name']} {item['duration_ms'] / 1000:.2f}s" for item in children)
+    return f"{record['name']} {record['duration_ms'] / 1000:.2f}s" + (f": {parts}" if parts else "")
+
+def format_tree(record, max_depth=2):
+    """Indented span tree (for the debug overlay), down to max_depth levels below the root."""
+    by_parent = {}
+    for item in record["spans"]:
+        by_parent.setdefault(item["parent"], []).append(item)
+
+    command = record.get("attrs", {}).get("command")
+    lines = [f"{record['name']} {record['duration_ms']:.0f}ms" + (f" \"{command}\"" if command else "")]
+    def add(parent_id, depth):
+        for item in by_parent.get(parent_id, []):
+            error = " ❌" if item.get("error") else ""
+            lines.append(f"{'  ' * depth}{item['name']} {item['duration_ms']:.0f}ms{error}")
+            if depth < max_depth:
+                add(item["id"], depth + 1)
+    for root in by_parent.get(None, []):
+        add(root["id"], 1)
+    return "\n".join(lines)
+
+def read_new_traces(position):
+    """
+    Traces appended to TRACE_PATH since position (a dict this function keeps
+    the file offset in), so another process can follow the voice loop's traces.
+    """
+    try:
+        size = os.path.getsize(TRACE_PATH)
+    except OSError:
+        position["offset"] = 0  # Not written yet; read it from the start once it is
+        return []
+    offset = position.get("offset", size)  # Start at the end the first time
+    if size < offset:
+        offset = 0  # Rotated
+    if size == offset:
+        position["offset"] = offset
+        return []
+
+    records = []
+    with open(TRACE_PATH, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    complete = data.rfind(b"\n") + 1  # Leave a half-written last line for next time
+    position["offset"] = offset + complete
+    for line in data[:complete].splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
+
+def get_trace_stats():
+    """Returns how many traces were written and discarded."""
+    with log_lock:
+        return dict(trace_stats)
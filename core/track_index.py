@@ -0,0 +1,252 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+# Track index settings (override in .env)
+TRACK_INDEX_PATH = os.getenv("TRACK_INDEX_PATH", ".track_index.json")
+MATCH_THRESHOLD = float(os.getenv("TRACK_MATCH_THRESHOLD", "0.7"))  # Minimum score for a local hit
+PLAYS_BONUS = 0.02  # Per play (capped), so favourites win close calls
+MAX_PLAYS_BONUS = 0.1
+OPTIONAL_WORDS = {"the", "a", "an"}  # Title words a query may leave out
+RARE_KEYS = 8  # Index keys used to collect candidates per lookup
+MAX_CANDIDATES = 25  # Tracks scored per lookup (keeps large indexes under a millisecond)
+
+SOUNDEX_CODES = {}
+for letters, code in (("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"), ("l", "4"), ("mn", "5"), ("r", "6")):
+    for letter in letters:
+        SOUNDEX_CODES[letter] = code
+
+# Version and featuring suffixes Spotify adds to titles ("Hey Jude - Remastered 2015", "Song - Live", "Song feat. X")
+EXTRAS = re.compile(
+    r"\(.*?\)|\[.*?\]"
+    r"|\s-\s.*\b(?:remaster\w*|live|version|edit|mix|remix|mono|stereo|acoustic|demo|feat|ft|featuring|from|single)\b.*"
+    r"|\s(?:feat|ft|featuring)\b.*"
+)
+
+def normalize(text):
+    """Lowercase, drop punctuation and version extras ("(Remastered 2011)", " - Live", " feat. X")."""
+    text = EXTRAS.sub(" ", text.lower())
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+def readings(spoken):
+    """
+    Ways to read a normalized query: as it was said ("stand by me") and,
+    for every "by" in it, as title and artist ("without me by eminem").
+    """
+    words = spoken.split()
+    options = [spoken]
+    for i, word in enumerate(words):
+        if word == "by" and 0 < i < len(words) - 1:
+            options.append(" ".join(words[:i] + words[i + 1:]))
+    return options
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def soundex(word):
+    """Soundex code of a word, so "eminem" and "eminim" share a key."""
+    if not word:
+        return ""
+    code = word[0]
+    last = SOUNDEX_CODES.get(word[0], "")
+    for letter in word[1:]:
+        digit = SOUNDEX_CODES.get(letter, "")
+        if digit and digit != last:
+            code += digit
+        if letter not in "hw":
+            last = digit
+    return (code + "000")[:4]
+
+def phonetic_keys(text):
+    return {soundex(word) for word in text.split() if not word.isdigit()}
+
+def features(text):
+    """Trigrams, space-free trigrams and sounds of a normalized string (precomputed per track)."""
+    return trigrams(text), trigrams(text.replace(" ", "")), phonetic_keys(text)
+
+def same_word(a, b):
+    """Exact, or sounds alike with the same start (transcriptions like "eminim" for "eminem")."""
+    return a == b or (len(a) > 2 and len(b) > 2 and a[:2] == b[:2] and soundex(a) == soundex(b))
+
+def join_split_words(words, known):
+    """Merge neighbours the transcription split ("with out" -> "without") when the track has the joined word."""
+    joined = []
+    i = 0
+    while i < len(words):
+        if i + 1 < len(words) and words[i] + words[i + 1] in known:
+            joined.append(words[i] + words[i + 1])
+            i += 2
+        else:
+            joined.append(words[i])
+            i += 1
+    return joined
+
+def words_match(query_words, title_words, track_words):
+    """
+    Every spoken word is in the track's title or artist, and the whole title
+    was spoken, so "love" never resolves to "Love Story" nor "someone like me"
+    to "Someone Like You". Words split in two ("with out me") count as one.
+    """
+    query_words = join_split_words(query_words, set(track_words))
+    return (all(any(same_word(word, other) for other in track_words) for word in query_words)
+            and all(any(same_word(word, other) for other in query_words)
+                    for word in title_words if word not in OPTIONAL_WORDS))
+
+def overlap(a, b):
+    return len(a & b) / len(a | b) if b else 0.0
+
+def similarity(query, text):
+    """
+    0-1 score between two features() tuples: trigram overlap (also with spaces
+    removed, for "with out me"), nudged by how many words sound alike.
+    """
+    gram_score = max(overlap(query[0], text[0]), overlap(query[1], text[1]))
+    sound_score = len(query[2] & text[2]) / len(query[2]) if query[2] else 0.0
+    return 0.7 * gram_score + 0.3 * sound_score
+
+class TrackIndex:
+    """
+    Persistent index of tracks that were played.
+
+    Entries (title, artist, uri, plays) are saved to TRACK_INDEX_PATH and
+    indexed by character trigrams and Soundex word codes, so a transcription
+    like "play without me by eminim" resolves locally without a search call.
+    A local hit needs a score of at least threshold and every word to match
+    (see words_match()); anything less goes to Spotify search.
+    """
+
+    def __init__(self, path=TRACK_INDEX_PATH, threshold=MATCH_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self.tracks = {}  # uri -> {"title", "artist", "uri", "plays"}
+        self.features = {}  # uri -> features() of "title" and "title artist"
+        self.words = {}  # uri -> (title words, title and artist words)
+        self.gram_index = defaultdict(set)  # trigram -> uris
+        self.sound_index = defaultdict(set)  # soundex code -> uris
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "lookup_us": 0.0, "lookups": 0}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        for entry in entries:
+            self.insert(entry)
+
+    def save(self):
+        with self.lock:
+            entries = list(self.tracks.values())
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save track index: {e}")
+
+    def keys(self, entry):
+        title = normalize(entry["title"])
+        return title, f"{title} {normalize(entry['artist'])}"
+
+    def insert(self, entry):
+        uri = entry["uri"]
+        self.tracks[uri] = entry
+        self.features[uri] = [features(key) for key in self.keys(entry)]
+        title, full = self.keys(entry)
+        self.words[uri] = (title.split(), full.split())
+        for grams, _, sounds in self.features[uri]:
+            for gram in grams:
+                self.gram_index[gram].add(uri)
+            for sound in sounds:
+                self.sound_index[sound].add(uri)
+
+    def record_play(self, item):
+        """Index a Spotify track item that was actually played (search results that weren't chosen stay out)."""
+        with self.lock:
+            if item["uri"] not in self.tracks:
+                self.insert({
+                    "title": item["name"],
+                    "artist": item["artists"][0]["name"] if item.get("artists") else "",
+                    "uri": item["uri"],
+                    "plays": 0,
+                })
+            self.tracks[item["uri"]]["plays"] += 1
+        self.save()
+
+    def score(self, query, entry, entry_features=None):
+        """Score a features() tuple of the query against a track."""
+        entry_features = entry_features or [features(key) for key in self.keys(entry)]
+        # Match either "title" or "title artist" (for "play <song> by <artist>")
+        best = max(similarity(query, key) for key in entry_features)
+        return best + min(entry["plays"] * PLAYS_BONUS, MAX_PLAYS_BONUS)
+
+    def lookup(self, query):
+        """Returns the best indexed track for a spoken query, or None if nothing is close enough."""
+        started = time.perf_counter()
+        spoken = normalize(query)
+        options = [(features(text), text.split()) for text in readings(spoken)]
+        query = options[0][0]  # Has every spoken word, so it finds the candidates of all readings
+
+        with self.lock:
+            # Collect candidates from the query's rarest trigrams / sounds (common ones
+            # like " lo" match half the index), then fully score only the best few
+            keys = [self.gram_index.get(gram, ()) for gram in query[0]]
+            keys += [self.sound_index.get(sound, ()) for sound in query[2]]
+            shared = Counter()
+            for uris in sorted((uris for uris in keys if uris), key=len)[:RARE_KEYS]:
+                shared.update(uris)
+
+            best, best_score = None, 0.0
+            for uri, _ in shared.most_common(MAX_CANDIDATES):
+                entry = self.tracks[uri]
+                for reading, query_words in options:
+                    if not words_match(query_words, *self.words[uri]):
+                        continue
+                    score = self.score(reading, entry, self.features[uri])
+                    if score > best_score:
+                        best, best_score = entry, score
+
+            hit = best is not None and best_score >= self.threshold
+            self.stats["hits" if hit else "misses"] += 1
+            self.stats["lookups"] += 1
+            self.stats["lookup_us"] += (time.perf_counter() - started) * 1_000_000
+        return dict(best) if hit else None
+
+    def best_match(self, query, items):
+        """Pick the search result that best matches the query instead of blindly taking the first."""
+        options = [features(text) for text in readings(normalize(query))]
+        def score(item):
+            artist = item["artists"][0]["name"] if item.get("artists") else ""
+            entry = {"title": item["name"], "artist": artist, "plays": 0}
+            return max(self.score(reading, entry) for reading in options)
+        return max(items, key=score) if items else None
+
+    def index_stats(self):
+        """Returns size, hit rate and average lookup time (microseconds)."""
+        with self.lock:
+            lookups = self.stats["lookups"]
+            return {
+                "tracks": len(self.tracks),
+                "hits": self.stats["hits"],
+                "misses": self.stats["misses"],
+                "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+                "avg_lookup_us": round(self.stats["lookup_us"] / lookups, 1) if lookups else 0.0,
+            }
+
+track_index = None
+index_lock = threading.Lock()
+
+def get_track_index():
+    """Returns the shared track index, loading it from disk on first use."""
+    global track_index
+    with index_lock:
+        if track_index is None:
+            track_index = TrackIndex()
+        return track_index
@@ -0,0 +1,203 @@
+import hashlib
+import itertools
+import os
+import queue
+import threading
+import wave
+
+from core import tracing
+
+# Voice settings
+RATE = 150  # Speech speed
+# Male English (US) Voice - Microsoft David
+VOICE = "HKEY_LOCAL_MACHINE\\SOFTWARE\\Microsoft\\Speech\\Voices\\Tokens\\TTS_MS_EN-US_DAVID_11.0"
+
+# Priorities (lower runs first)
+PRIORITY_HIGH = 0  # Prompts the user is waiting on ("How can I assist you?")
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# Fixed phrases rendered to audio once and played from disk afterwards
+PHRASE_CACHE_DIR = os.getenv("TTS_CACHE_DIR", ".tts_cache")
+CACHED_PHRASES = [
+    "Hello! Say 'Frosty' to activate me.",
+    "How can I assist you?",
+    "Goodbye! Have a great day!",
+    "Which city would you like the weather for?",
+    "I still didn't get a city name. Please try again.",
+    "I couldn't fetch the weather right now. Please check your internet connection.",
+    "Nothing is playing right now.",
+]
+PLAYBACK_CHUNK = 1024  # Frames per write, so cached audio can be interrupted quickly
+
+def phrase_path(text):
+    key = hashlib.sha1(f"{VOICE}|{RATE}|{text}".encode("utf-8")).hexdigest()
+    return os.path.join(PHRASE_CACHE_DIR, f"{key}.wav")
+
+class TTSWorker:
+    """
+    Long-lived text-to-speech thread with a priority queue.
+
+    The pyttsx3 engine is created and used only on the worker thread.
+    say() returns immediately; interrupt() drops everything queued and
+    stops the current utterance (barge-in). Fixed phrases are rendered to
+    WAV once and played from the phrase cache afterwards.
+    """
+
+    def __init__(self):
+        self.queue = queue.PriorityQueue()
+        self.counter = itertools.count()  # Keeps FIFO order within a priority
+        self.generation = 0  # Bumped by interrupt(); older queued items are dropped
+        self.pending = 0  # Queued + speaking + open streams
+        self.lock = threading.Lock()
+        self.done = threading.Condition(self.lock)
+        self.cancel = threading.Event()
+        self.engine = None
+        self.audio = None
+        self.unrendered = [text for text in CACHED_PHRASES if not os.path.exists(phrase_path(text))]
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def say(self, text, priority=PRIORITY_NORMAL, on_start=None, generation=None):
+        """
+        Queue text to be spoken and return right away.
+
+        Pass the generation from begin_stream() so sentences of an interrupted
+        reply are dropped even if they were queued after the interrupt.
+        """
+        if not text:
+            return
+        with self.lock:
+            self.pending += 1
+            if generation is None:
+                generation = self.generation
+        span = tracing.start_span("tts.say", chars=len(text))  # Ends once spoken, so the trace waits for it
+        self.queue.put((priority, next(self.counter), generation, text, on_start, span))
+
+    def interrupt(self):
+        """Stop speaking now and drop everything that is queued."""
+        with self.lock:
+            self.generation += 1
+        self.cancel.set()
+
+    def busy(self):
+        with self.lock:
+            return self.pending > 0
+
+    def wait(self, timeout=None):
+        """Block until everything queued has been spoken (or dropped)."""
+        with self.done:
+            return self.done.wait_for(lambda: self.pending == 0, timeout)
+
+    def begin_stream(self):
+        """Mark a producer (e.g. a streaming LLM reply) as active so busy() stays true."""
+        with self.lock:
+            self.pending += 1
+            return self.generation
+
+    def end_stream(self):
+        self.finish_one()
+
+    def is_current(self, generation):
+        with self.lock:
+            return generation == self.generation
+
+    def finish_one(self):
+        with self.done:
+            self.pending -= 1
+            self.done.notify_all()
+
+    def get_engine(self):
+        if self.engine is None:
+            import pyttsx3
+            self.engine = pyttsx3.init()
+            self.engine.setProperty('rate', RATE)
+            self.engine.setProperty('voice', VOICE)
+            self.engine.connect('started-word', self.on_word)
+            print(f"✅ Using voice: Microsoft David (US Male)")
+        return self.engine
+
+    def on_word(self, *args, **kwargs):
+        if self.cancel.is_set():
+            self.engine.stop()  # Barge-in: only safe from inside an engine callback
+
+    def run(self):
+        while True:
+            try:
+                # While phrases are still unrendered, use quiet moments to render them
+                item = self.queue.get(timeout=1 if self.unrendered else None)
+            except queue.Empty:
+                self.render_next_phrase()
+                continue
+
+            _, _, generation, text, on_start, span = item
+            try:
+                if not self.is_current(generation):
+                    span.set(dropped=True)
+                    continue  # Interrupted while queued
+                self.cancel.clear()
+                span.set(queued_ms=round(span.elapsed_ms()))
+                if on_start:
+                    on_start()
+                cached = self.play_cached(text)
+                if not cached:
+                    engine = self.get_engine()
+                    engine.say(text)
+                    engine.runAndWait()
+                span.set(cached=cached)
+            except Exception as e:
+                span.end(e)
+                print(f"❌ Text-to-speech failed: {e}")
+            finally:
+                span.end()
+                self.finish_one()
+
+    def play_cached(self, text):
+        """Play a pre-rendered phrase. Returns False if it is not cached."""
+        path = phrase_path(text)
+        if not os.path.exists(path):
+            return False
+
+        import pyaudio
+        if self.audio is None:
+            self.audio = pyaudio.PyAudio()
+
+        with wave.open(path, "rb") as wav:
+            stream = self.audio.open(
+                format=self.audio.get_format_from_width(wav.getsampwidth()),
+                channels=wav.getnchannels(),
+                rate=wav.getframerate(),
+                output=True,
+            )
+            try:
+                data = wav.readframes(PLAYBACK_CHUNK)
+                while data and not self.cancel.is_set():
+                    stream.write(data)
+                    data = wav.readframes(PLAYBACK_CHUNK)
+            finally:
+                stream.stop_stream()
+                stream.close()
+        return True
+
+    def render_next_phrase(self):
+        """Render one fixed phrase to the cache (written to a temp file first, then renamed)."""
+        text = self.unrendered.pop(0)
+        path = phrase_path(text)
+        tmp_path = path[:-4] + ".part.wav"
+        try:
+            os.makedirs(PHRASE_CACHE_DIR, exist_ok=True)
+            engine = self.get_engine()
+            engine.save_to_file(text, tmp_path)
+            engine.runAndWait()
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"⚠️ Could not pre-render phrase: {e}")
+
+tts_worker = None
+
+def get_tts_worker():
+    """Returns the shared TTS worker, starting it on first use."""
+    global tts_worker
+    if tts_worker is None:
+        tts_worker = TTSWorker()
+    return tts_worker
@@ -1,87 +1,205 @@
 import speech_recognition as sr
-import pyttsx3
 import threading
+import time
+import os
 import sys
 from PyQt6.QtWidgets import QApplication
-from core.openai_api import get_ai_response
-from core.weather_api import get_weather  # Import the weather function
-
-# Initialize text-to-speech engine
-engine = pyttsx3.init()
-engine.setProperty('rate', 150)  # Adjust speech speed
-
-# Set Male English (US) Voice - Microsoft David
-selected_voice = "HKEY_LOCAL_MACHINE\\SOFTWARE\\Microsoft\\Speech\\Voices\\Tokens\\TTS_MS_EN-US_DAVID_11.0"
-engine.setProperty('voice', selected_voice)
-print(f"✅ Using voice: Microsoft David (US Male)")
+from core.broker_client import get_broker, submit
+from core.audio_stream import AudioStream, WakeWordDetector
+from core.stt import Transcriber
+from core.intents import match_intent
+from core.playback_state import describe_track
+from core.tts import get_tts_worker, PRIORITY_HIGH, PRIORITY_NORMAL
+from core import tracing
 
 # Global flag to exit assistant
 exit_flag = False  
 
-def speak(text: str):
+# Always-open microphone and local wake word gate (created on first use)
+recognizer = sr.Recognizer()
+audio_stream = None
+wake_word_detector = None
+transcriber = None  # Speech-to-text backend from STT_BACKEND (loaded once)
+
+# Commands that are complete as soon as they're recognized (no slot that could still be growing)
+EARLY_INTENTS = {"pause", "next", "previous", "time", "now_playing"}
+EARLY_STABLE_FRAMES = 3  # Partial result unchanged this many frames (~200 ms) before acting on it
+
+# Stream GPT replies sentence by sentence into speech (set FROSTY_STREAMING=0 to disable)
+STREAMING = os.getenv("FROSTY_STREAMING", "1") == "1"
+
+# Latency of the last spoken AI reply (seconds from request to first sentence / first audio)
+response_metrics = {"first_sentence_s": None, "first_audio_s": None, "total_s": None}
+
+def speak(text: str, wait: bool = False, priority: int = PRIORITY_NORMAL):
     """
-    Convert text to speech and play it.
+    Queue text on the TTS worker. Returns right away unless wait=True.
     """
-    if text:
-        def run():
-            engine.say(text)
-            engine.runAndWait()
+    tts = get_tts_worker()
+    tts.say(text, priority)
+    if wait:
+        tts.wait()  # For prompts that must finish before we listen again
+
+def speak_stream(sentences, started_at=None, on_done=None):
+    """
+    Speak sentences as they arrive.
+
+    A producer thread queues each sentence on the TTS worker while the next
+    ones are still being generated, so audio starts after the first sentence.
+    It stops early if the reply is interrupted (barge-in).
+    """
+    started_at = started_at or time.perf_counter()
+    response_metrics["first_audio_s"] = None
+    tts = get_tts_worker()
+    generation = tts.begin_stream()
+    stream_span = tracing.start_span("speak_stream")  # Entered on the producer thread
+
+    def on_first_audio():
+        if response_metrics["first_audio_s"] is None:
+            response_metrics["first_audio_s"] = time.perf_counter() - started_at
+
+    def produce():
+        try:
+            with tracing.use(stream_span):
+                for sentence in sentences:
+                    if not tts.is_current(generation):
+                        stream_span.set(interrupted=True)
+                        break  # Interrupted, stop generating
+                    tts.say(sentence, on_start=on_first_audio, generation=generation)
+        finally:
+            tts.end_stream()
+            if on_done:
+                on_done()
+
+    threading.Thread(target=produce, daemon=True).start()
+
+def respond(command: str):
+    """Ask GPT and speak the reply, streaming it into speech when enabled."""
+    started_at = time.perf_counter()
+
+    broker = get_broker()
+
+    if not STREAMING:
+        try:
+            speak(broker.call("ai", command))
+        except Exception as e:  # Broker restarted or timed out; keep the voice loop alive
+            speak(f"Error: {e}")
+        return
 
-        speech_thread = threading.Thread(target=run)
-        speech_thread.start()
-        speech_thread.join()  # Ensure speech finishes before next action
+    response_metrics["first_sentence_s"] = None
+
+    def sentences():
+        try:
+            for sentence in broker.stream("ai_stream", command):
+                if response_metrics["first_sentence_s"] is None:
+                    response_metrics["first_sentence_s"] = time.perf_counter() - started_at
+                yield sentence
+        except Exception as e:
+            yield f"Error: {e}"
+
+    def report():
+        response_metrics["total_s"] = time.perf_counter() - started_at
+        if response_metrics["first_sentence_s"] is not None and response_metrics["first_audio_s"] is not None:
+            print(f"⏱ First sentence {response_metrics['first_sentence_s']:.2f}s, "
+                  f"first audio {response_metrics['first_audio_s']:.2f}s")
+
+    speak_stream(sentences(), started_at, on_done=report)
 
 def listen() -> str:
     """
     Capture audio from the user and convert it to text.
-    Detects weather queries and calls the weather function directly.
     """
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        recognizer.adjust_for_ambient_noise(source, duration=0.5)  # Faster noise calibration
-        recognizer.energy_threshold = 300  # Reduce background noise detection
-        recognizer.dynamic_energy_threshold = True  # Auto-adjust sensitivity
+    with tracing.span("listen") as span:
+        stream = get_audio_stream()
         print("🎤 Listening...")
 
         try:
-            audio = recognizer.listen(source, timeout=3)  # Short timeout for quick detection
-            user_input = recognizer.recognize_google(audio).lower()
-            print(f"🔍 Heard: {user_input}")
+            # Short timeout for quick detection; streaming backends can stop early on a known command
+            user_input, early = get_transcriber().listen(stream, timeout=3, on_partial=early_intent_check())
+        except sr.RequestError as e:
+            span.end(e)
+            return "Error: Could not reach speech recognition service."
+
+        if user_input:
+            span.set(early=early)
+            print(f"🔍 Heard: {user_input}" + (" (before end of speech)" if early else ""))
+        return user_input
 
-            # **Directly Handle Weather Queries Here**
-            if "weather" in user_input:
-                process_weather_query(user_input)  # Call weather function immediately
-                return ""  # Stop further processing
+def early_intent_check():
+    """
+    Returns an on_partial callback that ends the utterance once a stable
+    partial result already matches a slotless command like "pause".
+    """
+    state = {"text": None, "frames": 0}
 
-            return user_input
+    def on_partial(text):
+        if text != state["text"]:
+            state["text"], state["frames"] = text, 0
+            return False
+        state["frames"] += 1
+        if state["frames"] != EARLY_STABLE_FRAMES:
+            return False
+        intent, _ = match_intent(text)
+        return intent in EARLY_INTENTS
 
-        except sr.UnknownValueError:
-            return ""
-        except sr.RequestError:
-            return "Error: Could not reach speech recognition service."
-        except sr.WaitTimeoutError:
-            return ""
+    return on_partial
 
-def process_weather_query(command: str):
+def get_transcriber():
+    global transcriber
+    if transcriber is None:
+        transcriber = Transcriber(recognizer)
+    return transcriber
+
+def get_audio_stream():
+    """Opens the microphone once (with a single noise calibration) and keeps it open."""
+    global audio_stream
+    if audio_stream is None:
+        audio_stream = AudioStream()
+        audio_stream.start()
+    return audio_stream
+
+def wait_for_wake_word():
     """
-    Extracts city from command, cleans unnecessary words, and fetches weather.
+    Block until the wake word is heard.
+
+    Utterances are checked offline, so nothing is sent to Google until
+    the user actually says 'Frosty'.
     """
-    city = ""
+    while not exit_flag:
+        if heard_wake_word(timeout=1):
+            return True
+
+    return False
+
+def heard_wake_word(timeout):
+    """Check the next utterance (if any starts within timeout) for the wake word, offline."""
+    global wake_word_detector
+    stream = get_audio_stream()
+    if wake_word_detector is None:
+        wake_word_detector = WakeWordDetector(recognizer)
 
-    # Extract city name (everything after "in")
-    words = command.split()
-    if "in" in words:
-        city_index = words.index("in") + 1
-        if city_index < len(words):  # Ensure city exists after "in"
-            city = " ".join(words[city_index:])
+    audio = stream.read_utterance(timeout=timeout)
+    if audio is not None and wake_word_detector.heard(audio):
+        print("❄️ Wake word detected")
+        note_activity()
+        return True
+    return False
 
-    # **Clean city name (remove words like "today", "tomorrow")**
-    words_to_remove = ["today", "tomorrow", "right now", "currently", "now"]
-    city = " ".join([word for word in city.split() if word not in words_to_remove])
+def note_activity():
+    """Tell the UI (possibly another process, via the broker) that the user spoke, so it leaves idle mode."""
+    submit("activity", "voice")
+
+def process_weather_query(command: str, city: str = None):
+    """
+    Fetches weather for the city slot of a weather command, asking for one if it is missing.
+    """
+    if city is None:
+        _, slots = match_intent(command)
+        city = slots.get("city", "")
 
     # If no city was detected, ask the user for a city name
     if not city or len(city) < 2:  # Prevents invalid city names
-        speak("Which city would you like the weather for?")
+        speak("Which city would you like the weather for?", wait=True)
         city = listen().strip()  # Listen again for a city name
 
     # If still no city is detected, return an error
@@ -89,9 +207,13 @@ def process_weather_query(command: str):
         speak("I still didn't get a city name. Please try again.")
         return  # **Stops further AI processing after weather response**
 
-    weather_response = get_weather(city)  # Fetch real-time weather data
-    print(f"🤖 Weather API Response -> {weather_response}")  #Message
-    speak(weather_response)  # Speak the actual weather report
+    with tracing.span("weather_query", city=city):
+        try:
+            weather_response = get_broker().call("weather", city)  # Fetch real-time weather data
+        except Exception as e:
+            weather_response = f"Error: {e}"
+        print(f"🤖 Weather API Response -> {weather_response}")  #Message
+        speak(weather_response)  # Speak the actual weather report
 
     return  # **Ensures AI does NOT process any further after weather query**
 
@@ -102,28 +224,83 @@ def main():
     global exit_flag
 
     print("❄️ Frosty is always ready. Say 'Frosty' to wake me.")
-    speak("Hello! Say 'Frosty' to activate me.")
+    speak("Hello! Say 'Frosty' to activate me.", wait=True)  # Don't let the greeting wake us
 
     while not exit_flag:
-        user_input = listen()  # Always listen
-        if "frosty" in user_input:
-            speak("How can I assist you?")
+        if wait_for_wake_word():  # Always listen (locally)
+            speak("How can I assist you?", wait=True, priority=PRIORITY_HIGH)
             handle_commands()  # Enter conversation mode
 
 def handle_commands():
     """Listens for multiple AI commands after wake word is detected."""
     global exit_flag
 
+    tts = get_tts_worker()
+    submit("new_conversation")  # GPT history (and with it the response cache key) starts fresh
+
     while not exit_flag:
-        command = listen()
-
-        if command in ["exit", "quit", "stop"]:
-            speak("Goodbye! Have a great day!")
-            exit_flag = True
-            QApplication.quit()  # Properly exit the application
-            return
-
-        # **Process OpenAI commands ONLY if it's NOT a weather query**
-        if "weather" not in command:  # Ensures OpenAI API is NEVER called after weather
-            response = get_ai_response(command)
-            speak(response)  # AI keeps listening after response
+        if tts.busy():
+            # Frosty is talking: only listen (offline) for the wake word to barge in
+            if heard_wake_word(timeout=0.5):
+                tts.interrupt()
+                print("✋ Interrupted")
+            continue
+
+        # One trace per interaction, from listening to the end of the spoken reply
+        with tracing.trace("interaction") as interaction:
+            command = listen()
+            if not command:
+                interaction.discard()  # Nobody spoke
+                continue
+            interaction.set(command=command)
+            note_activity()
+
+            if not handle_command(command):
+                return
+
+def handle_command(command: str) -> bool:
+    """Runs one recognized command. Returns False once the user said goodbye."""
+    global exit_flag
+
+    intent, slots = match_intent(command)
+    tracing.current_span().set(intent=intent or "ai")
+
+    if intent == "exit":
+        speak("Goodbye! Have a great day!", wait=True)
+        exit_flag = True
+        QApplication.quit()  # Properly exit the application
+        return False
+
+    # **Known commands run locally, everything else goes to OpenAI**
+    handler = INTENT_HANDLERS.get(intent)
+    with tracing.span(f"intent.{intent or 'ai'}"):
+        if handler:
+            handler(command, slots)
+        else:
+            respond(command)  # AI keeps listening after response
+    return True
+
+def say_time(command, slots):
+    speak(time.strftime("It's %I:%M %p."))
+
+def say_now_playing(command, slots):
+    # Shared with the UI; only hits Spotify if nobody polled in the last few seconds
+    try:
+        track_info = describe_track(get_broker().call("playback_state", 5))
+    except Exception as e:
+        speak(f"Error: {e}")
+        return
+    speak(f"This is {track_info}." if track_info else "Nothing is playing right now.")
+
+# Local actions for intents matched in core.intents (no LLM round trip)
+INTENT_HANDLERS = {
+    "weather": lambda command, slots: process_weather_query(command, slots.get("city", "")),
+    # Spotify commands go through the broker's debounced queue; the result is spoken when it finishes
+    "play": lambda command, slots: submit("spotify", "play", on_result=speak),
+    "play_song": lambda command, slots: submit("spotify", "play_song", slots["song"], on_result=speak),
+    "pause": lambda command, slots: submit("spotify", "pause", on_result=speak),
+    "next": lambda command, slots: submit("spotify", "next", on_result=speak),
+    "previous": lambda command, slots: submit("spotify", "previous", on_result=speak),
+    "time": say_time,
+    "now_playing": say_now_playing,
+}
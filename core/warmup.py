@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# Load environment variables from .env file (this module can be imported before the API modules)
+load_dotenv()
+
+# name -> {"seconds", "result", "error"} for every finished task
+results = {}
+listeners = []
+lock = threading.Lock()
+started_at = None
+
+def warm_spotify():
+    """Authenticate and resolve this PC's device, so the first command skips both."""
+    from core.spotify_api import get_spotify_client, find_local_device
+    device_id = find_local_device(get_spotify_client())
+    return device_id or "no local device"
+
+def warm_playback():
+    """Fetch the initial playback state into the shared service (screens get it on subscribe)."""
+    from core.playback_state import get_playback_service, describe_track
+    service = get_playback_service()
+    service.poll()
+    return describe_track(service.get_state()) or "nothing playing"
+
+def warm_weather():
+    """Fetch the weather for CITY into the weather cache and return the report."""
+    from core.weather_api import get_weather
+    return get_weather(os.getenv("CITY", "Berlin"))  # Read when it runs, after .env was loaded
+
+def warm_openai():
+    """Open a pooled (keep-alive) connection to OpenAI with a cheap authenticated call."""
+    if not os.getenv("OPENAI_API_KEY"):
+        return "skipped (no API key)"
+    from core.openai_api import get_openai_client
+    get_openai_client().models.list()
+    return "connected"
+
+TASKS = {
+    "spotify": warm_spotify,
+    "playback": warm_playback,
+    "weather": warm_weather,
+    "openai": warm_openai,
+}
+
+def add_listener(listener):
+    """
+    Register listener(name, result, error), called (on a worker thread) as
+    each task finishes. Tasks that already finished are replayed right away.
+    """
+    with lock:
+        listeners.append(listener)
+        finished = list(results.items())
+    for name, entry in finished:
+        listener(name, entry["result"], entry["error"])
+
+def run_task(name, task):
+    task_started = time.perf_counter()
+    result, error = None, None
+    try:
+        result = task()
+    except Exception as e:
+        error = e
+
+    seconds = time.perf_counter() - task_started
+    with lock:
+        results[name] = {"seconds": seconds, "result": result, "error": error}
+        current = list(listeners)
+    print(f"🔥 Warm-up {name}: {seconds:.2f}s" + (f" ❌ {error}" if error else ""))
+
+    for listener in current:
+        try:
+            listener(name, result, error)
+        except Exception as e:
+            print(f"⚠️ Warm-up listener failed: {e}")
+
+def run_all(tasks):
+    with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="warmup") as pool:
+        for name, task in tasks.items():
+            pool.submit(run_task, name, task)
+    print(f"🔥 Warm-up finished in {time.perf_counter() - started_at:.2f}s: {summary()}")
+
+def start(listener=None, tasks=None):
+    """
+    Run every warm-up task concurrently in the background and return right away.
+    Does nothing if warm-up already started.
+    """
+    global started_at
+    if listener:
+        add_listener(listener)
+    with lock:
+        if started_at is not None:
+            return
+        started_at = time.perf_counter()
+    threading.Thread(target=run_all, args=(tasks or TASKS,), daemon=True).start()
+
+def summary():
+    """Per-task timings, e.g. "spotify 0.81s, weather 0.30s, openai failed"."""
+    with lock:
+        entries = sorted(results.items(), key=lambda item: item[1]["seconds"])
+    return ", ".join(
+        f"{name} {entry['seconds']:.2f}s" + (" failed" if entry["error"] else "")
+        for name, entry in entries
+    )
+
+def warmup_stats():
+    """Returns seconds per task and whether it succeeded."""
+    with lock:
+        return {name: {"seconds": round(entry["seconds"], 3), "ok": entry["error"] is None}
+                for name, entry in results.items()}
@@ -1,6 +1,13 @@
 import requests
 import os
+import json
+import tempfile
+import time
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
+from core.http_pool import get_session, get_timeout
+from core import tracing
 
 # Load environment variables from .env file
 load_dotenv()
@@ -9,8 +16,183 @@ load_dotenv()
 API_KEY = os.getenv("OPENWEATHER_API_KEY")
 CITY = os.getenv("CITY", "Berlin")  # Default to Berlin if not set
 COUNTRY_CODE = os.getenv("COUNTRY_CODE", "DE")  # Default to Germany
-BASE_URL = "http://api.openweathermap.org/data/2.5/weather"
+BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "http://api.openweathermap.org/data/2.5/weather")  # Override to use a local test server
 
+# Cache settings
+CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "600"))  # Seconds before data counts as stale
+CACHE_MAX_STALE = int(os.getenv("WEATHER_CACHE_MAX_STALE", "21600"))  # Older data is refetched before use
+CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_SIZE", "32"))
+CACHE_PATH = os.getenv("WEATHER_CACHE_PATH", ".weather_cache.json")
+
+# key -> {"data": {...}, "fetched_at": timestamp}, least recently used first
+weather_cache = OrderedDict()
+# (key, city label) -> {"report": str, "fetched_at": timestamp of the data it was built from}
+report_cache = OrderedDict()
+cache_lock = threading.Lock()
+save_lock = threading.Lock()  # One writer at a time, so an older snapshot never replaces a newer one
+cache_loaded = False
+refreshing = set()
+cache_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0}
+
+def cache_key(city, country, units):
+    """Normalize a query so "berlin ", "Berlin" and "BERLIN" share one entry."""
+    return f"{' '.join(city.lower().split())}|{country.strip().lower()}|{units.strip().lower()}"
+
+def load_cache():
+    """Load persisted weather data so a restart can answer before the network does."""
+    global cache_loaded
+    cache_loaded = True
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return
+
+    for key, entry in entries[-CACHE_MAX_ENTRIES:]:
+        weather_cache[key] = entry
+
+def save_cache():
+    """Write the structured cache to disk (atomically, so a crash never leaves half a file)."""
+    with save_lock:
+        with cache_lock:
+            entries = list(weather_cache.items())
+        write_cache_file(entries)
+
+def write_cache_file(entries):
+    tmp_path = None
+    try:
+        # A fresh temp file in the cache's directory, so os.replace stays atomic and no stale .tmp is reused
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=os.path.dirname(os.path.abspath(CACHE_PATH)),
+                                         prefix=".weather_cache.", suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            json.dump(entries, f)
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError as e:
+        print(f"⚠️ Could not save weather cache: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def count(stat):
+    with cache_lock:
+        cache_stats[stat] += 1
+
+def store(key, data):
+    fetched_at = time.time()
+    with cache_lock:
+        weather_cache[key] = {"data": data, "fetched_at": fetched_at}
+        weather_cache.move_to_end(key)
+        while len(weather_cache) > CACHE_MAX_ENTRIES:
+            old_key, _ = weather_cache.popitem(last=False)
+            for report_key in [k for k in report_cache if k[0] == old_key]:
+                del report_cache[report_key]
+    save_cache()
+    return fetched_at
+
+@tracing.traced("weather.fetch")
+def fetch_weather_data(city, country, units):
+    """
+    Fetch current weather from OpenWeather.
+
+    Returns:
+        dict: Structured weather data, or None if the city was not found.
+    """
+    params = {
+        "q": f"{city},{country}",
+        "appid": API_KEY,
+        "units": units,
+    }
+
+    response = get_session("weather").get(BASE_URL, params=params, timeout=get_timeout("weather"))
+    data = response.json()
+
+    if data["cod"] != 200:
+        return None
+
+    return {
+        "description": data["weather"][0]["description"].capitalize(),
+        "temperature": data["main"]["temp"],
+        "humidity": data["main"]["humidity"],
+        "wind_speed": data["wind"]["speed"],
+    }
+
+def refresh_in_background(key, city, country, units):
+    """Revalidate a stale entry without making the caller wait."""
+    with cache_lock:
+        if key in refreshing:
+            return
+        refreshing.add(key)
+
+    def run():
+        try:
+            data = fetch_weather_data(city, country, units)
+            if data:
+                store(key, data)
+                count("refreshes")
+        except requests.exceptions.RequestException:
+            pass  # Keep serving the stale entry
+        finally:
+            with cache_lock:
+                refreshing.discard(key)
+
+    threading.Thread(target=run, daemon=True).start()
+
+def get_weather_data(city: str = CITY, country: str = COUNTRY_CODE, units: str = "metric"):
+    """
+    Returns structured weather data, served from cache when possible.
+
+    Fresh entries are returned directly. Stale entries are returned immediately
+    while a background refresh runs (stale-while-revalidate). Entries older than
+    CACHE_MAX_STALE are refetched, falling back to the old data if the network fails.
+
+    Returns:
+        tuple: (data dict or None if the city was not found, fetched_at timestamp)
+    """
+    key = cache_key(city, country, units)
+
+    with cache_lock:
+        if not cache_loaded:
+            load_cache()
+        entry = weather_cache.get(key)
+        if entry:
+            weather_cache.move_to_end(key)
+
+    if entry:
+        age = time.time() - entry["fetched_at"]
+        if age < CACHE_TTL:
+            count("hits")
+            tracing.current_span().set(cache="hit")
+            return entry["data"], entry["fetched_at"]
+        if age < CACHE_MAX_STALE:
+            count("stale_hits")
+            tracing.current_span().set(cache="stale")
+            refresh_in_background(key, city, country, units)
+            return entry["data"], entry["fetched_at"]
+
+    count("misses")
+    tracing.current_span().set(cache="miss")
+    try:
+        data = fetch_weather_data(city, country, units)
+    except requests.exceptions.RequestException:
+        if entry:
+            return entry["data"], entry["fetched_at"]
+        raise
+
+    if not data:
+        return None, 0
+
+    return data, store(key, data)
+
+def format_weather_report(city, data):
+    weather_report = (
+        f"🌍 Weather in {city}:\n"
+        f"🌡 Temp: {data['temperature']}°C\n"
+        f"🌦 Condition: {data['description']}\n"
+        f"💧 Humidity: {data['humidity']}%\n"
+        f"🌬 Wind Speed: {data['wind_speed']} m/s"
+    )
+    return weather_report
+
+@tracing.traced("weather.get")
 def get_weather(city: str = CITY):
     """
     Fetch current weather for a given city.
@@ -24,33 +206,32 @@ def get_weather(city: str = CITY):
     if not API_KEY:
         return "Weather service is unavailable. API key is missing."
 
-    params = {
-        "q": f"{city},{COUNTRY_CODE}",
-        "appid": API_KEY,
-        "units": "metric",  # Fetch temperature in Celsius
-    }
-
     try:
-        response = requests.get(BASE_URL, params=params)
-        data = response.json()
+        data, fetched_at = get_weather_data(city)
 
-        if data["cod"] != 200:
+        if not data:
             return f"Sorry, I couldn't find weather data for {city}."
 
-        weather_desc = data["weather"][0]["description"].capitalize()
-        temperature = data["main"]["temp"]
-        humidity = data["main"]["humidity"]
-        wind_speed = data["wind"]["speed"]
+        # Formatted reports are cached separately and rebuilt only when the data changes
+        report_key = (cache_key(city, COUNTRY_CODE, "metric"), city)
+        with cache_lock:
+            cached = report_cache.get(report_key)
+        if cached and cached["fetched_at"] == fetched_at:
+            return cached["report"]
 
-        weather_report = (
-            f"🌍 Weather in {city}:\n"
-            f"🌡 Temp: {temperature}°C\n"
-            f"🌦 Condition: {weather_desc}\n"
-            f"💧 Humidity: {humidity}%\n"
-            f"🌬 Wind Speed: {wind_speed} m/s"
-        )
+        weather_report = format_weather_report(city, data)
+        with cache_lock:
+            report_cache[report_key] = {"report": weather_report, "fetched_at": fetched_at}
+            report_cache.move_to_end(report_key)
+            while len(report_cache) > CACHE_MAX_ENTRIES * 2:
+                report_cache.popitem(last=False)
 
         return weather_report
 
     except requests.exceptions.RequestException:
         return "I couldn't fetch the weather right now. Please check your internet connection."
+
+def weather_cache_stats():
+    """Returns cache counters and size."""
+    with cache_lock:
+        return dict(cache_stats, entries=len(weather_cache), reports=len(report_cache))
@@ -2,59 +2,241 @@ import pygame
 import sys
 import os
 import math
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
-from dotenv import load_dotenv
 import time
 
-# Load Spotify Credentials
-load_dotenv()
+# Allow running as a script (python integrations/vinyl_player.py) from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.playback_state import describe_track
+from core.broker_client import get_broker
+from core.artwork import ArtworkCache, decode_pygame
+from core import asset_cache
 
-SPOTIFY_SCOPE = "user-read-playback-state user-modify-playback-state"
-sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-    client_id=os.getenv("SPOTIPY_CLIENT_ID"),
-    client_secret=os.getenv("SPOTIPY_CLIENT_SECRET"),
-    redirect_uri=os.getenv("SPOTIPY_REDIRECT_URI"),
-    scope=SPOTIFY_SCOPE
-))
+# Renderer settings (override in .env)
+PLAYER_RENDER_MODE = os.getenv("VINYL_PLAYER_MODE", "cached")  # "cached" or "classic" (rotate + full flip every frame)
+VINYL_FRAME_STEP = float(os.getenv("VINYL_FRAME_STEP", "1.0"))  # Degrees between cached frames
+VINYL_CACHE_MB = int(os.getenv("VINYL_CACHE_MB", "256"))  # Memory cap for the rotation cache (1° steps of the 400 px vinyl take 220 MB)
+VINYL_FRAME_STATS = os.getenv("VINYL_FRAME_STATS", "0") == "1"  # Log a frame-time histogram every few seconds
 
-def get_current_track_info():
-    """Fetch current playing song info."""
+WINDOW_SIZE = (800, 800)
+VINYL_SIZE = 400
+VINYL_CENTER = (400, 350)
+ART_SIZE = 150  # Album art drawn on the record label
+TEXT_CENTER = (400, 700)
+BG_COLOR = (10, 10, 10)
+TEXT_COLOR = (255, 255, 255)
+TARGET_FPS = 60
+DEGREES_PER_SECOND = 30  # Same visual speed as the old 0.5 degrees per frame at 60 fps
+STATS_INTERVAL = 5  # Seconds between histogram logs
+
+# Frame-time histogram buckets (upper bounds in ms)
+HISTOGRAM_BUCKETS = [8, 17, 25, 34, 50, float("inf")]
+
+def format_track_info(playback):
+    """Text shown under the vinyl for a playback payload."""
     try:
-        playback = sp.current_playback()
-        if playback and playback.get("is_playing"):
-            track = playback["item"]
-            name = track["name"]
-            artist = track["artists"][0]["name"]
-            return f"{name} - {artist}"
-        else:
-            return "Nothing Playing"
-    except Exception as e:
-        print(f"Error fetching Spotify track: {e}")
+        return describe_track(playback) or "Nothing Playing"
+    except (KeyError, IndexError, TypeError) as e:
+        print(f"Error reading Spotify track: {e}")
         return "Error"
 
-def vinyl_player():
-    """Launches a Pygame window with a rotating vinyl record."""
+def round_label(image):
+    """Cuts decoded album art into a circle so it sits on the record like a label."""
+    size = image.get_width()
+    label = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(label, (255, 255, 255, 255), (size // 2, size // 2), size // 2)
+    label.blit(image, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
+    return label
+
+class RotationCache:
+    """
+    Pre-rotated copies of the vinyl, one every step degrees around the whole circle.
+
+    Frames are rendered the first time each angle is needed and then only
+    blitted, so once the record has turned once no frame allocates a surface.
+    Like ui.widgets.VinylWidget, each frame keeps the source's size (the
+    record is round, so the rotated corners are transparent anyway). The step
+    only gets coarser than requested when the frames would not fit in max_mb.
+    """
+
+    def __init__(self, image, step_degrees=VINYL_FRAME_STEP, max_mb=VINYL_CACHE_MB):
+        self.image = image
+        wanted_frames = max(1, math.ceil(360 / max(step_degrees, 0.1)))
+        max_frames = max(1, max_mb * 1024 * 1024 // self.frame_bytes())
+        self.frame_count = min(wanted_frames, max_frames)
+        self.step = 360 / self.frame_count
+        if self.frame_count < wanted_frames:
+            print(f"⚠️ Vinyl rotation cache limited to {max_mb} MB: {self.step:.2f}° steps instead of {step_degrees}°")
+        self.frames = [None] * self.frame_count
+        self.bytes = 0
+
+    def frame_bytes(self):
+        width, height = self.image.get_size()
+        return width * height * self.image.get_bytesize()
+
+    def render(self, angle):
+        """Rotate the source and cut the rotated surface back to the source's size, around the center."""
+        rotated = pygame.transform.rotate(self.image, angle)
+        area = self.image.get_rect(center=rotated.get_rect().center).clip(rotated.get_rect())
+        return rotated.subsurface(area).copy()
+
+    def frame(self, angle):
+        """Returns the rotated surface closest to angle."""
+        i = int(round((angle % 360) / self.step)) % self.frame_count
+        surface = self.frames[i]
+        if surface is None:
+            surface = self.render(i * self.step)
+            self.frames[i] = surface
+            self.bytes += self.frame_bytes()
+        return surface
+
+class TextCache:
+    """Renders a line of text only when it changes."""
+
+    def __init__(self, font, color=TEXT_COLOR):
+        self.font = font
+        self.color = color
+        self.text = None
+        self.surface = None
+        self.renders = 0
+
+    def get(self, text):
+        if text != self.text:
+            self.text = text
+            self.surface = self.font.render(text, True, self.color)
+            self.renders += 1
+        return self.surface
+
+class FrameStats:
+    """Frame-time histogram, logged every STATS_INTERVAL seconds when enabled."""
+
+    def __init__(self, log=VINYL_FRAME_STATS):
+        self.log = log
+        self.last_frame = None
+        self.last_report = time.perf_counter()
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * len(HISTOGRAM_BUCKETS)
+        self.frames = 0
+        self.max_ms = 0.0
+
+    def tick(self):
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            ms = (now - self.last_frame) * 1000
+            self.frames += 1
+            self.max_ms = max(self.max_ms, ms)
+            for i, bound in enumerate(HISTOGRAM_BUCKETS):
+                if ms < bound:
+                    self.counts[i] += 1
+                    break
+        self.last_frame = now
+
+        if self.log and now - self.last_report >= STATS_INTERVAL:
+            print(f"🎞️ {self.summary()}")
+            self.last_report = now
+            self.reset()
+
+    def histogram(self):
+        labels = []
+        lower = 0
+        for bound in HISTOGRAM_BUCKETS:
+            labels.append(f"{lower}+ms" if bound == float("inf") else f"<{bound}ms")
+            lower = bound
+        return dict(zip(labels, self.counts))
+
+    def summary(self):
+        buckets = " ".join(f"{label}:{count}" for label, count in self.histogram().items())
+        return f"{self.frames} frames, max {self.max_ms:.1f}ms | {buckets}"
+
+def draw_classic(screen, vinyl_img, font, angle, track_info, art=None):
+    """Original renderer: rotate, render text and flip the whole window every frame."""
+    screen.fill(BG_COLOR)
+    rotated_vinyl = pygame.transform.rotate(vinyl_img, angle)
+    screen.blit(rotated_vinyl, rotated_vinyl.get_rect(center=VINYL_CENTER))
+    if art is not None:
+        screen.blit(art, art.get_rect(center=VINYL_CENTER))
+    text_surface = font.render(track_info, True, TEXT_COLOR)
+    screen.blit(text_surface, text_surface.get_rect(center=TEXT_CENTER))
+    pygame.display.flip()
+
+def draw_cached(screen, rotations, text_cache, angle, track_info, dirty_state, art=None):
+    """
+    Cached renderer: blit a pre-rotated frame and the cached text surface,
+    then update only the areas that changed.
+    """
+    dirty = []
+
+    vinyl = rotations.frame(angle)
+    vinyl_rect = vinyl.get_rect(center=VINYL_CENTER)
+    old_vinyl_rect = dirty_state.get("vinyl")
+    area = vinyl_rect.union(old_vinyl_rect) if old_vinyl_rect else vinyl_rect
+    screen.fill(BG_COLOR, area)
+    screen.blit(vinyl, vinyl_rect)
+    if art is not None:
+        screen.blit(art, art.get_rect(center=VINYL_CENTER))  # Inside the vinyl area, no extra rect
+    dirty.append(area)
+    dirty_state["vinyl"] = vinyl_rect
+
+    # Text only needs redrawing when it changes
+    if track_info != dirty_state.get("text"):
+        text_surface = text_cache.get(track_info)
+        text_rect = text_surface.get_rect(center=TEXT_CENTER)
+        old_text_rect = dirty_state.get("text_rect")
+        area = text_rect.union(old_text_rect) if old_text_rect else text_rect
+        screen.fill(BG_COLOR, area)
+        screen.blit(text_surface, text_rect)
+        dirty.append(area)
+        dirty_state["text"] = track_info
+        dirty_state["text_rect"] = text_rect
+
+    if dirty_state.get("full"):
+        pygame.display.update(dirty)
+    else:
+        pygame.display.flip()  # First frame paints the whole window
+        dirty_state["full"] = True
+
+def vinyl_player(mode=PLAYER_RENDER_MODE, max_seconds=None):
+    """
+    Launches a Pygame window with a rotating vinyl record.
+
+    Returns the frame stats when max_seconds is set (used for benchmarking),
+    otherwise exits the process when the window is closed.
+    """
     pygame.init()
-    screen = pygame.display.set_mode((800, 800))
+    screen = pygame.display.set_mode(WINDOW_SIZE)
     pygame.display.set_caption("Vinyl Player")
     clock = pygame.time.Clock()
 
     # Load assets
-    bg_color = (10, 10, 10)
-    vinyl_img = pygame.image.load("assets/vinyl.png")  # <-- create or download a simple vinyl.png
-    vinyl_img = pygame.transform.scale(vinyl_img, (400, 400))
+    vinyl_img = asset_cache.load_surface("assets/vinyl.png", VINYL_SIZE).convert_alpha()  # Pre-scaled in the asset cache
 
     font = pygame.font.SysFont('Arial', 28)
-    angle = 0  # For rotation
-    track_info = "Fetching Track..."
+    rotations = RotationCache(vinyl_img)
+    text_cache = TextCache(font)
+    dirty_state = {}
+    stats = FrameStats()
+    screen.fill(BG_COLOR)
 
-    last_update = time.time()
+    # Track info is pushed from the shared playback service (polled off the render loop)
+    # Album art is downloaded and decoded on artwork worker threads
+    artwork = ArtworkCache(decode_pygame, ART_SIZE)
+    latest = {"track_info": "Fetching Track...", "art_url": None, "art": None}
+    def on_artwork(url, image):
+        if url == latest["art_url"]:
+            latest["art"] = round_label(image) if image is not None else None
+    def on_playback(playback):
+        latest["track_info"] = format_track_info(playback)
+        latest["art_url"] = url = artwork.url_for(playback)  # Before show(): art in memory is delivered inside it
+        artwork.show(playback, on_artwork)
+        if not url:
+            latest["art"] = None
+    broker = get_broker()  # The broker daemon if it is running, else polled in-process
+    broker.subscribe("playback", on_playback)
 
+    started = time.perf_counter()
     running = True
     while running:
-        screen.fill(bg_color)
-
         # Handle events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -64,28 +246,26 @@ def vinyl_player():
         if keys[pygame.K_ESCAPE]:
             running = False
 
-        # Rotate the vinyl
-        rotated_vinyl = pygame.transform.rotate(vinyl_img, angle)
-        rect = rotated_vinyl.get_rect(center=(400, 350))
-        screen.blit(rotated_vinyl, rect)
+        # Rotation follows the clock, so a slow frame doesn't slow the record down
+        elapsed = time.perf_counter() - started
+        angle = (elapsed * DEGREES_PER_SECOND) % 360
 
-        # Update rotation
-        angle = (angle + 0.5) % 360
-
-        # Update track info every 5 seconds
-        if time.time() - last_update > 5:
-            track_info = get_current_track_info()
-            last_update = time.time()
+        if mode == "classic":
+            draw_classic(screen, vinyl_img, font, angle, latest["track_info"], latest["art"])
+        else:
+            draw_cached(screen, rotations, text_cache, angle, latest["track_info"], dirty_state, latest["art"])
 
-        # Draw track info
-        text_surface = font.render(track_info, True, (255, 255, 255))
-        text_rect = text_surface.get_rect(center=(400, 700))
-        screen.blit(text_surface, text_rect)
+        stats.tick()
+        clock.tick(TARGET_FPS)
 
-        pygame.display.flip()
-        clock.tick(60)
+        if max_seconds is not None and elapsed >= max_seconds:
+            running = False
 
+    broker.unsubscribe("playback", on_playback)
+    print(f"🎞️ Vinyl player ({mode}): {stats.summary()}")
     pygame.quit()
+    if max_seconds is not None:
+        return stats
     sys.exit()
 
 if __name__ == "__main__":
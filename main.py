@@ -1,9 +1,50 @@
-from PyQt6.QtWidgets import QApplication
+from dotenv import load_dotenv
+
+# Load .env before anything reads its settings (core and ui modules read them at import)
+load_dotenv()
+
+from core import startup_profile, warmup
+import argparse
 import sys
-from ui.main_window import CircularUI
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = CircularUI()
+    parser = argparse.ArgumentParser(description="Frosty circular UI")
+    parser.add_argument("--profile-startup", action="store_true", help="Print import and constructor timings after the first frame")
+    parser.add_argument("--eager", action="store_true", help="Build every screen at launch instead of on first navigation")
+    parser.add_argument("--no-warmup", action="store_true", help="Don't prefetch Spotify, playback state and weather at launch")
+    args, qt_args = parser.parse_known_args()
+
+    if args.profile_startup:
+        startup_profile.enable()
+
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QTimer
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    startup_profile.mark("QApplication ready")
+
+    from ui.main_window import CircularUI
+    startup_profile.mark("UI imported")
+
+    window = CircularUI(eager=args.eager)
     window.show()
+    startup_profile.mark("Window shown")
+
+    # Warm connections, auth and caches in the background once the first frame is up
+    # (a running broker daemon warms itself up, so only its weather is fetched)
+    if not args.no_warmup:
+        def start_warmup():
+            from core.broker_client import get_broker
+            if get_broker().local:
+                warmup.start(listener=window.on_warmup)
+            else:
+                window.show_weather()
+        QTimer.singleShot(0, start_warmup)
+
+    if args.profile_startup:
+        def first_frame():
+            startup_profile.mark("First frame")
+            startup_profile.report()
+        QTimer.singleShot(0, first_frame)
+
     sys.exit(app.exec())
@@ -0,0 +1,47 @@
+import os
+import queue
+import threading
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from core import broker
+from core.broker_client import BrokerClient, LocalBroker
+
+@pytest.mark.skipif(broker.BrokerServer is None, reason="needs Unix domain sockets")
+def test_voice_activity_reaches_a_ui_in_another_process(tmp_path):
+    path = str(tmp_path / "broker.sock")
+    server = broker.BrokerServer(path, broker.BrokerHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        ui, voice = BrokerClient(path), BrokerClient(path)
+        events = queue.Queue()
+        ui.subscribe("activity", events.put)
+        ui.call("activity", "touch")  # Round trip: the subscription is registered
+        events.get(timeout=5)
+
+        voice.call("activity", "voice")
+        assert events.get(timeout=5) == {"source": "voice"}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_voice_activity_ends_idle_mode():
+    from PyQt6.QtWidgets import QApplication, QStackedWidget
+    from ui.scheduler import ActivityScheduler
+
+    app = QApplication.instance() or QApplication([])
+    scheduler = ActivityScheduler(QStackedWidget())
+    scheduler.idle = True
+
+    local = LocalBroker()
+    def on_activity(data):
+        scheduler.note_activity()
+    local.subscribe("activity", on_activity)
+    try:
+        local.call("activity", "voice")
+    finally:
+        local.unsubscribe("activity", on_activity)
+    assert not scheduler.idle
+    app.processEvents()
@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from core import asset_cache
+from core.artwork import ArtworkCache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def playback(track_id, url):
+    return {"item": {"id": track_id, "album": {"images": [{"url": url, "width": 300}]}}}
+
+def cache_holding(url, image, decode=lambda data, size: data):
+    artwork = ArtworkCache(decode, 220, upcoming=lambda: [])
+    artwork.memory[url] = image
+    return artwork
+
+def test_memory_hit_is_delivered_before_show_returns():
+    artwork = cache_holding("https://i.scdn.co/a", "art-a")
+    delivered = []
+    assert artwork.show(playback("a", "https://i.scdn.co/a"), lambda url, image: delivered.append((url, image)))
+    assert delivered == [("https://i.scdn.co/a", "art-a")]
+    assert artwork.url_for(playback("a", "https://i.scdn.co/a")) == "https://i.scdn.co/a"
+
+class StubTasks:
+    def submit(self, *args, **kwargs):
+        return True
+
+@pytest.fixture
+def vinyl_screen(tmp_path, monkeypatch):
+    from PyQt6.QtGui import QImage
+    from PyQt6.QtWidgets import QApplication, QWidget
+    app = QApplication.instance() or QApplication([])
+    monkeypatch.chdir(ROOT)  # Asset paths are relative to the project root
+    monkeypatch.setattr(asset_cache, "ASSET_CACHE_DIR", str(tmp_path))
+
+    from ui.main_window import VinylScreen
+    parent = QWidget()
+    parent.tasks = StubTasks()  # Just what VinylScreen needs from CircularUI
+    parent.show_home = lambda: None
+    screen = VinylScreen(parent)
+    yield screen, QImage
+    parent.deleteLater()
+    app.processEvents()
+
+def test_cached_art_shows_when_the_track_changes(vinyl_screen):
+    screen, QImage = vinyl_screen
+    first, second = QImage(220, 220, QImage.Format.Format_ARGB32), QImage(220, 220, QImage.Format.Format_ARGB32)
+    second.fill(0xFFFF0000)
+    screen.artwork = cache_holding("https://i.scdn.co/b", second)
+    screen.artwork.memory["https://i.scdn.co/a"] = first
+
+    screen.show_track_info(playback("a", "https://i.scdn.co/a"))
+    screen.show_track_info(playback("b", "https://i.scdn.co/b"))
+
+    assert screen.art_url == "https://i.scdn.co/b"
+    assert not screen.art_label.isHidden()
+    assert screen.art_label.pixmap().toImage().pixelColor(110, 110).red() == 255
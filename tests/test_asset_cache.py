@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from core import asset_cache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)  # Asset paths are relative to the project root
+    monkeypatch.setattr(asset_cache, "ASSET_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+def never_build(*args):
+    raise AssertionError("built a variant")
+
+def test_sizes_come_from_the_file_header():
+    assert asset_cache.image_size("assets/background.gif") == (450, 450)
+    assert asset_cache.image_size("assets/vinyl.png") == (1024, 1024)
+
+def test_smaller_sources_are_never_upscaled_into_the_cache(monkeypatch, cache_dir):
+    monkeypatch.setattr(asset_cache, "PILLOW_AVAILABLE", True)
+    monkeypatch.setattr(asset_cache, "ensure_variant", never_build)
+    assert asset_cache.movie_path("assets/background.gif", 1080) is None
+    assert not cache_dir.exists()
+
+def test_movie_variant_is_only_looked_up_without_build(monkeypatch):
+    monkeypatch.setattr(asset_cache, "PILLOW_AVAILABLE", True)
+    monkeypatch.setattr(asset_cache, "ensure_variant", never_build)
+    assert asset_cache.movie_path("assets/background.gif", 300, build=False) is None
+
+def test_build_reports_small_images_instead_of_upscaling_them(monkeypatch, cache_dir, capsys):
+    monkeypatch.setattr(asset_cache, "ensure_variant", never_build)
+
+    asset_cache.build([("assets/vinyl.png", 2048)])
+
+    assert "(source is smaller, scaled at display time)" in capsys.readouterr().out
+    assert not cache_dir.exists()
+
+class RecordingTasks:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, key, fn, *args, **kwargs):
+        self.submitted.append((key, fn, args))
+        return True
+
+def test_home_screen_builds_the_background_off_the_gui_thread(monkeypatch):
+    from PyQt6.QtWidgets import QApplication, QWidget
+    app = QApplication.instance() or QApplication([])
+    monkeypatch.setattr(asset_cache, "ensure_variant", never_build)
+
+    from ui.main_window import HomeScreen
+    parent = QWidget()
+    parent.tasks = RecordingTasks()
+    parent.show_weather = parent.show_vinyl = lambda: None
+    screen = HomeScreen(parent)
+
+    assert [(key, fn) for key, fn, _ in parent.tasks.submitted] == [("prescale-background", asset_cache.movie_path)]
+    assert screen.bg_movie.scaledSize().width() == 1080  # Qt scales the original until a variant exists
+
+    screen.use_prescaled_background("assets/background.gif")
+    assert not screen.bg_movie.scaledSize().isValid()
+    parent.deleteLater()
+    app.processEvents()
@@ -0,0 +1,56 @@
+import os
+import socket
+
+import pytest
+
+from core import broker
+
+pytestmark = pytest.mark.skipif(broker.BrokerServer is None, reason="needs Unix domain sockets")
+
+@pytest.fixture
+def private(tmp_path):
+    directory = tmp_path / "run"
+    directory.mkdir(mode=0o700)
+    return directory
+
+def bound_socket(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(str(path))
+    return sock
+
+def test_default_path_is_in_the_users_runtime_dir(monkeypatch, private):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(private))
+    assert broker.default_socket_path() == str(private / "frosty.sock")
+
+def test_default_path_without_runtime_dir_is_per_user(monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    assert os.path.basename(os.path.dirname(broker.default_socket_path())) == f"frosty-{os.getuid()}"
+
+def test_only_our_own_socket_in_a_private_dir_is_trusted(private, tmp_path):
+    sock = bound_socket(private / "frosty.sock")
+    try:
+        assert broker.trusted_socket(str(private / "frosty.sock"))
+
+        os.symlink(private / "frosty.sock", private / "link.sock")
+        assert not broker.trusted_socket(str(private / "link.sock"))
+
+        (private / "file.sock").write_text("not a socket")
+        assert not broker.trusted_socket(str(private / "file.sock"))
+
+        os.chmod(private, 0o777)
+        assert not broker.trusted_socket(str(private / "frosty.sock"))
+    finally:
+        sock.close()
+
+def test_serve_leaves_a_file_it_does_not_own_alone(private):
+    planted = private / "frosty.sock"
+    planted.write_text("someone else's")
+    broker.serve(str(planted), warm=False)
+    assert planted.read_text() == "someone else's"
+
+def test_serve_refuses_a_shared_directory(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    os.chmod(shared, 0o777)
+    broker.serve(str(shared / "frosty.sock"), warm=False)
+    assert not os.path.exists(shared / "frosty.sock")
@@ -0,0 +1,40 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core import http_pool
+
+class RateLimited(BaseHTTPRequestHandler):
+    def answer(self):
+        self.server.hits += 1
+        self.send_response(429)
+        self.send_header("Retry-After", "1")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_PUT = answer
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RateLimited)
+    server.hits = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.mark.parametrize("method", ["GET", "PUT"])
+def test_a_429_reaches_the_caller_without_retries_or_sleeping(server, method):
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/me/player"
+    started = time.perf_counter()
+    response = http_pool.get_session("spotify").request(method, url, timeout=http_pool.get_timeout("spotify"))
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert server.hits == 1
+    assert time.perf_counter() - started < 0.5
@@ -0,0 +1,33 @@
+import pytest
+
+from core import intents
+
+@pytest.mark.parametrize("text, intent, slots", [
+    ("Frosty, please pause the music", "pause", {}),
+    ("hey frosty what's the weather in new york today", "weather", {"city": "new york"}),
+    ("weather", "weather", {}),
+    ("skip this song", "next", {}),
+    ("go back", "previous", {}),
+    ("play", "play", {}),
+    ("Can you play Yellow by Coldplay?", "play_song", {"song": "yellow by coldplay"}),
+    ("play bohemian rhapsody on spotify", "play_song", {"song": "bohemian rhapsody"}),
+    ("what's playing", "now_playing", {}),
+    ("what time is it", "time", {}),
+    ("stop", "exit", {}),
+])
+def test_commands_route_to_local_intents(text, intent, slots):
+    assert intents.match_intent(text) == (intent, slots)
+
+@pytest.mark.parametrize("text", ["tell me a joke", "", "   ", "please"])
+def test_everything_else_falls_back_to_the_assistant(text):
+    assert intents.match_intent(text) == (None, {})
+
+def test_routing_latency_is_recorded_per_intent(monkeypatch):
+    monkeypatch.setattr(intents, "route_stats", {})
+    intents.match_intent("next song")
+    intents.match_intent("next")
+    intents.match_intent("tell me a joke")
+
+    stats = intents.routing_stats()
+    assert stats["next"]["count"] == 2
+    assert stats["fallback"]["count"] == 1
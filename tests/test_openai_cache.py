@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core import openai_api
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(openai_api, "response_cache", openai_api.OrderedDict())
+    monkeypatch.setattr(openai_api, "history", openai_api.deque())
+    monkeypatch.setattr(openai_api, "cache_loaded", True)
+    monkeypatch.setattr(openai_api, "RESPONSE_CACHE_PATH", None)
+
+def test_prompts_share_an_entry_regardless_of_case_and_punctuation():
+    openai_api.cache_response(openai_api.cache_key("Tell me a joke!"), "Why did the snowman...")
+    assert openai_api.get_cached_response(openai_api.cache_key("tell me a joke")) == "Why did the snowman..."
+
+def test_follow_ups_are_keyed_by_conversation():
+    openai_api.remember_turn("Who wrote Hamlet?", "Shakespeare.")
+    first = openai_api.cache_key("why?")
+    openai_api.cache_response(first, "Because...")
+
+    openai_api.clear_history()
+    openai_api.remember_turn("Is the sky blue?", "Yes.")
+    second = openai_api.cache_key("why?")
+
+    assert first != second
+    assert openai_api.get_cached_response(second) is None
+
+@pytest.mark.parametrize("prompt", ["What's the news?", "what day is it", "What time is it now", "latest scores"])
+def test_time_sensitive_prompts_are_not_cached(prompt):
+    assert openai_api.cache_key(prompt) is None
+    openai_api.cache_response(openai_api.cache_key(prompt), "stale")
+    assert not openai_api.response_cache
+
+def test_repeated_prompts_hit_the_cache_in_later_conversations(monkeypatch):
+    from core import broker
+
+    requests = []
+    class FakeClient:
+        class chat:
+            class completions:
+                @staticmethod
+                def create(model, messages):
+                    requests.append(messages[-1]["content"])
+                    message = SimpleNamespace(content=f"Answer {len(requests)}")
+                    return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=message)])
+
+    monkeypatch.setattr(openai_api, "get_openai_client", lambda: FakeClient)
+    monkeypatch.setattr(openai_api, "cache_stats", {"hits": 0, "misses": 0})
+
+    for questions in (["Tell me a joke", "Who wrote Hamlet?"], ["Tell me a joke"], ["tell me a joke!"]):
+        broker.CALLS["new_conversation"]()  # Each time Frosty is woken
+        for question in questions:
+            openai_api.get_ai_response(question)
+
+    assert requests == ["Tell me a joke", "Who wrote Hamlet?"]
+    assert openai_api.cache_stats == {"hits": 2, "misses": 2}
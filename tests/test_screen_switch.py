@@ -0,0 +1,48 @@
+import os
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+@pytest.fixture
+def app():
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+def test_weather_dropped_by_leaving_home_is_fetched_again(app, monkeypatch):
+    from PyQt6.QtWidgets import QStackedWidget, QTextEdit, QWidget
+    from ui import main_window
+    from ui.workers import TaskRunner
+
+    release = threading.Event()
+    fetches = []
+    def fetch_weather(city):
+        fetches.append(city)
+        release.wait(5)
+        return f"Sunny in {city}"
+    monkeypatch.setattr(main_window, "fetch_weather", fetch_weather)
+
+    # Just what the navigation methods need from CircularUI
+    window = SimpleNamespace(
+        tasks=TaskRunner(), stacked_widget=QStackedWidget(), weather_pending=False,
+        home_screen=SimpleNamespace(weather_display=QTextEdit()), get_vinyl_screen=QWidget,
+    )
+    for name in ("show_weather", "show_weather_result", "show_home", "show_vinyl"):
+        setattr(window, name, getattr(main_window.CircularUI, name).__get__(window))
+    window.stacked_widget.setCurrentWidget = lambda widget: None
+
+    window.show_weather()
+    window.show_vinyl()  # Drops the running fetch's result
+    release.set()
+    window.tasks.wait(5000)
+    app.processEvents()
+    assert window.home_screen.weather_display.toPlainText() == "Fetching weather..."
+
+    window.show_home()
+    window.tasks.wait(5000)
+    app.processEvents()
+    assert len(fetches) == 2
+    assert window.home_screen.weather_display.toPlainText() == "Sunny in " + fetches[-1]
+    assert not window.weather_pending
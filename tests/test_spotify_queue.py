@@ -0,0 +1,40 @@
+import spotipy
+
+from core import spotify_api, tracing
+from core.spotify_queue import SpotifyCommandQueue, coalesce
+
+def commands(*names):
+    return [{"name": name, "args": (), "on_done": None} for name in names]
+
+def test_skips_merge_into_one_and_cancel_out():
+    assert [(c["name"], c["args"]) for c in coalesce(commands("next", "next", "next"))] == [("skip", (3,))]
+    assert coalesce(commands("next", "previous")) == []
+
+def test_toggle_back_to_the_known_state_is_dropped():
+    assert coalesce(commands("pause", "play"), is_playing=True) == []
+    assert [c["name"] for c in coalesce(commands("play", "pause"), is_playing=True)] == ["pause"]
+
+class FakeSpotify:
+    """Answers next_track with a 429 once, after fail_after successful skips."""
+
+    def __init__(self, fail_after):
+        self.fail_after = fail_after
+        self.skips = 0
+
+    def next_track(self, device_id=None):
+        if self.skips == self.fail_after:
+            self.fail_after = None
+            raise spotipy.exceptions.SpotifyException(429, -1, "Too many requests", headers={"Retry-After": "0"})
+        self.skips += 1
+
+def test_rate_limited_skip_resumes_instead_of_starting_over(monkeypatch):
+    fake = FakeSpotify(fail_after=2)
+    monkeypatch.setattr(spotify_api, "get_spotify_client", lambda: fake)
+    monkeypatch.setattr(spotify_api, "find_local_device", lambda client: "device")
+    queue = SpotifyCommandQueue(actions={"skip": spotify_api.skip_tracks})
+
+    message = queue.execute_with_retries({"name": "skip", "args": (5,)}, tracing.NULL_SPAN)
+
+    assert fake.skips == 5
+    assert message == "⏭ Skipped 5 tracks."
+    assert queue.queue_stats()["retries"] == 1
@@ -0,0 +1,81 @@
+import json
+import os
+import threading
+
+import pytest
+
+from core import tracing
+
+class FakeLog:
+    def __init__(self):
+        self.records = []
+
+    def info(self, line):
+        self.records.append(json.loads(line))
+
+@pytest.fixture
+def log(monkeypatch):
+    fake = FakeLog()
+    monkeypatch.setattr(tracing, "get_trace_log", lambda: fake)
+    monkeypatch.setattr(tracing, "trace_stats", {"written": 0, "discarded": 0})
+    monkeypatch.setattr(tracing, "TRACING", True)
+    return fake
+
+def test_trace_path_does_not_depend_on_the_working_directory():
+    assert os.path.isabs(tracing.TRACE_PATH)
+    assert os.path.dirname(tracing.TRACE_PATH) == tracing.PROJECT_DIR
+
+def test_nested_spans_and_work_on_other_threads_keep_their_parent(log):
+    with tracing.trace("interaction", command="next"):
+        with tracing.span("intent") as intent:
+            worker = tracing.start_span("spotify.next")
+        def run():
+            with tracing.use(worker):
+                pass
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+
+    [record] = log.records
+    spans = {item["name"]: item for item in record["spans"]}
+    assert record["attrs"] == {"command": "next"}
+    assert spans["intent"]["parent"] == spans["interaction"]["id"]
+    assert spans["spotify.next"]["parent"] == intent.id
+
+def test_a_trace_is_written_once_its_last_span_ends(log):
+    with tracing.trace("interaction"):
+        reply = tracing.start_span("tts.say")
+    assert log.records == []
+    reply.end()
+    assert len(log.records) == 1
+
+def test_discarded_traces_are_counted_not_written(log):
+    with tracing.trace("interaction") as root:
+        root.discard()
+    assert log.records == []
+    assert tracing.get_trace_stats() == {"written": 0, "discarded": 1}
+
+def test_counters_stay_exact_when_traces_finish_on_many_threads(log):
+    def interactions():
+        for _ in range(200):
+            with tracing.trace("interaction"):
+                pass
+
+    threads = [threading.Thread(target=interactions) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert tracing.get_trace_stats()["written"] == 1600
+
+def test_read_new_traces_follows_appended_lines(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(tracing, "TRACE_PATH", str(path))
+    position = {}
+    assert tracing.read_new_traces(position) == []
+
+    path.write_text(json.dumps({"name": "first"}) + "\n" + '{"name": "half', encoding="utf-8")
+    assert tracing.read_new_traces(position) == [{"name": "first"}]
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('"}\n')
+    assert tracing.read_new_traces(position) == [{"name": "half"}]
@@ -0,0 +1,63 @@
+import pytest
+
+from core.track_index import TrackIndex
+
+PLAYED = [
+    ("Love Story", "Taylor Swift"),
+    ("Someone Like You", "Adele"),
+    ("Without Me", "Halsey"),
+    ("Lose Yourself", "Eminem"),
+    ("The Scientist", "Coldplay"),
+    ("Stand By Me", "Ben E. King"),
+    ("Hey Jude - Remastered 2015", "The Beatles"),
+    ("Old Town Road - Remix", "Lil Nas X"),
+    ("Wonderwall - Live", "Oasis"),
+]
+
+def item(title, artist):
+    return {"uri": f"spotify:track:{title.lower().replace(' ', '-')}", "name": title, "artists": [{"name": artist}]}
+
+@pytest.fixture
+def index(tmp_path):
+    index = TrackIndex(path=str(tmp_path / "index.json"))
+    for title, artist in PLAYED:
+        index.record_play(item(title, artist))
+    return index
+
+@pytest.mark.parametrize("query, title", [
+    ("love story", "Love Story"),
+    ("someone like you by adele", "Someone Like You"),
+    ("lose yourself by eminim", "Lose Yourself"),
+    ("scientist", "The Scientist"),
+    ("stand by me", "Stand By Me"),
+    ("stand by me by ben e king", "Stand By Me"),
+    ("hey jude", "Hey Jude - Remastered 2015"),
+    ("hey jude by the beatles", "Hey Jude - Remastered 2015"),
+    ("old town road", "Old Town Road - Remix"),
+    ("wonderwall by oasis", "Wonderwall - Live"),
+    ("with out me", "Without Me"),
+])
+def test_played_tracks_resolve_locally(index, query, title):
+    assert index.lookup(query)["title"] == title
+
+@pytest.mark.parametrize("query", ["love", "someone like me", "without me by eminem", "story", "stand by"])
+def test_near_misses_go_to_spotify_search(index, query):
+    assert index.lookup(query) is None
+
+def test_only_played_tracks_are_indexed(tmp_path):
+    index = TrackIndex(path=str(tmp_path / "index.json"))
+    index.record_play(item("Without Me", "Eminem"))
+    index.record_play(item("Without Me", "Eminem"))
+    assert index.index_stats()["tracks"] == 1
+    assert TrackIndex(path=str(tmp_path / "index.json")).lookup("without me by eminem")["plays"] == 2
+
+@pytest.mark.parametrize("title, normalized", [
+    ("Hey Jude - Remastered 2015", "hey jude"),
+    ("Without Me (feat. Juice WRLD)", "without me"),
+    ("Sunflower - Spider-Man: Into the Spider-Verse", "sunflower spider man into the spider verse"),
+    ("Stay feat. Justin Bieber", "stay"),
+    ("Stand By Me", "stand by me"),
+])
+def test_titles_and_queries_are_normalized_the_same_way(title, normalized):
+    from core.track_index import normalize
+    assert normalize(title) == normalized
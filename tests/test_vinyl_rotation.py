@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from integrations.vinyl_player import RotationCache
+
+def vinyl(size=400):
+    image = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(image, (30, 30, 30, 255), (size // 2, size // 2), size // 2)
+    pygame.draw.line(image, (255, 0, 0, 255), (size // 2, size // 2), (size - 1, size // 2), 5)
+    return image
+
+def test_default_budget_keeps_the_requested_step():
+    cache = RotationCache(vinyl(), step_degrees=1.0, max_mb=256)
+    assert cache.step == 1.0
+
+@pytest.mark.parametrize("angle", [0, 37, 90, 135, 200, 271, 359.6])
+def test_frames_match_a_direct_rotation(angle):
+    image = vinyl()
+    cache = RotationCache(image, step_degrees=1.0, max_mb=256)
+    frame = cache.frame(angle)
+
+    expected = pygame.transform.rotate(image, round(angle) % 360)
+    offset_x = (expected.get_width() - frame.get_width()) // 2
+    offset_y = (expected.get_height() - frame.get_height()) // 2
+    assert frame.get_size() == image.get_size()
+    for x, y in ((200, 200), (300, 200), (200, 300), (100, 200), (200, 100), (150, 250), (390, 200), (200, 10)):
+        assert frame.get_at((x, y)) == expected.get_at((x + offset_x, y + offset_y))
+
+def test_frames_are_only_rendered_once():
+    cache = RotationCache(vinyl(), step_degrees=1.0, max_mb=256)
+    first = [cache.frame(angle) for angle in range(360)]
+    second = [cache.frame(angle + 0.2) for angle in range(360)]
+    assert all(a is b for a, b in zip(first, second))
+    assert cache.bytes == 360 * cache.frame_bytes()
+
+def test_small_budget_coarsens_the_step_and_says_so(capsys):
+    cache = RotationCache(vinyl(), step_degrees=1.0, max_mb=10)
+    assert cache.step > 1.0
+    assert cache.frame_count * cache.frame_bytes() <= 10 * 1024 * 1024
+    assert "steps instead of" in capsys.readouterr().out
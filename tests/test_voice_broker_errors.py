@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from core import voice
+from core.broker_client import BrokerError
+
+class DownBroker:
+    """A broker daemon that went away mid-session."""
+
+    def call(self, name, *args, timeout=None):
+        raise BrokerError("Broker connection closed")
+
+@pytest.fixture
+def spoken(monkeypatch):
+    said = []
+    monkeypatch.setattr(voice, "get_broker", lambda: DownBroker())
+    monkeypatch.setattr(voice, "speak", lambda text, wait=False, priority=None: said.append(text))
+    return said
+
+@pytest.mark.parametrize("command", ["what's the weather in berlin", "what's playing", "tell me a joke"])
+def test_broker_failures_are_spoken_and_the_voice_loop_keeps_going(spoken, monkeypatch, command):
+    monkeypatch.setattr(voice, "STREAMING", False)
+    assert voice.handle_command(command) is True
+    assert spoken == ["Error: Broker connection closed"]
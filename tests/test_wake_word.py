@@ -0,0 +1,17 @@
+import sys
+
+import pytest
+import speech_recognition as sr
+
+from core.audio_stream import WakeWordDetector
+
+@pytest.fixture
+def no_pocketsphinx(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pocketsphinx", None)  # import raises ImportError
+
+def test_missing_pocketsphinx_fails_instead_of_using_the_cloud(no_pocketsphinx):
+    with pytest.raises(RuntimeError, match="WAKE_WORD_CLOUD"):
+        WakeWordDetector(sr.Recognizer())
+
+def test_cloud_wake_word_check_needs_an_explicit_opt_in(no_pocketsphinx):
+    assert WakeWordDetector(sr.Recognizer(), cloud=True).offline is False
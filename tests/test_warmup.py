@@ -0,0 +1,15 @@
+from core import warmup, weather_api
+
+def test_weather_warmup_uses_the_city_from_the_environment_at_run_time(monkeypatch):
+    monkeypatch.setenv("CITY", "Hamburg")  # As if .env was loaded after core.warmup was imported
+    monkeypatch.setattr(weather_api, "get_weather", lambda city: f"Weather in {city}")
+    assert warmup.warm_weather() == "Weather in Hamburg"
+
+def test_listeners_get_tasks_that_already_finished(monkeypatch):
+    monkeypatch.setattr(warmup, "results", {})
+    monkeypatch.setattr(warmup, "listeners", [])
+    warmup.run_task("weather", lambda: "sunny")
+
+    seen = []
+    warmup.add_listener(lambda name, result, error: seen.append((name, result, error)))
+    assert seen == [("weather", "sunny", None)]
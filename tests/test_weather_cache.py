@@ -0,0 +1,39 @@
+import json
+import os
+import threading
+
+from core import weather_api
+
+def test_concurrent_saves_leave_a_complete_cache_file(tmp_path, monkeypatch):
+    path = tmp_path / "weather.json"
+    monkeypatch.setattr(weather_api, "CACHE_PATH", str(path))
+    monkeypatch.setattr(weather_api, "weather_cache", weather_api.OrderedDict())
+
+    def writer(n):
+        for i in range(20):
+            weather_api.store(f"city{n}-{i}|de|metric", {"temperature": i})
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    assert len(entries) == min(80, weather_api.CACHE_MAX_ENTRIES)
+    assert os.listdir(tmp_path) == ["weather.json"]  # No temp files left behind
+
+def test_stale_entry_is_served_and_counted(monkeypatch):
+    monkeypatch.setattr(weather_api, "weather_cache", weather_api.OrderedDict())
+    monkeypatch.setattr(weather_api, "cache_loaded", True)
+    monkeypatch.setattr(weather_api, "cache_stats", dict.fromkeys(weather_api.cache_stats, 0))
+    monkeypatch.setattr(weather_api, "refresh_in_background", lambda *args: None)
+    key = weather_api.cache_key("Berlin", "DE", "metric")
+    old = weather_api.time.time() - weather_api.CACHE_TTL - 1
+    weather_api.weather_cache[key] = {"data": {"temperature": 3}, "fetched_at": old}
+
+    data, fetched_at = weather_api.get_weather_data(" berlin ", "DE", "metric")
+
+    assert data == {"temperature": 3} and fetched_at == old
+    assert weather_api.weather_cache_stats()["stale_hits"] == 1
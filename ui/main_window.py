@@ -1,11 +1,34 @@
 import sys
 import os
 from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QLabel, QPushButton, QTextEdit, QStackedWidget
-from PyQt6.QtGui import QFont, QMovie, QRegion, QPixmap, QTransform, QPainter, QIcon
-from PyQt6.QtCore import Qt, QTimer, QTime
+from PyQt6.QtGui import QFont, QMovie, QRegion, QPixmap, QIcon
+from PyQt6.QtCore import Qt, QTimer, QTime, QEvent, QSize, pyqtSignal
 
-from core.weather_api import get_weather
-from core.spotify_api import play_music, play_specific_song, pause_music, next_track, previous_track, get_spotify_client
+from ui.widgets import VinylWidget, TARGET_FPS
+from ui.workers import TaskRunner
+from ui.scheduler import ActivityScheduler
+from core import startup_profile, asset_cache
+from core.playback_state import describe_track
+from core.broker_client import get_broker
+
+# Debug overlay with the latest voice interaction trace (override in .env)
+TRACE_OVERLAY = os.getenv("FROSTY_TRACE_OVERLAY", "0") == "1"
+
+BACKGROUND_GIF = "assets/background.gif"
+
+# ------------------ Background Calls ------------------
+# Calls go to the Frosty broker (core/broker.py) when it is running, otherwise
+# they run in-process; core.* clients are imported on first use (inside a
+# worker thread) instead of before the first frame.
+
+def fetch_weather(city):
+    return get_broker().call("weather", city)
+
+def start_playback():
+    return get_broker().call("spotify", "play")
+
+def set_idle(idle):
+    get_broker().call("set_idle", idle)
 
 # ------------------ Home Screen ------------------
 class HomeScreen(QWidget):
@@ -16,10 +39,15 @@ class HomeScreen(QWidget):
         # Background GIF
         self.bg_label = QLabel(self)
         self.bg_label.setGeometry(0, 0, 1080, 1080)
-        self.bg_movie = QMovie("assets/background.gif")
-        self.bg_movie.setScaledSize(self.bg_label.size())
-        self.bg_label.setMovie(self.bg_movie)
-        self.bg_movie.start()
+        prescaled = asset_cache.movie_path(BACKGROUND_GIF, 1080, build=False)  # Only if already built
+        self.bg_movie = QMovie(prescaled or BACKGROUND_GIF)
+        if not prescaled:
+            self.bg_movie.setScaledSize(self.bg_label.size())  # Scales every frame at runtime
+            # Re-encoding every frame takes a while, so build the variant in the background
+            # (movie_path returns None when the source is not larger than the screen)
+            parent.tasks.submit("prescale-background", asset_cache.movie_path, BACKGROUND_GIF, 1080,
+                                group="assets", on_result=self.use_prescaled_background)
+        self.bg_label.setMovie(self.bg_movie)  # Started by the scheduler while this screen shows
         self.bg_label.lower()
 
         # Clock
@@ -32,7 +60,6 @@ class HomeScreen(QWidget):
         # Timer for clock
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_time)
-        self.timer.start(1000)
 
         # Weather Display
         self.weather_display = QTextEdit(self)
@@ -61,6 +88,17 @@ class HomeScreen(QWidget):
         self.spotify_btn.setStyleSheet("border: none; background: transparent;")
         self.spotify_btn.clicked.connect(parent.show_vinyl)
 
+    def use_prescaled_background(self, path):
+        """Swap the runtime-scaled background for the pre-scaled GIF once it is built."""
+        if not path:
+            return
+        running = self.bg_movie.state() == QMovie.MovieState.Running
+        self.bg_movie.stop()
+        self.bg_movie.setFileName(path)
+        self.bg_movie.setScaledSize(QSize())  # Already display-sized
+        if running:
+            self.bg_movie.start()  # Otherwise the scheduler starts it when the screen shows
+
     def update_time(self):
         current_time = QTime.currentTime().toString("hh:mm:ss")
         self.clock_label.setText(current_time)
@@ -68,22 +106,38 @@ class HomeScreen(QWidget):
 
 # ------------------ Vinyl Screen ------------------
 class VinylScreen(QWidget):
+    playback_changed = pyqtSignal(object)  # Carries playback state from the polling thread to the GUI thread
+    artwork_ready = pyqtSignal(str, object)  # (url, QImage) decoded on an artwork worker thread
+
+    ART_SIZE = 220
+
     def __init__(self, parent):
         super().__init__(parent)
         self.parent = parent
+        self.tasks = parent.tasks
 
         # Solid Black Background
         self.setStyleSheet("background-color: black;")
 
-        # Load Vinyl Image
-        self.original_vinyl = QPixmap("assets/vinyl.png").scaled(600, 600, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        # Load Vinyl Image (pre-scaled to 600px in the asset cache)
+        self.original_vinyl = asset_cache.load_qpixmap("assets/vinyl.png", 600)
         self.vinyl_size = self.original_vinyl.width()
-        self.angle = 0
 
-        # Vinyl Label
-        self.vinyl_label = QLabel(self)
-        self.vinyl_label.setGeometry((1080-600)//2, (1080-600)//2, 600, 600)
-        self.vinyl_label.setStyleSheet("background: transparent;")
+        # Vinyl Renderer (rotates in paintEvent, no per-frame pixmaps)
+        self.vinyl_widget = VinylWidget(self.original_vinyl, self)
+        self.vinyl_widget.setGeometry((1080-600)//2, (1080-600)//2, 600, 600)
+
+        # Album art on the record label (fetched and decoded in the background)
+        from core.artwork import ArtworkCache, decode_qimage
+        self.artwork = ArtworkCache(decode_qimage, self.ART_SIZE)
+        self.art_url = None
+        self.art_label = QLabel(self)
+        art_pos = (1080 - self.ART_SIZE) // 2
+        self.art_label.setGeometry(art_pos, art_pos, self.ART_SIZE, self.ART_SIZE)
+        self.art_label.setMask(QRegion(0, 0, self.ART_SIZE, self.ART_SIZE, QRegion.RegionType.Ellipse))
+        self.art_label.setStyleSheet("background: none;")
+        self.art_label.hide()
+        self.artwork_ready.connect(self.show_artwork)
 
         # Track Info
         self.track_label = QLabel("Loading...", self)
@@ -109,83 +163,174 @@ class VinylScreen(QWidget):
         """)
         self.home_btn.clicked.connect(parent.show_home)
 
-        # Timers
+        # Rotation timer (started and stopped by the scheduler)
         self.rotate_timer = QTimer(self)
         self.rotate_timer.timeout.connect(self.update_rotation)
-        self.rotate_timer.start(30)
 
-        self.track_timer = QTimer(self)
-        self.track_timer.timeout.connect(self.update_track_info)
-        self.track_timer.start(5000)
+        # Track info comes from the broker's shared playback service while this screen is visible
+        self.playback_changed.connect(self.show_track_info)
 
-        play_music()
+        # Start playback in the background so the window is not held up by Spotify
+        self.tasks.submit("play_music", start_playback, group="commands")
 
     def update_rotation(self):
-        # Rotate properly around center
-        transform = QTransform()
-        transform.translate(self.original_vinyl.width() / 2, self.original_vinyl.height() / 2)
-        transform.rotate(self.angle)
-        transform.translate(-self.original_vinyl.width() / 2, -self.original_vinyl.height() / 2)
+        self.vinyl_widget.advance()
 
-        rotated_pixmap = self.original_vinyl.transformed(transform, Qt.TransformationMode.SmoothTransformation)
+    def showEvent(self, event):
+        get_broker().subscribe("playback", self.publish_playback)
+        super().showEvent(event)
 
-        final_pixmap = QPixmap(self.vinyl_size, self.vinyl_size)
-        final_pixmap.fill(Qt.GlobalColor.transparent)
+    def hideEvent(self, event):
+        get_broker().unsubscribe("playback", self.publish_playback)
+        super().hideEvent(event)
 
-        painter = QPainter(final_pixmap)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        x_offset = (self.vinyl_size - rotated_pixmap.width()) // 2
-        y_offset = (self.vinyl_size - rotated_pixmap.height()) // 2
-        painter.drawPixmap(x_offset, y_offset, rotated_pixmap)
-        painter.end()
+    def publish_playback(self, playback):
+        self.playback_changed.emit(playback)  # Called on the polling thread
 
-        self.vinyl_label.setPixmap(final_pixmap)
-        self.angle = (self.angle + 1) % 360
-
-    def update_track_info(self):
+    def show_track_info(self, playback):
         try:
-            sp = get_spotify_client()
-            playback = sp.current_playback()
-            if playback and playback.get('is_playing'):
-                track = playback['item']
-                name = track['name']
-                artist = track['artists'][0]['name']
-                self.track_label.setText(f"{name} - {artist}")
-        except:
+            track_info = describe_track(playback)
+            if track_info:
+                self.track_label.setText(track_info)
+        except (KeyError, IndexError, TypeError):
             self.track_label.setText("No Track Info")
 
+        # Cached art arrives through artwork_ready before show() returns, anything else later,
+        # so the current URL has to be set first
+        self.art_url = self.artwork.url_for(playback)
+        self.artwork.show(playback, self.artwork_ready.emit)
+        if not self.art_url:
+            self.art_label.hide()
+
+    def show_artwork(self, url, image):
+        if url != self.art_url or image is None:
+            return  # Track changed while this was loading
+        self.art_label.setPixmap(QPixmap.fromImage(image))  # QPixmap only on the GUI thread
+        self.art_label.show()
+
 # ------------------ Main Controller ------------------
 class CircularUI(QMainWindow):
-    def __init__(self):
+    warmup_finished = pyqtSignal(str, object, object)  # (task, result, error) from core.warmup threads
+    voice_activity = pyqtSignal()  # The voice loop heard the user (emitted on a broker thread)
+
+    def __init__(self, eager=False):
         super().__init__()
 
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
         self.setGeometry(100, 100, 1080, 1080)
         self.setMask(QRegion(0, 0, 1080, 1080, QRegion.RegionType.Ellipse))
-        self.showFullScreen()
 
         self.stacked_widget = QStackedWidget(self)
 
-        self.home_screen = HomeScreen(self)
-        self.vinyl_screen = VinylScreen(self)
+        # Background workers for every network call (keeps the GUI thread free)
+        self.tasks = TaskRunner(self)
+        self.weather_pending = False  # Fetch started but not shown yet (re-requested if leaving home dropped it)
 
+        # Timers and animations only run on the visible screen
+        self.scheduler = ActivityScheduler(self.stacked_widget, parent=self)
+        self.scheduler.idle_changed.connect(
+            lambda idle: self.tasks.submit(f"idle-{idle}", set_idle, idle, group="commands"))
+
+        # Voice input counts as activity too, even when the voice loop runs in another process
+        self.voice_activity.connect(self.scheduler.note_activity)
+        get_broker().subscribe("activity", lambda data: self.voice_activity.emit())
+
+        with startup_profile.timed("HomeScreen()"):
+            self.home_screen = HomeScreen(self)
         self.stacked_widget.addWidget(self.home_screen)
-        self.stacked_widget.addWidget(self.vinyl_screen)
+        self.scheduler.add_timer(self.home_screen, self.home_screen.timer, 1000, on_start=self.home_screen.update_time)
+        self.scheduler.add_movie(self.home_screen, self.home_screen.bg_movie)
+
+        # Other screens are built on first navigation (eager=True builds them now)
+        self.vinyl_screen = None
+        if eager:
+            self.get_vinyl_screen()
 
         self.setCentralWidget(self.stacked_widget)
+        self.warmup_finished.connect(self.show_warmup_result)
+
+        if TRACE_OVERLAY:
+            self.add_trace_overlay()
 
         self.show_home()
+        self.showFullScreen()
+
+    def get_vinyl_screen(self):
+        if self.vinyl_screen is None:
+            with startup_profile.timed("VinylScreen()"):
+                self.vinyl_screen = VinylScreen(self)
+            self.stacked_widget.addWidget(self.vinyl_screen)
+            self.scheduler.add_timer(self.vinyl_screen, self.vinyl_screen.rotate_timer, 1000 // TARGET_FPS, idle_interval=1000 // 20)
+        return self.vinyl_screen
 
     def show_weather(self):
-        weather_info = get_weather(os.getenv("CITY", "Berlin"))
+        self.weather_pending = True
+        self.home_screen.weather_display.setText("Fetching weather...")
+        self.tasks.submit("weather", fetch_weather, os.getenv("CITY", "Berlin"), group="home",
+                          on_result=self.show_weather_result)
+
+    def show_weather_result(self, weather_info):
+        self.weather_pending = False
         self.home_screen.weather_display.setText(weather_info)
-        self.home_screen.weather_display.repaint()
+
+    def on_warmup(self, name, result, error):
+        self.warmup_finished.emit(name, result, error)  # Called on a warm-up thread
+
+    def show_warmup_result(self, name, result, error):
+        # Weather fetched at launch shows up without a tap (later taps hit the warm cache)
+        if name == "weather" and error is None:
+            self.show_weather_result(result)
+
+    def add_trace_overlay(self):
+        """Latency breakdown of the last voice interaction, read from the trace file (the voice loop may be another process)."""
+        from core import tracing
+        self.trace_position = {}
+        tracing.read_new_traces(self.trace_position)  # Skip traces from before this start
+        self.trace_label = QLabel(self)
+        self.trace_label.setGeometry(290, 760, 500, 200)
+        self.trace_label.setFont(QFont("Courier New", 12))
+        self.trace_label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+        self.trace_label.setStyleSheet("color: #9f9; background-color: rgba(0, 0, 0, 160); padding: 6px;")
+        self.trace_label.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.trace_label.hide()
+
+        def poll():
+            records = tracing.read_new_traces(self.trace_position)
+            if records:
+                self.trace_label.setText(tracing.format_tree(records[-1]))
+                self.trace_label.show()
+                self.trace_label.raise_()
+
+        self.trace_timer = QTimer(self)
+        self.trace_timer.timeout.connect(poll)
+        self.trace_timer.start(1000)
 
     def show_home(self):
-        self.stacked_widget.setCurrentIndex(0)
+        self.stacked_widget.setCurrentWidget(self.home_screen)
+        if self.weather_pending:
+            self.show_weather()  # show_vinyl() dropped the result, the label still says "Fetching weather..."
 
     def show_vinyl(self):
-        self.stacked_widget.setCurrentIndex(1)
+        self.tasks.cancel_group("home")
+        vinyl_screen = self.get_vinyl_screen()
+        self.stacked_widget.setCurrentWidget(vinyl_screen)
+
+    def showEvent(self, event):
+        self.scheduler.set_window_visible(True)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.scheduler.set_window_visible(False)
+        super().hideEvent(event)
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.Type.WindowStateChange:
+            self.scheduler.set_window_visible(not self.isMinimized())
+        super().changeEvent(event)
+
+    def closeEvent(self, event):
+        self.tasks.wait(2000)
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
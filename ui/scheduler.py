@@ -0,0 +1,138 @@
+import os
+import time
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QObject, QEvent, QTimer, pyqtSignal
+
+# Idle power saving (override in .env)
+IDLE_MINUTES = float(os.getenv("IDLE_MINUTES", "5"))
+IDLE_MOVIE_SPEED = 50  # Percent of normal GIF speed while idle
+
+ACTIVITY_EVENTS = (
+    QEvent.Type.MouseButtonPress,
+    QEvent.Type.TouchBegin,
+    QEvent.Type.KeyPress,
+)
+
+class ActivityScheduler(QObject):
+    """
+    Runs each screen's timers and movies only while that screen is visible.
+
+    Pages register their timers (with normal and idle intervals) and movies.
+    Everything on hidden pages is stopped when the QStackedWidget page changes
+    or the window is hidden. After IDLE_MINUTES without touch or voice input
+    the visible page drops to its idle intervals until the next interaction.
+    """
+
+    idle_changed = pyqtSignal(bool)
+
+    def __init__(self, stacked_widget, idle_minutes=IDLE_MINUTES, parent=None):
+        super().__init__(parent)
+        self.stacked_widget = stacked_widget
+        self.idle_seconds = idle_minutes * 60
+        self.timers = []  # {"page", "timer", "interval", "idle_interval", "on_start"}
+        self.movies = []  # {"page", "movie"}
+        self.window_visible = True
+        self.idle = False
+        self.last_activity = time.time()
+
+        # CPU time is charged to whichever page was showing
+        self.cpu_by_page = {}
+        self.cpu_page = None
+        self.cpu_mark = time.process_time()
+
+        self.stacked_widget.currentChanged.connect(self.apply)
+        QApplication.instance().installEventFilter(self)
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.timeout.connect(self.check_idle)
+        self.idle_timer.start(15000)
+
+    def add_timer(self, page, timer, interval, idle_interval=None, on_start=None):
+        """Register a page timer. on_start runs whenever the timer is (re)started."""
+        self.timers.append({
+            "page": page,
+            "timer": timer,
+            "interval": interval,
+            "idle_interval": idle_interval or interval,
+            "on_start": on_start,
+        })
+        self.apply()
+
+    def add_movie(self, page, movie):
+        self.movies.append({"page": page, "movie": movie})
+        self.apply()
+
+    def page_name(self, page):
+        return page.objectName() or type(page).__name__
+
+    def active_page(self):
+        return self.stacked_widget.currentWidget() if self.window_visible else None
+
+    def apply(self, *args):
+        """Start everything on the visible page and stop everything else."""
+        active = self.active_page()
+        self.charge_cpu(active)
+
+        for entry in self.timers:
+            timer = entry["timer"]
+            if entry["page"] is active:
+                interval = entry["idle_interval"] if self.idle else entry["interval"]
+                if not timer.isActive():
+                    timer.start(interval)
+                    if entry["on_start"]:
+                        entry["on_start"]()
+                elif timer.interval() != interval:
+                    timer.setInterval(interval)
+            elif timer.isActive():
+                timer.stop()
+
+        for entry in self.movies:
+            movie = entry["movie"]
+            movie.setSpeed(IDLE_MOVIE_SPEED if self.idle else 100)
+            running = movie.state() == movie.MovieState.Running
+            if entry["page"] is active:
+                if movie.state() == movie.MovieState.Paused:
+                    movie.setPaused(False)
+                elif not running:
+                    movie.start()
+            elif running:
+                movie.setPaused(True)
+
+    def set_window_visible(self, visible):
+        if visible != self.window_visible:
+            self.window_visible = visible
+            self.apply()
+
+    def note_activity(self):
+        """Call on touch or voice input (voice arrives through the broker's "activity" topic); leaves idle mode right away."""
+        self.last_activity = time.time()
+        if self.idle:
+            self.idle = False
+            print("⚡ Leaving idle mode")
+            self.apply()
+            self.idle_changed.emit(False)
+
+    def check_idle(self):
+        if not self.idle and time.time() - self.last_activity > self.idle_seconds:
+            self.idle = True
+            print("💤 Idle: lowering frame rates and polling")
+            self.apply()
+            self.idle_changed.emit(True)
+
+    def eventFilter(self, obj, event):
+        if event.type() in ACTIVITY_EVENTS:
+            self.note_activity()
+        return False
+
+    def charge_cpu(self, next_page):
+        now = time.process_time()
+        name = self.page_name(self.cpu_page) if self.cpu_page is not None else "hidden"
+        self.cpu_by_page[name] = self.cpu_by_page.get(name, 0.0) + now - self.cpu_mark
+        self.cpu_mark = now
+        self.cpu_page = next_page
+
+    def cpu_stats(self):
+        """Returns process CPU seconds spent while each screen was showing."""
+        self.charge_cpu(self.cpu_page)
+        return {name: round(seconds, 3) for name, seconds in self.cpu_by_page.items()}
@@ -0,0 +1,145 @@
+import math
+import os
+import time
+from collections import deque
+
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtGui import QPainter, QPixmap, QTransform
+from PyQt6.QtCore import Qt, QElapsedTimer
+
+# Renderer settings (override in .env)
+VINYL_RENDER_MODE = os.getenv("VINYL_RENDER_MODE", "painter")  # "painter" or "cache"
+VINYL_FRAME_STEP = float(os.getenv("VINYL_FRAME_STEP", "1.0"))  # Degrees between cached frames
+VINYL_CACHE_MB = int(os.getenv("VINYL_CACHE_MB", "128"))  # Memory cap for the frame cache
+VINYL_FRAME_STATS = os.getenv("VINYL_FRAME_STATS", "0") == "1"  # Print frame stats every few seconds
+
+DEGREES_PER_SECOND = 33.3  # Same visual speed as the old 1 degree / 30 ms timer
+TARGET_FPS = 60
+
+
+class VinylWidget(QWidget):
+    """
+    Draws a spinning vinyl record directly in paintEvent.
+
+    "painter" mode rotates the painter around the center and draws the source
+    pixmap, so nothing is allocated per frame. "cache" mode renders each angle
+    once into a bounded cache of pre-rotated frames and only blits afterwards.
+    """
+
+    def __init__(self, pixmap: QPixmap, parent=None, mode=VINYL_RENDER_MODE,
+                 step_degrees=VINYL_FRAME_STEP, max_cache_mb=VINYL_CACHE_MB):
+        super().__init__(parent)
+        self.pixmap = pixmap
+        self.mode = mode
+        self.angle = 0.0
+
+        # Size the frame cache so it never grows past the memory cap
+        frame_bytes = max(1, pixmap.width() * pixmap.height() * 4)
+        max_frames = (max_cache_mb * 1024 * 1024) // frame_bytes
+        wanted_frames = max(1, math.ceil(360 / max(step_degrees, 0.1)))
+        self.frame_count = min(wanted_frames, max_frames)
+        if self.mode == "cache" and self.frame_count < 8:
+            print("⚠️ Vinyl frame cache too small for this size, falling back to painter mode.")
+            self.mode = "painter"
+        self.frame_step = 360 / max(self.frame_count, 1)
+        self.frames = [None] * self.frame_count if self.mode == "cache" else []
+        self.current_frame = 0
+
+        # Frame-time statistics
+        self.clock = QElapsedTimer()
+        self.clock.start()
+        self.frame_times = deque(maxlen=TARGET_FPS * 4)
+        self.paint_times = deque(maxlen=TARGET_FPS * 4)
+        self.last_tick_ms = None
+        self.last_report = time.time()
+
+    def advance(self):
+        """Move the record to the angle for the current time and schedule a repaint if it changed."""
+        now_ms = self.clock.elapsed()
+        if self.last_tick_ms is not None:
+            self.frame_times.append(now_ms - self.last_tick_ms)
+        self.last_tick_ms = now_ms
+        self.angle = (now_ms * DEGREES_PER_SECOND / 1000) % 360
+
+        if self.mode == "cache":
+            frame = int(self.angle / self.frame_step) % self.frame_count
+            if frame == self.current_frame and self.frames[frame] is not None:
+                return  # Same cached frame as last time, nothing to repaint
+            self.current_frame = frame
+
+        self.update()
+
+    def build_frame(self, index):
+        """Render one rotated frame into the cache (done once per angle)."""
+        size = self.pixmap.size()
+        frame = QPixmap(size)
+        frame.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(frame)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self.draw_rotated(painter, index * self.frame_step)
+        painter.end()
+
+        self.frames[index] = frame
+        return frame
+
+    def draw_rotated(self, painter, angle):
+        w = self.pixmap.width()
+        h = self.pixmap.height()
+        transform = QTransform()
+        transform.translate(w / 2, h / 2)
+        transform.rotate(angle)
+        transform.translate(-w / 2, -h / 2)
+        painter.setTransform(transform)
+        painter.drawPixmap(0, 0, self.pixmap)
+
+    def paintEvent(self, event):
+        start_ms = self.clock.elapsed()
+
+        painter = QPainter(self)
+        if self.mode == "cache":
+            frame = self.frames[self.current_frame] or self.build_frame(self.current_frame)
+            painter.drawPixmap(0, 0, frame)
+        else:
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            self.draw_rotated(painter, self.angle)
+        painter.end()
+
+        self.paint_times.append(self.clock.elapsed() - start_ms)
+
+        if VINYL_FRAME_STATS and time.time() - self.last_report > 5:
+            self.last_report = time.time()
+            stats = self.frame_stats()
+            print(f"🎞 Vinyl: {stats['fps']} fps, avg {stats['avg_ms']} ms, "
+                  f"p95 {stats['p95_ms']} ms, paint {stats['paint_avg_ms']} ms, "
+                  f"cached {stats['cached_frames']}/{stats['frame_count']}")
+
+    def cached_bytes(self):
+        """Memory currently held by the frame cache."""
+        frame_bytes = self.pixmap.width() * self.pixmap.height() * 4
+        return sum(frame_bytes for frame in self.frames if frame is not None)
+
+    def frame_stats(self):
+        """Frame-time statistics (tick intervals and paint cost) over the last few seconds."""
+        times = sorted(self.frame_times)
+        if not times:
+            return {"frames": 0, "fps": 0, "avg_ms": 0, "p95_ms": 0, "max_ms": 0,
+                    "slow_frames": 0, "paint_avg_ms": 0, "mode": self.mode,
+                    "cached_frames": 0, "frame_count": self.frame_count}
+
+        avg = sum(times) / len(times)
+        budget = 1000 / TARGET_FPS
+        return {
+            "frames": len(times),
+            "fps": round(1000 / avg, 1) if avg else 0,
+            "avg_ms": round(avg, 2),
+            "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))],
+            "max_ms": times[-1],
+            "slow_frames": sum(1 for t in times if t > budget * 1.5),
+            "paint_avg_ms": round(sum(self.paint_times) / max(len(self.paint_times), 1), 2),
+            "mode": self.mode,
+            "cached_frames": sum(1 for frame in self.frames if frame is not None),
+            "frame_count": self.frame_count,
+        }
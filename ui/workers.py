@@ -0,0 +1,102 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+
+class TaskSignals(QObject):
+    """Signals a background task uses to hand its result back to the GUI thread."""
+    finished = pyqtSignal(str, int, object)  # key, generation, result
+    failed = pyqtSignal(str, int, object)  # key, generation, exception
+
+
+class Task(QRunnable):
+    """Runs one blocking core.* call on a pool thread."""
+
+    def __init__(self, key, generation, fn, args, kwargs):
+        super().__init__()
+        self.key = key
+        self.generation = generation
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = TaskSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(self.key, self.generation, e)
+        else:
+            self.signals.finished.emit(self.key, self.generation, result)
+
+
+class TaskRunner(QObject):
+    """
+    Runs blocking calls on a QThreadPool and delivers results on the GUI thread.
+
+    Tasks are identified by a key: submitting a key that is already in flight
+    just adds another callback to the running task. Each task also belongs to
+    a group (usually a screen); cancel_group() drops queued tasks and discards
+    results of running ones so stale data never reaches a hidden screen.
+    """
+
+    def __init__(self, parent=None, max_threads=4):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.in_flight = {}  # key -> task info
+        self.generations = {}  # group -> current generation
+
+    def submit(self, key, fn, *args, group="default", on_result=None, on_error=None, **kwargs):
+        """Run fn(*args, **kwargs) in the background. Returns False if it joined an in-flight task."""
+        generation = self.generations.setdefault(group, 0)
+
+        info = self.in_flight.get(key)
+        if info and info["generation"] == generation:
+            info["callbacks"].append((on_result, on_error))
+            return False
+
+        task = Task(key, generation, fn, args, kwargs)
+        task.signals.finished.connect(self.on_finished)
+        task.signals.failed.connect(self.on_failed)
+        self.in_flight[key] = {
+            "task": task,
+            "group": group,
+            "generation": generation,
+            "callbacks": [(on_result, on_error)],
+        }
+        self.pool.start(task)
+        return True
+
+    def cancel_group(self, group):
+        """Drop queued tasks of a group and ignore results of the ones already running."""
+        self.generations[group] = self.generations.get(group, 0) + 1
+        for key, info in list(self.in_flight.items()):
+            if info["group"] == group:
+                if self.pool.tryTake(info["task"]):
+                    print(f"🚫 Cancelled queued task: {key}")
+                del self.in_flight[key]
+
+    def take(self, key, generation):
+        info = self.in_flight.get(key)
+        if not info or info["generation"] != generation:
+            return []  # Cancelled or replaced, result is stale
+        del self.in_flight[key]
+        return info["callbacks"]
+
+    @pyqtSlot(str, int, object)
+    def on_finished(self, key, generation, result):
+        for on_result, _ in self.take(key, generation):
+            if on_result:
+                on_result(result)
+
+    @pyqtSlot(str, int, object)
+    def on_failed(self, key, generation, error):
+        callbacks = self.take(key, generation)
+        if callbacks:
+            print(f"❌ Background task {key} failed: {error}")
+        for _, on_error in callbacks:
+            if on_error:
+                on_error(error)
+
+    def wait(self, msecs=-1):
+        """Block until all running tasks are done (used on shutdown)."""
+        return self.pool.waitForDone(msecs)